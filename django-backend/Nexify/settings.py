@@ -280,7 +280,19 @@ CELERY_BEAT_SCHEDULE = {
     'update-disposable-emails-every-24-hours': {
         'task': 'users.tasks.update_disposable_email_domains',
         'schedule': timedelta(hours=24),
-    }
+    },
+    'cleanup-expired-upload-sessions-every-hour': {
+        'task': 'sku.tasks.cleanup_expired_upload_sessions',
+        'schedule': timedelta(hours=1),
+    },
+    'collect-unreferenced-image-blobs-every-6-hours': {
+        'task': 'sku.tasks.collect_unreferenced_blobs',
+        'schedule': timedelta(hours=6),
+    },
+    'collect-stale-dataset-manifests-every-6-hours': {
+        'task': 'sku.tasks.collect_stale_dataset_manifests',
+        'schedule': timedelta(hours=6),
+    },
 }
 
 EMAIL_USE_TLS = True
@@ -295,4 +307,38 @@ EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 ### for uploading files
-DATA_UPLOAD_MAX_NUMBER_FILES = 10000
\ No newline at end of file
+DATA_UPLOAD_MAX_NUMBER_FILES = 10000
+
+# Threads used to hash and write uploaded images in parallel (1 = serial)
+SKU_UPLOAD_WORKERS = int(os.getenv("SKU_UPLOAD_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Resumable chunked uploads: parts are kept outside MEDIA_ROOT until finalized
+UPLOAD_SESSION_DIR = CONFIG_DIR / 'upload_sessions'
+UPLOAD_SESSION_TTL = timedelta(hours=int(os.getenv("UPLOAD_SESSION_TTL_HOURS", 24)))
+UPLOAD_SESSION_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Largest raw-body frame accepted by the binary capture endpoint (not bound by DATA_UPLOAD_MAX_MEMORY_SIZE)
+SKU_CAPTURE_MAX_FRAME_SIZE = int(os.getenv("SKU_CAPTURE_MAX_FRAME_SIZE", 64 * 1024 * 1024))
+
+# Content-addressed image storage: files are stored once under blobs/<hash> and shared
+# by every SKUImages row with that content (needs a local FileSystemStorage)
+SKU_CONTENT_ADDRESSED_STORAGE = os.getenv("SKU_CONTENT_ADDRESSED_STORAGE", "false").lower() == "true"
+# Unreferenced blobs younger than this are kept, so in-flight uploads are never collected
+SKU_BLOB_GC_GRACE = timedelta(hours=int(os.getenv("SKU_BLOB_GC_GRACE_HOURS", 1)))
+# Superseded dataset manifests handed out more recently than this are kept for the jobs reading them
+SKU_MANIFEST_GC_GRACE = timedelta(hours=int(os.getenv("SKU_MANIFEST_GC_GRACE_HOURS", 24)))
+
+# WebP previews (longest side in px) generated for every ingested image; empty disables them
+SKU_PREVIEW_SIZES = tuple(int(size) for size in os.getenv("SKU_PREVIEW_SIZES", "128,512,1024").split(",") if size.strip())
+
+# Asynchronous ingest: request bytes are spooled here and processed by a worker pool.
+# "celery" runs jobs on the Celery workers (falling back to threads when the broker is
+# unreachable), "thread" on an in-process executor of SKU_INGEST_WORKERS threads.
+SKU_INGEST_SPOOL_DIR = CONFIG_DIR / 'ingest_spool'
+SKU_INGEST_BACKEND = os.getenv("SKU_INGEST_BACKEND", "thread")
+SKU_INGEST_WORKERS = int(os.getenv("SKU_INGEST_WORKERS", 2))
+# Default for uploads/captures that do not pass async explicitly
+SKU_INGEST_ASYNC = os.getenv("SKU_INGEST_ASYNC", "false").lower() == "true"
+
+# Threads unlinking the files of deleted images after the rows are gone
+SKU_UNLINK_WORKERS = int(os.getenv("SKU_UNLINK_WORKERS", 2))
@@ -14,7 +14,7 @@ class CustomDataset(AnomalibDataset):
     def __init__(
         self,
         name: str,
-        path_label_object: Dict[str, Any],
+        path_label_object: Dict[str, Any] | None,
         normal_dir: str | Path | Sequence[str | Path] = None,
         augmentations: Transform | None = None,
         root: str | Path | None = None,
@@ -23,6 +23,7 @@ class CustomDataset(AnomalibDataset):
         mask_dir: str | Path | Sequence[str | Path] | None = None,
         split: str | Split | None = None,
         extensions: tuple[str, ...] | None = None,
+        manifest_path: str | Path | None = None,
     ) -> None:
         super().__init__(augmentations=augmentations)
 
@@ -38,6 +39,7 @@ class CustomDataset(AnomalibDataset):
         self.samples = make_folder_dataset(
             path_label_object=path_label_object,
             split=self.split,
+            manifest_path=manifest_path,
         )
 
     @property
@@ -50,22 +52,44 @@ class CustomDataset(AnomalibDataset):
         return self._name
 
 
+def read_manifest(manifest_path: str | Path, columns: Sequence[str] = ("image_path", "label_index")) -> DataFrame:
+    """Memory-map an Arrow IPC dataset manifest and load only the given columns.
+
+    Args:
+        manifest_path: Path of the manifest written by the backend.
+        columns: Manifest columns to load.
+
+    Returns:
+        DataFrame: One row per image.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(manifest_path), "r") as source:
+        return pa.ipc.open_file(source).read_all().select(list(columns)).to_pandas()
+
+
 def make_folder_dataset(
-    path_label_object,
+    path_label_object=None,
     split: str | Split | None = None,
+    manifest_path: str | Path | None = None,
 ) -> DataFrame:
 
-    filenames = []
-    labels = []
-
-    for dict_elemet in path_label_object:
-        filenames.append(dict_elemet["image"])
-        if dict_elemet["label_id"] == 0:
-            labels.append(DirType.NORMAL)
-        else:
-            labels.append(DirType.ABNORMAL)
-
-    samples = DataFrame({"image_path": filenames, "label": labels})
+    if manifest_path is not None:
+        manifest = read_manifest(manifest_path)
+        labels = manifest["label_index"].eq(0).map({True: DirType.NORMAL, False: DirType.ABNORMAL})
+        samples = DataFrame({"image_path": manifest["image_path"], "label": labels})
+    else:
+        filenames = []
+        labels = []
+
+        for dict_elemet in path_label_object:
+            filenames.append(dict_elemet["image"])
+            if dict_elemet["label_id"] == 0:
+                labels.append(DirType.NORMAL)
+            else:
+                labels.append(DirType.ABNORMAL)
+
+        samples = DataFrame({"image_path": filenames, "label": labels})
     samples = samples.sort_values(by="image_path", ignore_index=True)
 
     # Create label index for normal (0) and abnormal (1) images.
@@ -115,7 +139,7 @@ class Folder(AnomalibDataModule):
     def __init__(
         self,
         name: str,
-        path_label_object: Dict[str, Any],
+        path_label_object: Dict[str, Any] | None,
         normal_dir: str | Path | Sequence[str | Path] = None,
         root: str | Path | None = None,
         abnormal_dir: str | Path | Sequence[str | Path] | None = None,
@@ -135,10 +159,12 @@ class Folder(AnomalibDataModule):
         val_split_mode: ValSplitMode | str = ValSplitMode.FROM_TEST,
         val_split_ratio: float = 0.5,
         seed: int | None = None,
+        manifest_path: str | Path | None = None,
     ) -> None:
         self._name = name
         self.root = root
         self.path_label_object = path_label_object
+        self.manifest_path = manifest_path
         self.normal_dir = normal_dir
         self.abnormal_dir = abnormal_dir
         self.normal_test_dir = normal_test_dir
@@ -174,6 +200,7 @@ class Folder(AnomalibDataModule):
             normal_test_dir=self.normal_test_dir,
             mask_dir=self.mask_dir,
             extensions=self.extensions,
+            manifest_path=self.manifest_path,
         )
 
         self.test_data = CustomDataset(
@@ -186,6 +213,7 @@ class Folder(AnomalibDataModule):
             normal_test_dir=self.normal_test_dir,
             mask_dir=self.mask_dir,
             extensions=self.extensions,
+            manifest_path=self.manifest_path,
         )
 
     @property
@@ -5,6 +5,7 @@ import requests
 
 import cv2
 from anomaly_tester import AnomalyTester
+from custom_datamodule import read_manifest
 
 
 def test(args):
@@ -25,11 +26,19 @@ def test(args):
 
     # Fetch test dataset
     try:
-        response = requests.get(args.fetch_testset_url)
-        if response.status_code == 200:
-            list_img_obj = response.json()
+        if args.manifest_path:
+            manifest = read_manifest(args.manifest_path)
+            label_ids = manifest["label_index"].astype("Int64").astype(object).where(manifest["label_index"].notna(), None)
+            list_img_obj = [
+                {"image": image_path, "label_id": label_id}
+                for image_path, label_id in zip(manifest["image_path"], label_ids)
+            ]
         else:
-            print(f"Error: {response.status_code}, {response.text}")
+            response = requests.get(args.fetch_testset_url, params={"stream": "ndjson"}, stream=True)
+            if response.status_code == 200:
+                list_img_obj = [json.loads(line) for line in response.iter_lines() if line]
+            else:
+                print(f"Error: {response.status_code}, {response.text}")
 
     except Exception as e:
         print(json.dumps({"error": f"Failed to fetch or parse dataset: {str(e)}"}))
@@ -89,6 +98,7 @@ if __name__ == "__main__":
     parser.add_argument("--ckpt_path", type=str, required=True, help="Path to the model checkpoint file")
     parser.add_argument("--results_save_dir", type=str, required=True, help="Media save path ")
     parser.add_argument("--fetch_testset_url", type=str, required=True, help="URL to fetch the test dataset from") # For fetching dataset for test
+    parser.add_argument("--manifest_path", type=str, default=None, help="Arrow dataset manifest to read instead of fetching the test dataset URL")
     parser.add_argument("--save_result_dir_timestamp", type=str, required=True, help="The directory path where results need to be saved")
     parser.add_argument("--progress_api", type=str, required=True, help="End point url to update training status")
 
@@ -10,7 +10,7 @@ from anomalib.models import Padim, Patchcore, ReverseDistillation
 from anomalib.engine import Engine
 from anomalib.callbacks import ModelCheckpoint
 
-from custom_datamodule import Folder
+from custom_datamodule import Folder, read_manifest
 from create_augmentations import ImageModificationPipeline
 
 def train(args):
@@ -18,11 +18,18 @@ def train(args):
     # ==================
     # Prepare Dataset
     # ==================
-    response = requests.get(args.fetch_dataset_url)
-    if response.status_code == 200:
-        path_label_object = response.json()
+    path_label_object = None
+    if args.manifest_path:
+        # Memory-mapped, only the columns the datamodule needs are read
+        labeled_count = int(read_manifest(args.manifest_path, columns=["label_index"])["label_index"].notna().sum())
     else:
-        print(f"Error: {response.status_code}, {response.text}")
+        # Newline-delimited rows are parsed while the rest of the listing is still being sent
+        response = requests.get(args.fetch_dataset_url, params={"stream": "ndjson"}, stream=True)
+        if response.status_code == 200:
+            path_label_object = [json.loads(line) for line in response.iter_lines() if line]
+        else:
+            print(f"Error: {response.status_code}, {response.text}")
+        labeled_count = len([entry for entry in path_label_object if entry.get("label_id") is not None])
 
 
     # =================
@@ -43,12 +50,12 @@ def train(args):
         eval_batch_size=args.eval_batch_size,
         num_workers=args.num_workers,
         train_augmentations=transforms,
+        manifest_path=args.manifest_path,
     )
 
-    valid = [entry for entry in path_label_object if entry.get("label_id") is not None]
-    print(f"Found {len(valid)} valid labeled entries.")
+    print(f"Found {labeled_count} valid labeled entries.")
 
-    if len(valid) < 3:
+    if labeled_count < 3:
         raise ValueError(
             "Not enough labeled entries (min 3 recommended) for training."
         )
@@ -146,6 +153,7 @@ if __name__ == "__main__":
     parser.add_argument("--augmentations", type=str, help="Augmentations to be applied on images for training.")
     parser.add_argument("--max_epochs", type=int, required=True, help="Maximum number of epochs")
     parser.add_argument("--fetch_dataset_url", type=str, required=True, help="URL of the end point to fetch dataset.")
+    parser.add_argument("--manifest_path", type=str, default=None, help="Arrow dataset manifest to read instead of fetching the dataset URL.")
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--train_batch_size", type=int, default=16, help="Training batch size")
     parser.add_argument("--eval_batch_size", type=int, default=16, help="Evaluation batch size")
@@ -1,5 +1,9 @@
 import base64
+import json
 import logging
+import threading
+import time
+from datetime import datetime, timezone
 
 import cv2
 import requests
@@ -9,14 +13,149 @@ logger = logging.getLogger(__name__)
 
 
 class ImageCollector:
+    """
+    Sends camera frames to the capture endpoint.
+
+    mode="base64" posts a base64 data URL inside JSON (the original protocol);
+    mode="binary" posts the encoded bytes as-is to `<end_point_url>binary/`,
+    which avoids the ~33% base64 overhead and the JSON encode/decode per frame.
+
+    With batch_size > 1 frames are buffered and posted together to
+    `<end_point_url>batch/` once batch_size frames are queued or the oldest
+    queued frame is flush_interval seconds old. Only the newest frame of each
+    batch is sent to the streaming endpoint. Call close() to flush the rest.
+    """
+
+    MODES = ("base64", "binary")
+    # 202: the server queued the frames for asynchronous ingest (SKU_INGEST_ASYNC)
+    ACCEPTED_STATUSES = {200, 201, 202}
+
     def __init__(
-            self, sku_id: int, version_id: int, end_point_url: str, streaming_endpoint_url: str, tag_name: str
+            self, sku_id: int, version_id: int, end_point_url: str, streaming_endpoint_url: str, tag_name: str,
+            mode: str = "base64", batch_size: int = 1, flush_interval: float = 1.0
         ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported mode '{mode}', expected one of {self.MODES}.")
         self.sku_id = sku_id
         self.version_id = version_id
         self.end_point_url = end_point_url
         self.streaming_endpoint_url = streaming_endpoint_url
         self.tag_name = tag_name
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # Reuse one connection for every frame
+        self.session = requests.Session()
+
+        self._buffer = []  # (filename, byte_data, mime_type, timestamp)
+        self._buffer_started = None
+        self._frame_counter = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()  # The flusher thread and the camera callback share one session
+        self._closed = threading.Event()
+        self._flusher = None
+        if self.batch_size > 1:
+            # Flushes on time even when the camera stops delivering frames
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    @property
+    def binary_end_point_url(self) -> str:
+        return f"{self.end_point_url.rstrip('/')}/binary/"
+
+    @property
+    def batch_end_point_url(self) -> str:
+        return f"{self.end_point_url.rstrip('/')}/batch/"
+
+    @staticmethod
+    def _data_url(byte_data: bytes, mime_type: str) -> str:
+        return f"data:{mime_type};base64,{base64.b64encode(byte_data).decode('utf-8')}"
+
+    def _post_stream(self, byte_data: bytes, mime_type: str, encoded_image: str = None) -> None:
+        # The stream preview consumes data URLs, only build one when a preview is sent
+        if self.streaming_endpoint_url:
+            self.session.post(
+                self.streaming_endpoint_url, json={"image": encoded_image or self._data_url(byte_data, mime_type)}
+            )
+
+    def _post_binary(self, byte_data: bytes, format: str) -> requests.Response:
+        params = {
+            "sku_id": self.sku_id,
+            "version_id": self.version_id,
+            "tags": self.tag_name,
+            "image_format": format,
+        }
+        return self.session.post(
+            self.binary_end_point_url,
+            params=params,
+            data=byte_data,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+    def _post_batch(self, frames: list) -> bool:
+        files = [("images", (filename, byte_data, mime_type)) for filename, byte_data, mime_type, _ in frames]
+        metadata = [{"filename": filename, "timestamp": timestamp} for filename, _, _, timestamp in frames]
+        data = {
+            "sku_id": self.sku_id,
+            "version_id": self.version_id,
+            "tags": self.tag_name,
+            "metadata": json.dumps(metadata),
+        }
+
+        _, last_bytes, last_mime, _ = frames[-1]
+        self._post_stream(last_bytes, last_mime)
+        response = self.session.post(self.batch_end_point_url, data=data, files=files)
+
+        if response.status_code in self.ACCEPTED_STATUSES:
+            logger.info(f"Batch of {len(frames)} images sent successfully.")
+            return True
+        logger.warning(
+            f"Failed to send batch of {len(frames)} images. Status code: {response.status_code}, Response: {response.text}"
+        )
+        return False
+
+    def _take_buffer(self) -> list:
+        with self._lock:
+            frames, self._buffer = self._buffer, []
+            self._buffer_started = None
+        return frames
+
+    def flush(self) -> bool:
+        """Send every buffered frame now. Returns False if the batch request failed."""
+        frames = self._take_buffer()
+        if not frames:
+            return True
+        try:
+            with self._send_lock:
+                return self._post_batch(frames)
+        except Exception as e:
+            logger.error(f"Exception while sending batch of {len(frames)} images: {str(e)}")
+            return False
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval / 4):
+            with self._lock:
+                due = self._buffer_started is not None and time.monotonic() - self._buffer_started >= self.flush_interval
+            if due:
+                self.flush()
+
+    def close(self) -> None:
+        """Stop the background flusher and send any frames still buffered."""
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        self.flush()
+
+    def _enqueue(self, byte_data: bytes, format: str, mime_type: str) -> bool:
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._frame_counter += 1
+            filename = f"{int(time.time() * 1000)}_{self._frame_counter:06d}.{format}"
+            self._buffer.append((filename, byte_data, mime_type, timestamp))
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+            full = len(self._buffer) >= self.batch_size
+        return self.flush() if full else True
 
     def send(self, image: np.ndarray, format: str = "png") -> bool:
         try:
@@ -33,27 +172,26 @@ class ImageCollector:
                 return False
 
             byte_data = buffer.tobytes()
-
-            # Base64 encode and add MIME type
             mime_type = f"image/{'jpeg' if format == 'jpg' else format}"
-            base64_image = base64.b64encode(byte_data).decode("utf-8")
-            encoded_image = f"data:{mime_type};base64,{base64_image}"
-
-            payload = {
-                "image": encoded_image,
-                "sku_id": self.sku_id,
-                "version_id": self.version_id,
-                "tags": self.tag_name,
-            }
-
-            streaming_payload = {
-                "image": encoded_image
-            }
-            
-            stream_response = requests.post(self.streaming_endpoint_url, json=streaming_payload)
-            response = requests.post(self.end_point_url, json=payload)
-
-            if response.status_code in {200, 201}:
+
+            if self.batch_size > 1:
+                return self._enqueue(byte_data, format, mime_type)
+
+            if self.mode == "binary":
+                self._post_stream(byte_data, mime_type)
+                response = self._post_binary(byte_data, format)
+            else:
+                encoded_image = self._data_url(byte_data, mime_type)
+                self._post_stream(byte_data, mime_type, encoded_image)
+                payload = {
+                    "image": encoded_image,
+                    "sku_id": self.sku_id,
+                    "version_id": self.version_id,
+                    "tags": self.tag_name,
+                }
+                response = self.session.post(self.end_point_url, json=payload)
+
+            if response.status_code in self.ACCEPTED_STATUSES:
                 logger.info("Image sent successfully.")
                 return True
             else:
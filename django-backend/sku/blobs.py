@@ -0,0 +1,259 @@
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import ImageBlob, SKUImages
+from .previews import release_previews
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BLOB_ROOT = 'blobs'
+CHUNK_SIZE = 64 * 1024
+BLOB_TMP_DIR = f'{BLOB_ROOT}/tmp'
+# Files handed to one unlink task
+UNLINK_BATCH_SIZE = 500
+
+_unlink_executor = None
+
+
+def cas_enabled():
+    return settings.SKU_CONTENT_ADDRESSED_STORAGE
+
+
+def blob_name(content_hash, file_name=''):
+    """Storage name of a blob: blobs/ab/cd/<hash><ext>."""
+    ext = os.path.splitext(file_name)[1].lower()
+    return f'{BLOB_ROOT}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}'
+
+
+def write_blob(stream, file_name):
+    """
+    Stream ``stream`` into the blob store and return (name, content_hash, size).
+
+    The bytes go to a temporary file first and are renamed to their
+    content-addressed name once hashed. If that blob already exists the
+    temporary copy is dropped (and the blob's mtime refreshed, which keeps it
+    out of collect_garbage() for the grace period), so identical content is
+    only kept once. The ImageBlob row is created later by register_blobs().
+    """
+    tmp_path = default_storage.path(f'{BLOB_TMP_DIR}/{uuid.uuid4().hex}')
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+
+    md5 = hashlib.md5()
+    size = 0
+    with open(tmp_path, 'wb') as tmp:
+        for data in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            md5.update(data)
+            size += len(data)
+            tmp.write(data)
+
+    content_hash = md5.hexdigest()
+    name = blob_name(content_hash, file_name)
+    final_path = default_storage.path(name)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        os.utime(final_path)
+    else:
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+    return name, content_hash, size
+
+
+def register_blobs(image_instances):
+    """
+    Attach ImageBlob rows to unsaved SKUImages whose ``image`` points into the
+    blob store, creating the missing rows in bulk. When a blob for the same
+    content already exists under another name, the row is pointed at it and the
+    extra file is left for collect_garbage().
+    """
+    wanted = {}
+    for image_instance in image_instances:
+        wanted.setdefault(image_instance.content_hash, image_instance)
+
+    existing = ImageBlob.objects.in_bulk(list(wanted), field_name='content_hash')
+    ImageBlob.objects.bulk_create(
+        [
+            ImageBlob(
+                content_hash=content_hash,
+                file=image_instance.image.name,
+                size=image_instance.file_size or 0
+            )
+            for content_hash, image_instance in wanted.items()
+            if content_hash not in existing
+        ],
+        ignore_conflicts=True
+    )
+    blobs = ImageBlob.objects.in_bulk(list(wanted), field_name='content_hash')
+
+    for image_instance in image_instances:
+        blob = blobs[image_instance.content_hash]
+        image_instance.blob = blob
+        image_instance.image.name = blob.file
+
+
+def release_file(image):
+    """
+    Delete the file behind an SKUImages row that is about to be removed.
+    Blob-backed files may be shared, they are reclaimed by collect_garbage().
+    """
+    release_previews(image.content_hash, image.previews, exclude_ids=[image.id])
+    if image.blob_id:
+        return
+    if image.image and image.image.storage.exists(image.image.name):
+        image.image.delete(save=False)
+
+
+# link()/rename() failures that mean "use a copy instead": another filesystem, no hard links there
+_NO_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+PLACED_RENAMED = 'renamed'
+PLACED_LINKED = 'linked'
+PLACED_COPIED = 'copied'
+
+# ioctl() request from linux/fs.h sharing the extents of a file (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
+def _clone_file(source_path, target_path):
+    """Copy as a reflink where the filesystem supports it, byte by byte otherwise."""
+    if fcntl is not None:
+        try:
+            with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+                fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source_path, target_path)
+
+
+def place_file(source_path, target_path, move=False):
+    """
+    Make the file at ``source_path`` available at ``target_path`` (both local
+    paths, target not existing) without copying its bytes where possible: a
+    rename when ``move``, a hard link otherwise. Where that fails the file is
+    copied (a reflink when the filesystem can) and the source left in place,
+    for the caller to delete once its rows are committed. Returns
+    PLACED_RENAMED, PLACED_LINKED or PLACED_COPIED.
+    """
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    try:
+        if move:
+            os.rename(source_path, target_path)
+            return PLACED_RENAMED
+        os.link(source_path, target_path)
+        return PLACED_LINKED
+    except OSError as e:
+        if e.errno not in _NO_LINK_ERRNOS:
+            raise
+    _clone_file(source_path, target_path)
+    return PLACED_COPIED
+
+
+def unplace_file(source_path, target_path, placed):
+    """Undo place_file(), e.g. when the rows pointing at ``target_path`` were rolled back."""
+    try:
+        if placed == PLACED_RENAMED:
+            os.rename(target_path, source_path)
+        else:
+            os.remove(target_path)
+    except OSError as e:
+        logger.warning("Could not undo placing %s at %s: %s", source_path, target_path, e)
+
+
+def release_files(rows):
+    """
+    Set-based release_file() for SKUImages rows deleted in the current
+    transaction, given as values() dicts with id, image, blob_id, content_hash
+    and previews. Previews still shown by remaining rows are kept (one query);
+    everything else is unlinked in the background once the delete commits.
+    """
+    names = {row['image'] for row in rows if row['image'] and not row['blob_id']}
+    hashes = {row['content_hash'] for row in rows if row['previews'] and row['content_hash']}
+    still_shown = set(
+        SKUImages.objects.filter(content_hash__in=hashes).values_list('content_hash', flat=True).distinct()
+    ) if hashes else set()
+    for row in rows:
+        if row['previews'] and row['content_hash'] not in still_shown:
+            names.update(row['previews'].values())
+    unlink_on_commit(names)
+
+
+def unlink_on_commit(names):
+    """Delete the stored files ``names`` on the unlink executor after the current transaction commits."""
+    names = sorted(name for name in names if name)
+    for start in range(0, len(names), UNLINK_BATCH_SIZE):
+        transaction.on_commit(partial(_submit_unlink, names[start:start + UNLINK_BATCH_SIZE]))
+
+
+def _submit_unlink(names):
+    global _unlink_executor
+    if _unlink_executor is None:
+        _unlink_executor = ThreadPoolExecutor(max_workers=settings.SKU_UNLINK_WORKERS, thread_name_prefix='sku-unlink')
+    _unlink_executor.submit(delete_stored_files, names)
+
+
+def delete_stored_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning("Could not delete %s: %s", name, e)
+
+
+def collect_garbage(grace=None):
+    """
+    Delete blobs no SKUImages row references anymore, plus stray files in the
+    blob store without a row. Anything younger than ``grace`` (SKU_BLOB_GC_GRACE)
+    is kept so uploads that have written their files but not yet committed
+    their rows are never collected. Returns the number of files removed.
+    """
+    grace = settings.SKU_BLOB_GC_GRACE if grace is None else grace
+    cutoff = timezone.now() - grace
+    removed = 0
+
+    unreferenced = ImageBlob.objects.annotate(refs=Count('images')).filter(refs=0, created_at__lt=cutoff)
+    cutoff_ts = cutoff.timestamp()
+    for blob in unreferenced:
+        path = default_storage.path(blob.file)
+        if os.path.exists(path) and os.path.getmtime(path) >= cutoff_ts:
+            continue  # Re-written by an upload that has not committed yet
+        # Re-check inside the delete so a row that gained a reference meanwhile survives
+        deleted, _ = ImageBlob.objects.filter(id=blob.id, images__isnull=True).delete()
+        if deleted and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    root = default_storage.path(BLOB_ROOT)
+    if not os.path.isdir(root):
+        return removed
+
+    known_files = set(ImageBlob.objects.values_list('file', flat=True))
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            if name in known_files:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff_ts:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
@@ -0,0 +1,329 @@
+import hashlib
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .blobs import cas_enabled, register_blobs, release_files, write_blob
+from .models import SKUImages
+from .phash import HammingIndex, dhash
+from .previews import generate_previews
+from .version_stats import delete_images, record_created
+
+# Read size used when streaming archive members into storage.
+CHUNK_SIZE = 64 * 1024
+# Rows per INSERT statement for bulk_create (keeps SQLite under its variable limit).
+BULK_BATCH_SIZE = 500
+
+
+class HashingReader:
+    """
+    Read-only wrapper around a binary stream that MD5s every chunk handed out,
+    so a file can be hashed while it is being written to storage.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.md5.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self):
+        return self.md5.hexdigest()
+
+
+def hash_stream(stream, chunk_size=CHUNK_SIZE):
+    md5 = hashlib.md5()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        md5.update(chunk)
+    return md5.hexdigest()
+
+
+def iter_zip_members(zip_ref):
+    """Yield the file members of an open ZipFile, skipping directory entries."""
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        yield info
+
+
+def _rewound(upload):
+    # Django owns the lifecycle of uploaded files, so hand them out without closing them
+    upload.seek(0)
+    return nullcontext(upload)
+
+
+def upload_items(files):
+    """Build ingest items (file_name, open_stream) from request.FILES entries."""
+    return [(os.path.basename(upload.name), partial(_rewound, upload)) for upload in files]
+
+
+def zip_items(zip_ref):
+    """Build ingest items (file_name, open_stream) from the members of an open ZipFile."""
+    return [
+        (os.path.basename(member.filename), partial(zip_ref.open, member))
+        for member in iter_zip_members(zip_ref)
+    ]
+
+
+class BulkImageIngestor:
+    """
+    Upload engine for one SKU version.
+
+    The filename/hash state of the version is loaded once. Hashing and storage
+    writes run on a thread pool (``workers`` threads, SKU_UPLOAD_WORKERS by
+    default) while the keep/skip/overwrite decisions are taken serially, in
+    upload order, on the calling thread. commit() then inserts the kept rows
+    with a single bulk_create inside one transaction.
+
+    Every stored file also gets a perceptual hash (dHash). With
+    ``near_duplicate_distance`` set, files within that many bits of an image
+    already in the version (or kept earlier in the batch) are skipped.
+
+    With SKU_CONTENT_ADDRESSED_STORAGE enabled files are written to the shared
+    blob store instead of the version folder; skipped or discarded files are
+    then left for the blob garbage collector rather than deleted here.
+    """
+
+    def __init__(self, sku, version, tags='', allow_duplicates=False, overwrite=False, workers=None,
+                 near_duplicate_distance=None):
+        self.sku = sku
+        self.version = version
+        self.tags = tags
+        self.allow_duplicates = allow_duplicates
+        self.overwrite = overwrite
+        self.workers = workers or settings.SKU_UPLOAD_WORKERS
+        self.use_blobs = cas_enabled()
+        self.near_index = HammingIndex(near_duplicate_distance) if near_duplicate_distance is not None else None
+
+        # original_filename -> id/image/hash of the first row carrying that name
+        self.existing_by_name = {}
+        self.existing_hashes = Counter()
+        rows = (
+            SKUImages.objects.filter(sku=sku, version=version)
+            .order_by('id')
+            .values_list('id', 'original_filename', 'content_hash', 'image', 'blob_id', 'perceptual_hash', 'previews')
+        )
+        for row_id, filename, content_hash, image_name, blob_id, perceptual_hash, previews in rows:
+            entry = self.existing_by_name.setdefault(filename, {
+                "id": row_id, "filename": filename, "image": image_name, "content_hash": content_hash,
+                "blob_id": blob_id, "previews": previews, "dropped": False
+            })
+            if content_hash:
+                self.existing_hashes[content_hash] += 1
+            if self.near_index is not None and perceptual_hash:
+                # Only the first row of a name can be replaced by overwrite, later ones stay for good
+                near_entry = entry if entry["id"] == row_id else {"filename": filename, "dropped": False}
+                self.near_index.add(int(perceptual_hash, 16), near_entry)
+
+        self.processed_hashes = set()
+        self.new_rows = []  # unsaved SKUImages whose files are already stored, in arrival order
+        self.pending = {}  # original_filename -> latest entry of new_rows with that name
+        self.replaced = []  # existing rows removed by overwrite
+        self.skipped = []
+
+    def _skip(self, file_name, reason, content_hash, **extra):
+        self.skipped.append({
+            "filename": file_name,
+            "reason": reason,
+            "content_hash": content_hash,
+            "version_id": self.version.id,
+            **extra
+        })
+
+    def _near_duplicate_of(self, perceptual_hash):
+        """Filename of a live indexed image within the configured distance, else None."""
+        for position, _ in self.near_index.search(int(perceptual_hash, 16)):
+            entry = self.near_index.items[position]
+            if not entry["dropped"]:
+                return entry["filename"]
+        return None
+
+    def _store(self, item):
+        """
+        Worker stage: hash one file and write it to storage.
+        Returns (file_name, content_hash, image_instance); image_instance is None
+        when the file is bound to be skipped by name and was only hashed.
+        """
+        file_name, open_stream, *extra = item
+        fields = extra[0] if extra else {}
+
+        # Names already in the version can never be kept without overwrite/allow_duplicates
+        if file_name in self.existing_by_name and not (self.overwrite or self.allow_duplicates):
+            with open_stream() as stream:
+                return file_name, hash_stream(stream), None
+
+        image_instance = SKUImages(
+            sku=self.sku,
+            version=self.version,
+            tags=self.tags,
+            original_filename=file_name,
+            **fields
+        )
+        if self.use_blobs:
+            with open_stream() as stream:
+                image_instance.image.name, image_instance.content_hash, image_instance.file_size = write_blob(stream, file_name)
+        else:
+            with open_stream() as stream:
+                reader = HashingReader(stream)
+                image_instance.image.save(file_name, File(reader, name=file_name), save=False)
+            image_instance.content_hash = reader.hexdigest()
+            image_instance.file_size = reader.size
+
+        # Read back from storage, the source stream may not be seekable (zip members)
+        with default_storage.open(image_instance.image.name, 'rb') as stored:
+            image_instance.perceptual_hash = dhash(stored)
+        return file_name, image_instance.content_hash, image_instance
+
+    def _decide(self, file_name, content_hash, image_instance):
+        """Serial stage: keep, skip or overwrite, in upload order."""
+        existing_entry = self.existing_by_name.get(file_name)
+        pending_entry = self.pending.get(file_name)
+        # An overwrite always replaces the image of its name, the duplicate checks below do not apply to it
+        overwriting = bool(existing_entry or pending_entry) and self.overwrite
+
+        if overwriting:
+            if pending_entry:
+                self._discard_pending(file_name)
+            else:
+                replaced_row = self.existing_by_name.pop(file_name)
+                replaced_row["dropped"] = True
+                self.existing_hashes[replaced_row["content_hash"]] -= 1
+                self.replaced.append(replaced_row)
+
+        elif (existing_entry or pending_entry) and not self.allow_duplicates:
+            if image_instance:
+                self._release(image_instance)
+            self._skip(file_name, "Duplicate image filename", content_hash)
+            return
+
+        # Content duplicates are only known once the bytes went through, drop the written copy
+        elif not self.allow_duplicates and (self.existing_hashes[content_hash] > 0 or content_hash in self.processed_hashes):
+            self._release(image_instance)
+            self._skip(file_name, "Duplicate image content", content_hash)
+            return
+
+        if self.near_index is not None and image_instance.perceptual_hash:
+            similar_to = None if overwriting else self._near_duplicate_of(image_instance.perceptual_hash)
+            if similar_to:
+                self._release(image_instance)
+                self._skip(file_name, "Near-duplicate image", content_hash, similar_to=similar_to)
+                return
+            image_instance.near_entry = {"filename": file_name, "dropped": False}
+            self.near_index.add(int(image_instance.perceptual_hash, 16), image_instance.near_entry)
+
+        self.new_rows.append(image_instance)
+        self.pending[file_name] = image_instance
+        self.processed_hashes.add(content_hash)
+
+    def _discard_pending(self, file_name):
+        image_instance = self.pending.pop(file_name)
+        if hasattr(image_instance, 'near_entry'):
+            image_instance.near_entry["dropped"] = True
+        self.new_rows.remove(image_instance)
+        self._release(image_instance)
+        self.processed_hashes.discard(image_instance.content_hash)
+
+    def _release(self, image_instance):
+        # Blobs may already be shared with committed rows, the garbage collector owns them
+        if not self.use_blobs:
+            image_instance.image.delete(save=False)
+
+    def ingest(self, items, on_progress=None):
+        """
+        Hash, store and decide on a list of (file_name, open_stream) items.
+        An item may carry a third element, a dict of extra SKUImages fields
+        (e.g. captured_at) for the row it produces.
+        ``on_progress(done, total, file_name)`` is called after each decision.
+        """
+        total = len(items)
+        if self.workers <= 1 or total <= 1:
+            try:
+                for index, item in enumerate(items, start=1):
+                    self._decide(*self._store(item))
+                    if on_progress:
+                        on_progress(index, total, item[0])
+            except Exception:
+                self.discard()
+                raise
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._store, item) for item in items]
+            decided = 0
+            try:
+                for future in futures:
+                    self._decide(*future.result())
+                    decided += 1
+                    if on_progress:
+                        on_progress(decided, total, items[decided - 1][0])
+            except Exception:
+                # Stop the pool and drop every file written for this batch
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                for future in futures[decided:]:
+                    if future.cancelled() or future.exception():
+                        continue
+                    image_instance = future.result()[2]
+                    if image_instance:
+                        self._release(image_instance)
+                self.discard()
+                raise
+
+    def discard(self):
+        """Remove the files stored for rows that were never committed."""
+        for image_instance in self.new_rows:
+            self._release(image_instance)
+        self.new_rows = []
+        self.pending = {}
+
+    def _build_previews(self, image_instance):
+        with default_storage.open(image_instance.image.name, 'rb') as stored:
+            image_instance.previews, image_instance.width, image_instance.height = generate_previews(
+                stored, image_instance.content_hash
+            )
+
+    def build_previews(self):
+        """Generate the WebP previews of the kept rows (only those, skipped files never get any)."""
+        rows = [image_instance for image_instance in self.new_rows if not image_instance.previews]
+        if self.workers <= 1 or len(rows) <= 1:
+            for image_instance in rows:
+                self._build_previews(image_instance)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(self._build_previews, rows))
+
+    def commit(self):
+        """
+        Build previews, then delete overwritten rows and insert all kept rows
+        in one transaction. Returns the created SKUImages instances.
+        """
+        try:
+            self.build_previews()
+            with transaction.atomic():
+                if self.replaced:
+                    delete_images(SKUImages.objects.filter(id__in=[row["id"] for row in self.replaced]))
+                if self.use_blobs:
+                    register_blobs(self.new_rows)
+                created = SKUImages.objects.bulk_create(self.new_rows, batch_size=BULK_BATCH_SIZE)
+                record_created(created)
+                # Old files go once the outermost transaction commits, commit() may run inside a caller's atomic()
+                release_files(self.replaced)
+        except Exception:
+            # Nothing references the freshly written files, don't leave them behind
+            self.discard()
+            raise
+
+        return created
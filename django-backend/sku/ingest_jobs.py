@@ -0,0 +1,188 @@
+import logging
+import os
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .ingest import CHUNK_SIZE, BulkImageIngestor, zip_items
+from .models import IngestJob
+from .progress import push_progress
+from .tasks import process_ingest_job_task
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def spool_dir(job):
+    return os.path.join(settings.SKU_INGEST_SPOOL_DIR, str(job.id))
+
+
+def spool_file(job, index, stream, file_name):
+    """
+    Copy one incoming file into the job's spool directory and fsync it, so an
+    accepted request survives a crash until the job is processed. Returns the
+    spooled name to record in the job manifest.
+    """
+    os.makedirs(spool_dir(job), exist_ok=True)
+    spooled_name = f"{index:06d}_{os.path.basename(file_name)}"
+    with open(os.path.join(spool_dir(job), spooled_name), 'wb') as spooled:
+        shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+        spooled.flush()
+        os.fsync(spooled.fileno())
+    return spooled_name
+
+
+def spool_ingest_job(sku, version, entries, kind=IngestJob.KIND_UPLOAD, **options):
+    """
+    Spool ``entries`` ([(stream, filename, extra manifest fields)]) for a new
+    job and queue it. ``options`` are IngestJob fields (tags, allow_duplicates,
+    overwrite, near_duplicate_distance). A zip archive is one entry with
+    {"zip": True}. Returns the saved job.
+    """
+    job = IngestJob(sku=sku, version=version, kind=kind, **options)
+    try:
+        job.manifest = [
+            {"file": spool_file(job, index, stream, filename), "filename": filename, **extra}
+            for index, (stream, filename, extra) in enumerate(entries)
+        ]
+        job.total_files = sum(1 for entry in job.manifest if not entry.get("zip"))
+        job.save()
+    except Exception:
+        remove_spool(job)
+        raise
+    enqueue_ingest_job(job)
+    return job
+
+
+def remove_spool(job):
+    shutil.rmtree(spool_dir(job), ignore_errors=True)
+
+
+def _job_items(job, directory, zip_refs):
+    items = []
+    for entry in job.manifest:
+        path = os.path.join(directory, entry["file"])
+        if entry.get("zip"):
+            zip_ref = zipfile.ZipFile(path, 'r')
+            zip_refs.append(zip_ref)
+            items.extend(zip_items(zip_ref))
+            continue
+        fields = {"captured_at": entry["captured_at"]} if entry.get("captured_at") else {}
+        items.append((entry["filename"], partial(open, path, 'rb'), fields))
+    return items
+
+
+def process_ingest_job(job_id):
+    """
+    Hash, dedup, store, preview and insert the spooled files of one job.
+    Safe to call more than once: only a queued job is picked up.
+    """
+    claimed = IngestJob.objects.filter(id=job_id, status=IngestJob.STATUS_QUEUED).update(
+        status=IngestJob.STATUS_PROCESSING, started_at=timezone.now()
+    )
+    if not claimed:
+        return
+    job = IngestJob.objects.select_related('sku', 'version').get(id=job_id)
+    job_key = str(job.id)
+
+    def report_progress(done, total, file_name):
+        push_progress(job_key, round(done * 100 / total, 2), f"Processed {file_name} ({done}/{total})")
+        # Keep the status endpoint moving without a write per file
+        if done == total or done % 50 == 0:
+            IngestJob.objects.filter(id=job.id).update(processed_files=done, total_files=total)
+
+    zip_refs = []
+    ingestor = None
+    try:
+        ingestor = BulkImageIngestor(
+            job.sku,
+            job.version,
+            tags=job.tags,
+            allow_duplicates=job.allow_duplicates,
+            overwrite=job.overwrite,
+            near_duplicate_distance=job.near_duplicate_distance
+        )
+        items = _job_items(job, spool_dir(job), zip_refs)
+        ingestor.ingest(items, on_progress=report_progress)
+
+        # Rows and the completed status land together, a crash leaves the job re-runnable
+        with transaction.atomic():
+            created = ingestor.commit()
+            job.status = IngestJob.STATUS_COMPLETED
+            job.total_files = job.processed_files = len(items)
+            job.finished_at = timezone.now()
+            job.result = {
+                "message": f"{len(created)} image(s) uploaded, {len(ingestor.skipped)} skipped.",
+                "uploaded_count": len(created),
+                "uploaded_ids": [image.id for image in created],
+                "skipped": ingestor.skipped
+            }
+            job.save(update_fields=['status', 'total_files', 'processed_files', 'finished_at', 'result'])
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job_key)
+        if ingestor is not None:
+            # The rows of a commit() rolled back with the job update, their files go as well
+            ingestor.discard()
+        IngestJob.objects.filter(id=job.id).update(
+            status=IngestJob.STATUS_FAILED,
+            finished_at=timezone.now(),
+            result={"message": str(e)}
+        )
+        push_progress(job_key, 100, f"Failed: {e}")
+        return
+    finally:
+        for zip_ref in zip_refs:
+            zip_ref.close()
+
+    remove_spool(job)
+    push_progress(job_key, 100, job.result["message"])
+
+
+def _run_in_thread(job_id):
+    try:
+        process_ingest_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def _thread_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.SKU_INGEST_WORKERS, thread_name_prefix='sku-ingest')
+    return _executor
+
+
+def dispatch_ingest_job(job_id):
+    """Hand a queued job to Celery (when configured and reachable) or to the in-process executor."""
+    if settings.SKU_INGEST_BACKEND == 'celery':
+        try:
+            process_ingest_job_task.delay(str(job_id))
+            return
+        except Exception as e:
+            logger.warning("Celery broker unavailable (%s), running ingest job %s in-process", e, job_id)
+    _thread_executor().submit(_run_in_thread, job_id)
+
+
+def enqueue_ingest_job(job):
+    """Dispatch the job once the row creating it is committed."""
+    transaction.on_commit(partial(dispatch_ingest_job, job.id))
+
+
+def requeue_unfinished_jobs(include_failed=False):
+    """
+    Put jobs interrupted by a restart (and optionally failed ones whose spool
+    is still there) back in the queue. Returns the queued jobs that still have
+    their spooled files, for the caller to dispatch or run.
+    """
+    statuses = [IngestJob.STATUS_PROCESSING]
+    if include_failed:
+        statuses.append(IngestJob.STATUS_FAILED)
+    IngestJob.objects.filter(status__in=statuses).update(status=IngestJob.STATUS_QUEUED, started_at=None, finished_at=None)
+
+    return [job for job in IngestJob.objects.filter(status=IngestJob.STATUS_QUEUED) if os.path.isdir(spool_dir(job))]
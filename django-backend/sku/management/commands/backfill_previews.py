@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from sku.ingest import BULK_BATCH_SIZE, hash_stream
+from sku.models import SKUImages
+from sku.previews import generate_previews
+from sku.revisions import bump_versions
+
+
+class Command(BaseCommand):
+    help = "Generate the WebP previews of SKU images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sku-id', type=int, help="Only images of this SKU ID")
+        parser.add_argument('--version-id', type=int, help="Only images of this Version ID")
+        parser.add_argument('--workers', type=int, default=settings.SKU_UPLOAD_WORKERS, help="Threads used to encode previews")
+
+    def handle(self, *args, **options):
+        images = SKUImages.objects.filter(previews={})
+        if options['sku_id']:
+            images = images.filter(sku_id=options['sku_id'])
+        if options['version_id']:
+            images = images.filter(version_id=options['version_id'])
+
+        def build(image):
+            try:
+                # Previews are keyed by content, legacy rows without a hash get one now
+                if not image.content_hash:
+                    with default_storage.open(image.image.name, 'rb') as stored:
+                        image.content_hash = hash_stream(stored)
+                with default_storage.open(image.image.name, 'rb') as stored:
+                    image.previews, image.width, image.height = generate_previews(stored, image.content_hash)
+            except FileNotFoundError:
+                image.previews = {}
+            return image
+
+        # Work through fixed id batches, the filter itself changes as rows get previews
+        ids = list(images.order_by('id').values_list('id', flat=True))
+        updated = failed = 0
+        version_ids = set()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                batch = SKUImages.objects.filter(id__in=ids[start:start + BULK_BATCH_SIZE]).only('id', 'image', 'content_hash', 'version_id')
+                built = [image for image in executor.map(build, batch)]
+                done = [image for image in built if image.previews]
+                failed += len(built) - len(done)
+                updated += SKUImages.objects.bulk_update(done, ['content_hash', 'previews', 'width', 'height'])
+                version_ids.update(image.version_id for image in done if image.version_id)
+                self.stdout.write(f"{updated}/{len(ids)} image(s) processed")
+
+        # Image listings of these versions now show previews
+        bump_versions(version_ids)
+        self.stdout.write(self.style.SUCCESS(f"{updated} image(s) got previews, {failed} missing or unreadable."))
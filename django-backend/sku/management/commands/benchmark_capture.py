@@ -0,0 +1,61 @@
+import base64
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from sku.models import SKU, Versions
+
+
+class Command(BaseCommand):
+    help = "Compare frames/sec of the base64 JSON and the binary camera capture endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=200, help="Number of frames per mode")
+        parser.add_argument('--size-kb', type=int, default=1024, help="Size of each synthetic frame in KB")
+
+    def handle(self, *args, **options):
+        frames = options['frames']
+        payload = os.urandom(options['size_kb'] * 1024)
+        client = Client()
+
+        self.stdout.write(f"Synthetic frames: {frames} x {options['size_kb']} KB")
+
+        # Frames go to a throw-away media root and the rows are rolled back
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with transaction.atomic():
+                sku = SKU.objects.create(name="capture-benchmark")
+                version = Versions.objects.create(name="benchmark", sku=sku)
+
+                # Client-side encoding is part of each loop, as it is for a real collector
+                def send_base64():
+                    encoded = f"data:image/png;base64,{base64.b64encode(payload).decode('utf-8')}"
+                    return client.post('/api/capture-images/', {
+                        "image": encoded, "sku_id": sku.id, "version_id": version.id, "tags": "benchmark"
+                    }, content_type='application/json')
+
+                def send_binary():
+                    return client.post(
+                        f'/api/capture-images/binary/?sku_id={sku.id}&version_id={version.id}&tags=benchmark&image_format=png',
+                        payload, content_type='application/octet-stream'
+                    )
+
+                rates = {}
+                for label, send in (("base64", send_base64), ("binary", send_binary)):
+                    start = time.perf_counter()
+                    for _ in range(frames):
+                        response = send()
+                        if response.status_code != 201:
+                            self.stderr.write(f"{label} capture failed: {response.status_code} {response.content[:200]}")
+                            return
+                    elapsed = time.perf_counter() - start
+                    rates[label] = frames / elapsed
+                    self.stdout.write(f"{label:>7}: {elapsed:.3f}s, {rates[label]:.1f} frames/s")
+
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {rates['binary'] / rates['base64']:.2f}x"))
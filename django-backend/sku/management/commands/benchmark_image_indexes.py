@@ -0,0 +1,150 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from sku.models import SKU, ImageBlob, Labels, SKUImages, Tags, Versions
+from workspace.models import Workspace
+
+ALIAS = 'index_benchmark'
+SKUS = 20
+VERSIONS_PER_SKU = 5
+LABELS_PER_SKU = 3
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throw-away SQLite database with SKUImages rows and print the EXPLAIN QUERY PLAN "
+        "and latency of the hot image filters without and with the SKUImages Meta.indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Number of SKUImages rows to seed")
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query, the median is reported")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic data")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with tempfile.TemporaryDirectory() as directory:
+            connections.settings[ALIAS] = {**connections['default'].settings_dict, 'NAME': os.path.join(directory, 'bench.sqlite3')}
+            try:
+                self.run(options['rows'], options['repeat'])
+            finally:
+                connections[ALIAS].close()
+                del connections.settings[ALIAS]
+
+    def run(self, rows, repeat):
+        connection = connections[ALIAS]
+        with connection.cursor() as cursor:
+            # Throw-away database, durability is not needed while seeding
+            cursor.execute('PRAGMA synchronous = OFF')
+            cursor.execute('PRAGMA journal_mode = MEMORY')
+        # SKUImages plus the tables its foreign keys point at (left empty apart from the rows referenced)
+        with connection.schema_editor() as editor:
+            for model in (Workspace, Tags, SKU, Versions, Labels, ImageBlob, SKUImages):
+                editor.create_model(model)
+        # create_model() builds the declared indexes on exit, drop them for the baseline
+        with connection.schema_editor() as editor:
+            for index in SKUImages._meta.indexes:
+                editor.remove_index(SKUImages, index)
+
+        self.stdout.write(f"Seeding {rows} rows...")
+        with transaction.atomic(using=ALIAS):
+            sample = self.seed(rows)
+        queries = self.queries(sample)
+
+        before = self.measure(queries, repeat)
+        self.stdout.write("Creating indexes...")
+        with connection.schema_editor() as editor:
+            for index in SKUImages._meta.indexes:
+                editor.add_index(SKUImages, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        after = self.measure(queries, repeat)
+
+        for name, _ in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            for label, results in (("without indexes", before), ("with indexes", after)):
+                plan, latency, count = results[name]
+                self.stdout.write(f"  {label}: {latency:.2f} ms ({count} rows)")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write(self.style.SUCCESS(f"  speedup: {before[name][1] / max(after[name][1], 1e-6):.1f}x"))
+
+    def seed(self, rows):
+        """Insert ``rows`` synthetic images spread over SKUs/versions; returns values to query with."""
+        SKU.objects.using(ALIAS).bulk_create([SKU(id=sku_id, name=f"sku-{sku_id}") for sku_id in range(1, SKUS + 1)])
+        Versions.objects.using(ALIAS).bulk_create([
+            Versions(id=(sku_id - 1) * VERSIONS_PER_SKU + n + 1, sku_id=sku_id, name=f"v{n}")
+            for sku_id in range(1, SKUS + 1) for n in range(VERSIONS_PER_SKU)
+        ])
+        Labels.objects.using(ALIAS).bulk_create([
+            Labels(id=(sku_id - 1) * LABELS_PER_SKU + n + 1, sku_id=sku_id, name=f"label-{n}")
+            for sku_id in range(1, SKUS + 1) for n in range(LABELS_PER_SKU)
+        ])
+
+        connection = connections[ALIAS]
+        columns = ['sku_id', 'version_id', 'tags', 'image', 'original_filename', 'content_hash',
+                   'label_id', 'rejected', 'data_set', 'split_label', 'previews']
+        table = connection.ops.quote_name(SKUImages._meta.db_table)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        sample = {}
+
+        def generate(start, stop):
+            for n in range(start, stop):
+                sku_id = n % SKUS + 1
+                version_id = (sku_id - 1) * VERSIONS_PER_SKU + (n // SKUS) % VERSIONS_PER_SKU + 1
+                labeled = random.random() < 0.6
+                label_id = (sku_id - 1) * LABELS_PER_SKU + random.randrange(LABELS_PER_SKU) + 1 if labeled else None
+                data_set = labeled and random.random() < 0.5
+                content_hash = f"{random.getrandbits(128):032x}"
+                filename = f"img_{n:08d}.jpg"
+                if n == rows // 2:
+                    sample.update(sku_id=sku_id, version_id=version_id, content_hash=content_hash, filename=filename)
+                yield (
+                    sku_id, version_id, 'bench', f"sku_images/{sku_id}/v{version_id}/{filename}", filename, content_hash,
+                    label_id, random.random() < 0.05, data_set, random.choice(('train', 'val', 'test')) if data_set else None, '{}'
+                )
+
+        with connection.cursor() as cursor:
+            for start in range(0, rows, 50_000):
+                cursor.executemany(sql, list(generate(start, min(start + 50_000, rows))))
+        return sample
+
+    def queries(self, sample):
+        images = SKUImages.objects.using(ALIAS)
+        sku_id, version_id = sample['sku_id'], sample['version_id']
+        first_version = (sku_id - 1) * VERSIONS_PER_SKU + 1
+        return [
+            ("Upload dedup: content hash in version", images.filter(
+                sku_id=sku_id, version_id=version_id, content_hash=sample['content_hash']
+            ).values_list('id', flat=True)),
+            ("Upload/merge: filename in version", images.filter(
+                sku_id=sku_id, version_id=version_id, original_filename=sample['filename']
+            ).values_list('id', flat=True)),
+            ("DataSetViewset: labeled images of versions", images.filter(
+                sku_id=sku_id, version_id__in=[first_version, first_version + 1], label__isnull=False
+            ).values_list('id', 'image', 'label_id')),
+            ("FinalDataSet: labeled dataset images of SKU", images.filter(
+                sku_id=sku_id, label__isnull=False, data_set=True
+            ).values_list('id', 'image', 'version_id', 'label_id')),
+            ("Preview release: content still referenced", images.filter(
+                content_hash=sample['content_hash']
+            ).exclude(id=0).values_list('id', flat=True)[:1]),
+        ]
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, queryset in queries:
+            plan = queryset.explain()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = len(list(queryset.all()))
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = (plan, statistics.median(timings), count)
+        return results
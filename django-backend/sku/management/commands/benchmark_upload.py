@@ -0,0 +1,57 @@
+import io
+import os
+import tempfile
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from sku.ingest import BulkImageIngestor
+from sku.models import SKU, Versions
+
+
+class Command(BaseCommand):
+    help = "Compare the serial and parallel hash/write stages of the upload path on a synthetic batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500, help="Number of synthetic images")
+        parser.add_argument('--size-kb', type=int, default=256, help="Size of each synthetic image in KB")
+        parser.add_argument('--workers', type=int, default=settings.SKU_UPLOAD_WORKERS, help="Threads for the parallel run")
+
+    def handle(self, *args, **options):
+        count = options['count']
+        size = options['size_kb'] * 1024
+        payloads = [os.urandom(size) for _ in range(count)]
+        total_mb = count * size / (1024 * 1024)
+
+        self.stdout.write(f"Synthetic batch: {count} files x {options['size_kb']} KB ({total_mb:.1f} MB)")
+
+        # Files go to a throw-away media root and the SKU/version rows are rolled back
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with transaction.atomic():
+                sku = SKU.objects.create(name="upload-benchmark")
+                version = Versions.objects.create(name="benchmark", sku=sku)
+
+                timings = {}
+                for label, workers in (("serial", 1), ("parallel", options['workers'])):
+                    ingestor = BulkImageIngestor(sku, version, workers=workers)
+                    items = [
+                        (f"{label}_{index}.jpg", partial(io.BytesIO, payload))
+                        for index, payload in enumerate(payloads)
+                    ]
+                    start = time.perf_counter()
+                    ingestor.ingest(items)
+                    timings[label] = time.perf_counter() - start
+                    ingestor.discard()
+
+                    self.stdout.write(
+                        f"{label:>8} ({workers} worker{'s' if workers != 1 else ''}): "
+                        f"{timings[label]:.3f}s, {count / timings[label]:.1f} files/s, {total_mb / timings[label]:.1f} MB/s"
+                    )
+
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {timings['serial'] / timings['parallel']:.2f}x"))
@@ -0,0 +1,40 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from sku.ingest import BULK_BATCH_SIZE
+from sku.models import SKUImages
+from sku.phash import dhash
+
+
+class Command(BaseCommand):
+    help = "Compute the perceptual hash (dHash) of SKU images that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sku-id', type=int, help="Only images of this SKU ID")
+        parser.add_argument('--version-id', type=int, help="Only images of this Version ID")
+
+    def handle(self, *args, **options):
+        images = SKUImages.objects.filter(perceptual_hash__isnull=True)
+        if options['sku_id']:
+            images = images.filter(sku_id=options['sku_id'])
+        if options['version_id']:
+            images = images.filter(version_id=options['version_id'])
+
+        # Work through fixed id batches, the filter itself changes as rows get hashed
+        ids = list(images.order_by('id').values_list('id', flat=True))
+        updated = unreadable = 0
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            hashed = []
+            for image in SKUImages.objects.filter(id__in=ids[start:start + BULK_BATCH_SIZE]).only('id', 'image'):
+                try:
+                    with default_storage.open(image.image.name, 'rb') as stored:
+                        image.perceptual_hash = dhash(stored)
+                except (FileNotFoundError, ValueError):
+                    image.perceptual_hash = None
+                if image.perceptual_hash is None:
+                    unreadable += 1
+                else:
+                    hashed.append(image)
+            updated += SKUImages.objects.bulk_update(hashed, ['perceptual_hash'])
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} image(s) hashed, {unreadable} missing or unreadable."))
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from sku.blobs import collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed image blobs that no SKUImages row references anymore."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=None,
+                            help="Keep unreferenced blobs younger than this (default SKU_BLOB_GC_GRACE)")
+
+    def handle(self, *args, **options):
+        grace = options['grace_hours']
+        removed = collect_garbage(None if grace is None else timedelta(hours=grace))
+        self.stdout.write(self.style.SUCCESS(f"{removed} unreferenced blob file(s) removed."))
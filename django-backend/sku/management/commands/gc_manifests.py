@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from sku.manifests import collect_stale_manifests
+
+
+class Command(BaseCommand):
+    help = "Delete dataset manifests superseded by a newer snapshot of the same selection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=None,
+                            help="Keep manifests handed out more recently than this (default SKU_MANIFEST_GC_GRACE)")
+
+    def handle(self, *args, **options):
+        grace = options['grace_hours']
+        removed = collect_stale_manifests(None if grace is None else timedelta(hours=grace))
+        self.stdout.write(self.style.SUCCESS(f"{removed} stale dataset manifest file(s) removed."))
@@ -0,0 +1,56 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from sku.ingest import BULK_BATCH_SIZE
+from sku.models import SKUImages, Versions
+from sku.version_stats import reconcile, version_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-version image statistics from SKUImages and report versions that had drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sku-id', type=int, help="Only versions of this SKU ID")
+        parser.add_argument('--version-id', type=int, help="Only this Version ID")
+        parser.add_argument(
+            '--backfill-sizes', action='store_true',
+            help="First record file_size of images that do not have it, reading it from storage"
+        )
+
+    def handle(self, *args, **options):
+        versions = Versions.objects.all()
+        if options['sku_id']:
+            versions = versions.filter(sku_id=options['sku_id'])
+        if options['version_id']:
+            versions = versions.filter(id=options['version_id'])
+
+        if options['backfill_sizes']:
+            self.backfill_sizes(SKUImages.objects.filter(version__in=versions, file_size__isnull=True))
+
+        version_ids = list(versions.values_list('id', flat=True))
+        before = version_summaries(version_ids)
+        rows = reconcile(versions)
+        after = version_summaries(version_ids)
+
+        drifted = [version_id for version_id in version_ids if before[version_id] != after[version_id]]
+        for version_id in drifted:
+            self.stdout.write(
+                f"Version {version_id}: {before[version_id]['total_image_count']} -> "
+                f"{after[version_id]['total_image_count']} image(s)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(version_ids)} version(s) reconciled into {rows} statistics row(s), {len(drifted)} had drifted."
+        ))
+
+    def backfill_sizes(self, images):
+        ids = list(images.order_by('id').values_list('id', flat=True))
+        updated = 0
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            batch = list(SKUImages.objects.filter(id__in=ids[start:start + BULK_BATCH_SIZE]).only('id', 'image'))
+            for image in batch:
+                try:
+                    image.file_size = default_storage.size(image.image.name)
+                except (FileNotFoundError, ValueError):
+                    image.file_size = 0
+            updated += SKUImages.objects.bulk_update(batch, ['file_size'])
+        self.stdout.write(f"{updated} image size(s) backfilled")
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sku.ingest_jobs import dispatch_ingest_job, process_ingest_job, requeue_unfinished_jobs
+
+
+class Command(BaseCommand):
+    help = "Re-run ingest jobs left queued or interrupted (e.g. by a restart) from their spooled files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--include-failed', action='store_true', help="Also retry failed jobs whose spool still exists")
+
+    def handle(self, *args, **options):
+        jobs = requeue_unfinished_jobs(include_failed=options['include_failed'])
+
+        # The in-process executor would die with this command, run the jobs here instead
+        run_here = settings.SKU_INGEST_BACKEND != 'celery'
+        for job in jobs:
+            if run_here:
+                process_ingest_job(job.id)
+                job.refresh_from_db()
+                self.stdout.write(f"{job.id}: {job.status} - {(job.result or {}).get('message', '')}")
+            else:
+                dispatch_ingest_job(job.id)
+                self.stdout.write(f"{job.id}: dispatched")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(jobs)} ingest job(s) resumed."))
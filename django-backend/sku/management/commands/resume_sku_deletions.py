@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sku.models import SKU
+from sku.sku_deletion import delete_sku, dispatch_sku_deletion
+
+
+class Command(BaseCommand):
+    help = "Finish deleting SKUs that were marked deleted but whose background deletion was interrupted (e.g. by a restart)."
+
+    def handle(self, *args, **options):
+        sku_ids = list(SKU.all_objects.filter(is_deleted=True).values_list('id', flat=True))
+
+        # The in-process executor would die with this command, run the deletions here instead
+        run_here = settings.SKU_INGEST_BACKEND != 'celery'
+        for sku_id in sku_ids:
+            if run_here:
+                delete_sku(sku_id)
+                self.stdout.write(f"SKU {sku_id}: deleted")
+            else:
+                dispatch_sku_deletion(sku_id)
+                self.stdout.write(f"SKU {sku_id}: dispatched")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(sku_ids)} SKU deletion(s) resumed."))
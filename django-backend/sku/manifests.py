@@ -0,0 +1,145 @@
+import hashlib
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import SKU, SKUImages, Versions
+from .revisions import queryset_revision
+
+MANIFEST_ROOT = 'dataset_manifests'
+MANIFEST_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+# Rows per Arrow record batch, also the chunk size the images are read in
+BATCH_ROWS = 50_000
+LABEL_INDEX = {"good": 0, "bad": 1}
+
+
+class ManifestUnavailable(RuntimeError):
+    """pyarrow is not installed, manifests cannot be written."""
+
+
+def manifest_schema(pa):
+    return pa.schema([
+        ('image_path', pa.string()),
+        ('label_index', pa.int8()),
+        ('split', pa.string()),
+        ('content_hash', pa.string()),
+        ('width', pa.int32()),
+        ('height', pa.int32()),
+    ])
+
+
+def manifest_name(sku_id, version_ids):
+    """
+    Storage name of the manifest for the current state of a dataset:
+    dataset_manifests/<sku>/<selection>-<snapshot>.arrow. Labelling, splits and
+    image changes bump the SKU/version revisions, so they give a new snapshot.
+    """
+    version_ids = sorted(set(version_ids))
+    selection = hashlib.md5(','.join(map(str, version_ids)).encode()).hexdigest()[:16]
+    revision = (
+        queryset_revision(SKU.objects.filter(id=sku_id))
+        + queryset_revision(Versions.objects.filter(sku_id=sku_id, id__in=version_ids))
+    )
+    snapshot = hashlib.md5(repr(revision).encode()).hexdigest()[:16]
+    return f'{MANIFEST_ROOT}/{sku_id}/{selection}-{snapshot}.arrow'
+
+
+def _image_path(name):
+    # Same paths as the data-set listing with absolute_path=true
+    try:
+        return default_storage.path(name) if name else None
+    except NotImplementedError:
+        return None
+
+
+def _batches(pa, schema, images):
+    columns = {field: [] for field in schema.names}
+    values = images.order_by('id').values_list(
+        'image', 'label__name', 'split_label', 'content_hash', 'width', 'height'
+    ).iterator(chunk_size=BATCH_ROWS)
+    for image, label_name, split, content_hash, width, height in values:
+        columns['image_path'].append(_image_path(image))
+        columns['label_index'].append(LABEL_INDEX.get((label_name or '').lower()))
+        columns['split'].append(split)
+        columns['content_hash'].append(content_hash)
+        columns['width'].append(width)
+        columns['height'].append(height)
+        if len(columns['image_path']) >= BATCH_ROWS:
+            yield pa.record_batch(list(columns.values()), schema=schema)
+            columns = {field: [] for field in schema.names}
+    if columns['image_path']:
+        yield pa.record_batch(list(columns.values()), schema=schema)
+
+
+def write_manifest(sku_id, version_ids):
+    """
+    Write (once per snapshot) the Arrow IPC manifest of the labelled images of
+    ``version_ids`` and return its storage name. The file can be memory-mapped
+    by the datamodules, which then only read the columns they use. Raises
+    ManifestUnavailable when pyarrow is missing.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ManifestUnavailable("Dataset manifests need pyarrow to be installed.")
+
+    name = manifest_name(sku_id, version_ids)
+    path = default_storage.path(name)
+    if os.path.exists(path):
+        # Handed out again: collect_stale_manifests() measures the grace period from here
+        os.utime(path)
+        return name
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    images = SKUImages.objects.filter(sku_id=sku_id, version_id__in=version_ids, label__isnull=False)
+    schema = manifest_schema(pa)
+    tmp_path = os.path.join(directory, f'.{uuid.uuid4().hex}.tmp')
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in _batches(pa, schema, images):
+                writer.write_batch(batch)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return name
+
+
+def collect_stale_manifests(grace=None):
+    """
+    Delete manifests superseded by a newer snapshot of the same selection,
+    plus leftover temporary files. Anything handed out more recently than
+    ``grace`` (SKU_MANIFEST_GC_GRACE) is kept, a job launched with its path
+    may not have opened it yet. Returns the number of files removed.
+    """
+    grace = settings.SKU_MANIFEST_GC_GRACE if grace is None else grace
+    cutoff = time.time() - grace.total_seconds()
+    root = default_storage.path(MANIFEST_ROOT)
+    if not os.path.isdir(root):
+        return 0
+
+    removed = 0
+    for dir_path, _, file_names in os.walk(root):
+        newest = {}  # selection -> name of its latest snapshot
+        mtimes = {}
+        for file_name in file_names:
+            mtimes[file_name] = os.path.getmtime(os.path.join(dir_path, file_name))
+            if file_name.endswith('.arrow'):
+                selection = file_name.split('-')[0]
+                if selection not in newest or mtimes[file_name] > mtimes[newest[selection]]:
+                    newest[selection] = file_name
+
+        latest = set(newest.values())
+        for file_name, mtime in mtimes.items():
+            if file_name in latest or mtime >= cutoff:
+                continue
+            try:
+                os.remove(os.path.join(dir_path, file_name))
+                removed += 1
+            except OSError:  # Already gone, or still mapped by a job on Windows
+                pass
+    return removed
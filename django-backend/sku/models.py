@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.db.models import Q
 from workspace.models import *
 # Create your models here.
 
@@ -9,6 +12,13 @@ class Tags(models.Model):
     is_active = models.BooleanField(default=True,null=True)
 
 
+class LiveSKUManager(models.Manager):
+    """SKUs not marked for deletion; the background deletion job reaches the others through SKU.all_objects."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class SKU(models.Model):
     class Meta:
         db_table = "SKU"
@@ -19,6 +29,11 @@ class SKU(models.Model):
     updated_date_time  = models.CharField(max_length=100,blank=True,null=True)
     max_count = models.PositiveBigIntegerField(default=5, null=True, blank=True)
     count = models.PositiveBigIntegerField(default=0, null=True, blank=True)
+    revision = models.PositiveBigIntegerField(default=0)  # Bumped on changes to the SKU or anything under it (see sku.revisions)
+    is_deleted = models.BooleanField(default=False)  # Tombstone while sku.sku_deletion removes its rows and files
+
+    objects = LiveSKUManager()
+    all_objects = models.Manager()
     
 class Labels(models.Model):
     class Meta:
@@ -28,21 +43,47 @@ class Labels(models.Model):
     shortcut_key = models.CharField(max_length=100,blank=True,null=True)
     color_code = models.CharField(max_length=100,blank=True,null=True)
     is_active = models.BooleanField(default=True,null=True)
+    revision = models.PositiveBigIntegerField(default=0)
     
 class Versions(models.Model):
     class Meta:
         db_table = "Versions"
     name = models.CharField(max_length=100,blank=True,null=True)
     sku = models.ForeignKey(SKU,on_delete=models.CASCADE,null=True)
+    revision = models.PositiveBigIntegerField(default=0)  # Bumped on changes to the version or its images
 
 def sku_image_upload_path(instance, filename):
     version_name = instance.version.name if instance.version and instance.version.name else "default"
     return f'sku_images/{instance.sku.id}/{version_name}/{filename}'
 
 
+class ImageBlob(models.Model):
+    """A stored image file, shared by every SKUImages row with the same content."""
+    class Meta:
+        db_table = "ImageBlob"
+
+    content_hash = models.CharField(max_length=32, unique=True)
+    file = models.CharField(max_length=255)  # Path relative to MEDIA_ROOT
+    size = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class SKUImages(models.Model):
     class Meta:
         db_table = "SKUImages"
+        # Composite/partial indexes for the hot filters, see the benchmark_image_indexes command
+        indexes = [
+            # Upload and merge dedup by content within a version
+            models.Index(fields=['sku', 'version', 'content_hash'], name='skuimages_ver_hash_idx'),
+            # Filename lookups (overwrite, merge) within a version
+            models.Index(fields=['sku', 'version', 'original_filename'], name='skuimages_ver_name_idx'),
+            # DataSetViewset: labeled images of some versions
+            models.Index(fields=['sku', 'version', 'label'], name='skuimages_labeled_idx', condition=Q(label__isnull=False)),
+            # FinalDataSet: labeled images already in the dataset
+            models.Index(fields=['sku', 'label'], name='skuimages_dataset_idx', condition=Q(data_set=True, label__isnull=False)),
+            # Shared previews/blobs: is this content still used anywhere
+            models.Index(fields=['content_hash'], name='skuimages_hash_idx'),
+        ]
 
     sku = models.ForeignKey('SKU', on_delete=models.CASCADE)
     tags = models.CharField(max_length=100, blank=True, null=True)
@@ -54,9 +95,92 @@ class SKUImages(models.Model):
     rejected = models.BooleanField(default=False)  # Flag to indicate if the image was rejected
     split_label = models.CharField(max_length=100, blank=True, null=True)  # Store split label if applicable
     data_set = models.BooleanField(default=False)  # Flag to indicate if the image is part of a dataset
+    captured_at = models.DateTimeField(null=True, blank=True)  # Camera timestamp of captured frames
+    perceptual_hash = models.CharField(max_length=16, null=True, blank=True)  # 64-bit dHash (hex) for near-duplicate lookup
+    previews = models.JSONField(default=dict, blank=True)  # {"<px>": storage name of the WebP preview}
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    blob = models.ForeignKey(ImageBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='images')  # Set when `image` points at a shared blob
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)  # Bytes of the stored image
     def __str__(self):
         return f"{self.original_filename or self.image.name} ({self.sku.id})"
     
+class VersionImageStats(models.Model):
+    """
+    Image counters of a version, one row per (label, rejected, data_set,
+    split_label) combination. Maintained by sku.version_stats.
+    """
+    class Meta:
+        db_table = "VersionImageStats"
+
+    version = models.ForeignKey(Versions, on_delete=models.CASCADE, related_name='image_stats')
+    label = models.ForeignKey(Labels, on_delete=models.SET_NULL, null=True, blank=True)  # Follows SKUImages.label
+    rejected = models.BooleanField(default=False)
+    data_set = models.BooleanField(default=False)
+    split_label = models.CharField(max_length=100, blank=True, null=True)
+    image_count = models.BigIntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+
+
+class UploadSession(models.Model):
+    """Resumable chunked upload of a large archive (or single image) into a SKU version."""
+    class Meta:
+        db_table = "UploadSession"
+
+    STATUS_OPEN = 'open'
+    STATUS_FINALIZING = 'finalizing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_EXPIRED = 'expired'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sku = models.ForeignKey(SKU, on_delete=models.CASCADE)
+    version = models.ForeignKey(Versions, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    tags = models.CharField(max_length=100, blank=True, null=True)
+    allow_duplicates = models.BooleanField(default=False)
+    overwrite = models.BooleanField(default=False)
+    near_duplicate_distance = models.PositiveSmallIntegerField(null=True, blank=True)
+    chunk_size = models.PositiveBigIntegerField()
+    total_chunks = models.PositiveIntegerField()
+    total_size = models.PositiveBigIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, default=STATUS_OPEN)
+    result = models.JSONField(default=dict, blank=True, null=True)  # Upload summary or error once finalized
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+
+class IngestJob(models.Model):
+    """Upload or capture batch spooled to disk and processed by the ingest worker pool."""
+    class Meta:
+        db_table = "IngestJob"
+
+    KIND_UPLOAD = 'upload'
+    KIND_CAPTURE = 'capture'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sku = models.ForeignKey(SKU, on_delete=models.CASCADE)
+    version = models.ForeignKey(Versions, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, default=KIND_UPLOAD)
+    tags = models.CharField(max_length=100, blank=True, null=True)
+    allow_duplicates = models.BooleanField(default=False)
+    overwrite = models.BooleanField(default=False)
+    near_duplicate_distance = models.PositiveSmallIntegerField(null=True, blank=True)
+    manifest = models.JSONField(default=list, blank=True)  # [{"file": spooled name, "filename": ..., "captured_at": ...}]
+    status = models.CharField(max_length=20, default=STATUS_QUEUED)
+    total_files = models.PositiveIntegerField(default=0)
+    processed_files = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True, null=True)  # Upload summary or error once finished
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+
 class TestResultsFolder(models.Model):
     class Meta:
         db_table = "TestResultsFolder"
@@ -0,0 +1,154 @@
+from collections import defaultdict
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+HASH_BITS = 64
+# Hamming distance limit accepted by the API; larger radii stop being "near" duplicates
+MAX_DISTANCE = 16
+
+
+def dhash(stream, hash_size=8):
+    """
+    Difference hash of an image stream as a 16-char hex string, or None when
+    the stream is not a readable image.
+
+    The image is shrunk to (hash_size + 1) x hash_size grayscale and each bit
+    records whether a pixel is brighter than its right neighbour, so small
+    exposure or noise changes between frames flip few (or no) bits.
+    """
+    try:
+        with Image.open(stream) as image:
+            # Lets the JPEG decoder produce a downscaled image directly instead of the full frame
+            image.draft('L', (hash_size * 8, hash_size * 8))
+            pixels = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{value:016x}"
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def hash_blocks(max_distance):
+    """(shift, mask) of the max_distance + 1 blocks a 64-bit hash is cut into."""
+    count = max_distance + 1
+    bounds = [HASH_BITS * i // count for i in range(count + 1)]
+    return [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+
+
+class HammingIndex:
+    """
+    Multi-index hashing lookup of 64-bit hashes within ``max_distance``.
+
+    The hash is cut into max_distance + 1 blocks; by the pigeonhole principle
+    two hashes within max_distance bits agree exactly on at least one block,
+    so only entries sharing a block value are compared bit by bit.
+    """
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        self.blocks = hash_blocks(max_distance)
+        self.tables = [defaultdict(list) for _ in self.blocks]
+        self.values = []
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, value, item):
+        """Index an int hash; returns its position in the index."""
+        position = len(self.items)
+        self.values.append(value)
+        self.items.append(item)
+        for table, (shift, mask) in zip(self.tables, self.blocks):
+            table[(value >> shift) & mask].append(position)
+        return position
+
+    def search(self, value, distance=None):
+        """Return [(position, distance)] of indexed hashes within ``distance`` of ``value``."""
+        distance = self.max_distance if distance is None else min(distance, self.max_distance)
+        seen = set()
+        matches = []
+        for table, (shift, mask) in zip(self.tables, self.blocks):
+            for position in table.get((value >> shift) & mask, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                d = hamming(value, self.values[position])
+                if d <= distance:
+                    matches.append((position, d))
+        return matches
+
+
+def _block_pairs(values, shift, mask, distance):
+    """
+    Positions (i, j), i < j, of ``values`` that share the block selected by
+    shift/mask and are within ``distance`` bits of each other.
+    """
+    keys = (values >> np.uint64(shift)) & np.uint64(mask)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    group_end = np.repeat(ends, ends - starts)
+
+    firsts, seconds = [], []
+    active = np.arange(len(order))
+    offset = 1
+    # Compare every member with the one `offset` places later in its group,
+    # dropping members whose group has no such neighbour left
+    while True:
+        active = active[active + offset < group_end[active]]
+        if not len(active):
+            break
+        a, b = order[active], order[active + offset]
+        close = np.bitwise_count(values[a] ^ values[b]) <= distance
+        firsts.append(a[close])
+        seconds.append(b[close])
+        offset += 1
+    if not firsts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def near_duplicate_clusters(rows, distance):
+    """
+    Group (perceptual_hash_hex, payload) rows into clusters of images within
+    ``distance`` bits of at least one other member (single linkage).
+    Returns lists of payloads, largest cluster first, singletons left out.
+
+    Identical hashes are collapsed first; the remaining distinct values are
+    compared block-wise with numpy (same pigeonhole argument as HammingIndex),
+    which keeps 100k-image versions at interactive speed.
+    """
+    if not rows:
+        return []
+    values = np.array([int(hash_hex, 16) for hash_hex, _ in rows], dtype=np.uint64)
+    unique_values, inverse = np.unique(values, return_inverse=True)
+
+    parent = list(range(len(unique_values)))
+
+    def find(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    for shift, mask in hash_blocks(distance):
+        for a, b in zip(*_block_pairs(unique_values, shift, mask, distance)):
+            root_a, root_b = find(int(a)), find(int(b))
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = defaultdict(list)
+    for position, (_, payload) in zip(inverse.tolist(), rows):
+        clusters[find(position)].append(payload)
+    return sorted((members for members in clusters.values() if len(members) > 1), key=len, reverse=True)
@@ -0,0 +1,70 @@
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import SKUImages
+
+PREVIEW_ROOT = 'previews'
+PREVIEW_QUALITY = 80
+
+
+def preview_name(content_hash, size):
+    """Previews are keyed by content, so rows sharing bytes share their previews."""
+    return f'{PREVIEW_ROOT}/{content_hash[:2]}/{content_hash}_{size}.webp'
+
+
+def generate_previews(stream, content_hash, sizes=None):
+    """
+    Write WebP previews (longest side = each of ``sizes``, never upscaled) of an
+    image stream. Returns (previews, width, height) with previews mapping the
+    size as a string to its storage name, or ({}, None, None) when the stream is
+    not a readable image. Previews already present for this content are reused.
+    """
+    sizes = sorted(settings.SKU_PREVIEW_SIZES if sizes is None else sizes, reverse=True)
+    try:
+        with Image.open(stream) as image:
+            width, height = image.size
+            if not sizes:
+                return {}, width, height
+
+            previews = {str(size): preview_name(content_hash, size) for size in sizes}
+            missing = [size for size in sizes if not default_storage.exists(previews[str(size)])]
+            if not missing:
+                return previews, width, height
+
+            # JPEG frames can be decoded straight at (close to) the largest preview size
+            image.draft('RGB', (missing[0], missing[0]))
+            current = ImageOps.exif_transpose(image)
+            if current.mode not in ('RGB', 'RGBA', 'L'):
+                current = current.convert('RGBA' if 'A' in current.getbands() else 'RGB')
+
+            # Shrink step by step from the largest size, each step starts from the previous result
+            for size in missing:
+                current = current.copy()
+                current.thumbnail((size, size), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                current.save(buffer, 'WEBP', quality=PREVIEW_QUALITY, method=4)
+                name = previews[str(size)]
+                if not default_storage.exists(name):
+                    default_storage.save(name, ContentFile(buffer.getvalue()))
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return {}, None, None
+    return previews, width, height
+
+
+def delete_previews(previews):
+    for name in (previews or {}).values():
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def release_previews(content_hash, previews, exclude_ids=()):
+    """Delete the previews of ``content_hash`` unless another SKUImages row still shows that content."""
+    if not previews:
+        return
+    if content_hash and SKUImages.objects.filter(content_hash=content_hash).exclude(id__in=list(exclude_ids)).exists():
+        return
+    delete_previews(previews)
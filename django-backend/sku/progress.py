@@ -0,0 +1,20 @@
+import time
+import uuid
+from collections import deque
+
+# Shared buffer behind the training/testing progress SSE streams. Long running
+# jobs (uploads, deletes, merges) push their updates here as well so the UI can
+# follow them on the same channel.
+progress_queue = deque(maxlen=1000)
+
+
+def push_progress(job_id, progress, status_msg):
+    update = {
+        "id": str(uuid.uuid4()),
+        "job_id": job_id,
+        "progress": progress,
+        "status": status_msg,
+        "timestamp": time.time()
+    }
+    progress_queue.append(update)
+    return update
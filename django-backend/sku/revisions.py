@@ -0,0 +1,121 @@
+import functools
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .models import SKU, Labels, Versions
+
+# Write paths bump these counters; list endpoints derive their ETag from them
+# so an unchanged listing is answered with 304 before its queryset runs.
+#   SKU.revision      - the SKU, its versions, labels or images changed
+#   Versions.revision - the version or its images changed
+#   Labels.revision   - the label changed
+
+
+def bump_skus(sku_ids):
+    SKU.objects.filter(id__in=list(sku_ids)).update(revision=F('revision') + 1)
+
+
+def bump_versions(version_ids):
+    """Bump the versions and the SKUs they belong to."""
+    version_ids = list(version_ids)
+    if not version_ids:
+        return
+    Versions.objects.filter(id__in=version_ids).update(revision=F('revision') + 1)
+    SKU.objects.filter(versions__id__in=version_ids).update(revision=F('revision') + 1)
+
+
+def bump_labels(labels):
+    """Bump the labels and their SKUs; a global (SKU-less) label shows up under every SKU."""
+    Labels.objects.filter(id__in=[label.id for label in labels]).update(revision=F('revision') + 1)
+    if any(label.sku_id is None for label in labels):
+        SKU.objects.update(revision=F('revision') + 1)
+    else:
+        bump_skus({label.sku_id for label in labels})
+
+
+def queryset_revision(queryset):
+    """
+    Identify the state of a set of rows: count, highest id and summed revision.
+    Counters only grow and ids are not reused, so any added, removed or bumped
+    row changes the result.
+    """
+    state = queryset.aggregate(count=Count('id'), last=Max('id'), total=Sum('revision'))
+    return state['count'], state['last'], state['total'] or 0
+
+
+def listing_etag(request, revision):
+    """Weak ETag of a listing response: the revision plus everything else its body depends on."""
+    raw = '|'.join([
+        request.get_full_path(),
+        request.get_host(),  # Image URLs are absolute
+        request.META.get('HTTP_ACCEPT', ''),
+        repr(revision),
+    ])
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def conditional_list(revision):
+    """
+    Decorate a list action with ETag / If-None-Match handling.
+    ``revision(request)`` returns the counters describing the listed data; a
+    client sending back the ETag of an unchanged listing gets 304 Not Modified
+    without the view running. Bad filter values fall through to the view,
+    which answers them as before.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            try:
+                etag = listing_etag(request, revision(request))
+            except (ValueError, TypeError, ValidationError):
+                return view(self, request, *args, **kwargs)
+
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+
+            response = view(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                # Cached copies must be revalidated, which is what makes the 304 path useful
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def sku_list_revision(request):
+    skus = SKU.objects.all()
+    if request.query_params.get('workspace_id'):
+        skus = skus.filter(workspace_id=request.query_params['workspace_id'])
+    if request.query_params.get('tag_id'):
+        skus = skus.filter(tag_id=request.query_params['tag_id'])
+    return queryset_revision(skus)
+
+
+def version_list_revision(request):
+    versions = Versions.objects.all()
+    if request.query_params.get('sku'):
+        versions = versions.filter(sku_id=request.query_params['sku'])
+    return queryset_revision(versions)
+
+
+def image_list_revision(request):
+    """Image listings are scoped by their sku_id/version_id filters, other filters only narrow the rows."""
+    skus = SKU.objects.all()
+    if request.query_params.get('sku_id'):
+        skus = skus.filter(id=request.query_params['sku_id'])
+    revision = queryset_revision(skus)
+    if request.query_params.get('version_id'):
+        revision += queryset_revision(Versions.objects.filter(id=request.query_params['version_id']))
+    return revision
+
+
+def label_list_revision(request):
+    labels = Labels.objects.all()
+    if request.query_params.get('sku') is not None:
+        labels = labels.filter(sku_id=request.query_params['sku'])
+    return queryset_revision(labels)
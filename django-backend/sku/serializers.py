@@ -1,6 +1,26 @@
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.encoding import filepath_to_uri
 from rest_framework import serializers
 from .models import SKU,SKUImages
 
+def annotate_sku_listing(queryset):
+    """
+    Add what SKUSerializer shows per SKU (tag, version count, image count and
+    first image path) to the SKU query itself, so listing N SKUs is one query.
+    """
+    images = SKUImages.objects.filter(sku=OuterRef('pk'))
+    return queryset.select_related('tag').annotate(
+        version_count=Count('versions', distinct=True),
+        image_count=Coalesce(
+            Subquery(images.order_by().values('sku').annotate(total=Count('id')).values('total')[:1]),
+            0
+        ),
+        first_image_path=Subquery(images.order_by('id').values('image')[:1]),
+    )
+
+
 class SKUSerializer(serializers.ModelSerializer):
     tag_name = serializers.SerializerMethodField()
     version_count = serializers.SerializerMethodField()
@@ -9,26 +29,38 @@ class SKUSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = SKU
-        fields = '__all__'  # ✅ Use correct "__all__"
+        exclude = ['revision', 'is_deleted']  # Internal change counter (sku.revisions) and deletion tombstone
         extra_fields = ['tag_name', 'version_count', 'image_count', 'first_image']
 
+    # SKUs loaded through annotate_sku_listing carry the counts already,
+    # the per-object queries below only run for plain instances
+
     def get_tag_name(self, obj):
         return obj.tag.name if obj.tag else None
 
     def get_version_count(self, obj):
+        if hasattr(obj, 'version_count'):
+            return obj.version_count
         return obj.versions_set.count()
 
     def get_image_count(self, obj):
+        if hasattr(obj, 'image_count'):
+            return obj.image_count
         return SKUImages.objects.filter(sku=obj).count()
 
     def get_first_image(self, obj):
-        first_image = SKUImages.objects.filter(sku=obj).order_by('id').first()
-        if first_image and first_image.image:
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(first_image.image.url)
-            return first_image.image.url
-        return None
+        if hasattr(obj, 'first_image_path'):
+            name = obj.first_image_path
+        else:
+            first_image = SKUImages.objects.filter(sku=obj).order_by('id').first()
+            name = first_image.image.name if first_image else None
+        if not name:
+            return None
+        url = SKUImages._meta.get_field('image').storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
 
 
@@ -38,18 +70,29 @@ class SKUImagesSerializer(serializers.ModelSerializer):
     label_id = serializers.IntegerField(source='label.id', read_only=True)
     label_name = serializers.CharField(source='label.name', read_only=True)
     label_color_code = serializers.CharField(source='label.color_code', read_only=True)
+    previews = serializers.SerializerMethodField()
 
     class Meta:
         model = SKUImages
         fields = [
             'id', 'sku', 'sku_name', 'tags', 'image',
             'original_filename', 'content_hash', 'version', 'version_name',
-            'label_id', 'label_name', 'label_color_code','rejected','data_set','split_label'
+            'label_id', 'label_name', 'label_color_code','rejected','data_set','split_label',
+            'previews', 'width', 'height'
         ]
 
     def get_sku_name(self, obj):
         return obj.sku.name if obj.sku else None
 
+    def get_previews(self, obj):
+        # {"128": url, "512": url, ...}; empty until previews exist (see backfill_previews)
+        request = self.context.get('request')
+        previews = {}
+        for size, name in (obj.previews or {}).items():
+            url = default_storage.url(name)
+            previews[size] = request.build_absolute_uri(url) if request is not None else url
+        return previews
+
 
 
 class SKUImageLabelSerializer(serializers.ModelSerializer):
@@ -76,4 +119,168 @@ class SKUImageLabelSerializer(serializers.ModelSerializer):
             return 0
         elif obj.label and obj.label.name.lower() == "bad":
             return 1
-        return None
\ No newline at end of file
+        return None
+
+
+
+class ValuesRowSerializer:
+    """
+    Read-only counterpart of a serializer for large listings: rows with the
+    same JSON shape, built from one QuerySet.values() query (related names
+    joined in) instead of a model instance and serializer round trip per row.
+
+    ``field_sources`` maps each output field to the values() lookups it reads;
+    a ``to_<field>`` method converts them when the raw value is not the output.
+    ``optional_relations`` lists fields the serializer leaves out when the
+    relation they go through (given as its `<name>_id` lookup) is empty.
+    """
+    field_sources = {}
+    optional_relations = {}
+
+    def __init__(self, fields=None, context=None):
+        self.fields = list(self.field_sources) if fields is None else fields
+        self.context = context or {}
+        self._url_prefix = None
+        self._file_url_base = None
+
+    @classmethod
+    def parse_fields(cls, value):
+        """`fields` query param ("id,image") as a list, None when absent. Raises ValueError on unknown fields."""
+        if not value:
+            return None
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in cls.field_sources]
+        if unknown or not fields:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown) or value}. Allowed: {', '.join(cls.field_sources)}")
+        return fields
+
+    def lookups(self):
+        lookups = {}
+        for field in self.fields:
+            lookups.update(dict.fromkeys(self.field_sources[field]))
+            if field in self.optional_relations:
+                lookups[self.optional_relations[field]] = None
+        return list(lookups)
+
+    def values(self, queryset, *extra):
+        """The values() queryset to build rows from; ``extra`` lookups are fetched too (e.g. the pagination key)."""
+        return queryset.values(*dict.fromkeys(self.lookups() + list(extra)))
+
+    def to_rows(self, values):
+        return list(self.iter_rows(values))
+
+    def iter_rows(self, values):
+        """Build rows one at a time from ``values``, for streaming responses."""
+        plan = [
+            (field, self.field_sources[field], getattr(self, f'to_{field}', None), self.optional_relations.get(field))
+            for field in self.fields
+        ]
+        for row_values in values:
+            row = {}
+            for field, sources, convert, relation in plan:
+                if relation and row_values[relation] is None:
+                    continue
+                if convert:
+                    row[field] = convert(*(row_values[source] for source in sources))
+                else:
+                    row[field] = row_values[sources[0]]
+            yield row
+
+    def serialize(self, queryset):
+        return self.to_rows(self.values(queryset))
+
+    def stream(self, queryset, chunk_size=2000):
+        """Rows of ``queryset`` produced while the values() query is read in chunks of ``chunk_size``."""
+        return self.iter_rows(self.values(queryset).iterator(chunk_size=chunk_size))
+
+    def media_url(self, name):
+        """Absolute URL of a stored file name, as a DRF FileField/ImageField renders it."""
+        if not name:
+            return None
+        if self._url_prefix is None:
+            # build_absolute_uri() of a path only prepends scheme and host, work that out once per listing
+            request = self.context.get('request')
+            self._url_prefix = request.build_absolute_uri('/')[:-1] if request is not None else ''
+            if isinstance(default_storage, FileSystemStorage):
+                base_url = default_storage.base_url
+                self._file_url_base = self._url_prefix + base_url if base_url.startswith('/') else base_url
+        if self._file_url_base is not None:
+            uri = filepath_to_uri(name).lstrip('/')
+            # FileSystemStorage.url() minus its urljoin(), which only changes names with dot segments
+            if not (uri.startswith('.') or '/.' in uri):
+                return self._file_url_base + uri
+        url = default_storage.url(name)
+        return self._url_prefix + url if url.startswith('/') else url
+
+
+class SKUImageRows(ValuesRowSerializer):
+    """SKUImagesSerializer output built from values()."""
+    field_sources = {
+        'id': ('id',),
+        'sku': ('sku_id',),
+        'sku_name': ('sku__name',),
+        'tags': ('tags',),
+        'image': ('image',),
+        'original_filename': ('original_filename',),
+        'content_hash': ('content_hash',),
+        'version': ('version_id',),
+        'version_name': ('version__name',),
+        'label_id': ('label_id',),
+        'label_name': ('label__name',),
+        'label_color_code': ('label__color_code',),
+        'rejected': ('rejected',),
+        'data_set': ('data_set',),
+        'split_label': ('split_label',),
+        'previews': ('previews',),
+        'width': ('width',),
+        'height': ('height',),
+    }
+    optional_relations = {
+        'version_name': 'version_id',
+        'label_id': 'label_id',
+        'label_name': 'label_id',
+        'label_color_code': 'label_id',
+    }
+
+    def to_image(self, name):
+        return self.media_url(name)
+
+    def to_previews(self, previews):
+        return {size: self.media_url(name) for size, name in (previews or {}).items()}
+
+
+class SKUImageLabelRows(ValuesRowSerializer):
+    """SKUImageLabelSerializer output built from values()."""
+    field_sources = {
+        'image': ('image',),
+        'label_id': ('label__name',),
+        'split_label': ('split_label',),
+    }
+
+    def to_image(self, name):
+        if self.context.get('absolute_path', False):
+            try:
+                return default_storage.path(name) if name else None
+            except NotImplementedError:
+                return None
+        return self.media_url(name)
+
+    def to_label_id(self, label_name):
+        return {"good": 0, "bad": 1}.get((label_name or '').lower())
+
+
+
+class DataSetImageRows(ValuesRowSerializer):
+    """FinalDataSet image entries built from values(); `version`/`version_id` name the group an entry belongs to."""
+    field_sources = {
+        'version': ('version_group',),
+        'version_id': ('version_id',),
+        'image_url': ('image',),
+        'label_id': ('label_id',),
+        'label_name': ('label__name',),
+        'split_label': ('split_label',),
+        'data_set': ('data_set',),
+    }
+
+    def to_image_url(self, name):
+        return self.media_url(name) or ""
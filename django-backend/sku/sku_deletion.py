@@ -0,0 +1,117 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .blobs import release_files
+from .models import SKU, SKUImages
+from .progress import push_progress
+from .tasks import delete_sku_task
+
+logger = logging.getLogger(__name__)
+
+# Images deleted per transaction
+DELETE_BATCH_SIZE = 2000
+
+_executor = None
+
+
+def deletion_job_key(sku_id):
+    """job_id of the deletion's updates on the progress SSE channel."""
+    return f"sku-delete-{sku_id}"
+
+
+def sku_folder(sku_id):
+    return f"sku_images/{sku_id}"
+
+
+def mark_sku_deleted(sku):
+    """
+    Tombstone ``sku`` (it drops out of SKU.objects, hence every listing) and
+    queue the job removing its rows and files once this transaction commits.
+    Returns the progress job_id.
+    """
+    SKU.all_objects.filter(id=sku.id).update(is_deleted=True)
+    transaction.on_commit(partial(dispatch_sku_deletion, sku.id))
+    return deletion_job_key(sku.id)
+
+
+def _release_batch(sku_id, rows):
+    # Files under the SKU folder go with its rmtree at the end, unlinking them one by one as well would race it
+    folder = sku_folder(sku_id) + '/'
+    release_files([
+        {**row, 'image': None} if (row['image'] or '').startswith(folder) else row
+        for row in rows
+    ])
+
+
+def delete_sku(sku_id):
+    """
+    Delete a tombstoned SKU: its images in batches of DELETE_BATCH_SIZE, then
+    the SKU row with everything cascading from it, then the sku_images/<id>
+    tree. Each step is committed on its own, so an interrupted deletion
+    resumes where it stopped. Live SKUs are left alone.
+    """
+    job_key = deletion_job_key(sku_id)
+    if not SKU.all_objects.filter(id=sku_id, is_deleted=True).exists():
+        return
+
+    try:
+        images = SKUImages.objects.filter(sku_id=sku_id)
+        total = images.count()
+        done = 0
+        push_progress(job_key, 0, f"Deleting {total} image(s)")
+        while True:
+            with transaction.atomic():
+                rows = list(images.order_by('id').values('id', 'image', 'blob_id', 'content_hash', 'previews')[:DELETE_BATCH_SIZE])
+                if not rows:
+                    break
+                # No statistics updates: the versions they belong to are deleted below
+                SKUImages.objects.filter(id__in=[row['id'] for row in rows]).delete()
+                _release_batch(sku_id, rows)
+            done += len(rows)
+            push_progress(job_key, round(min(done, total) * 90 / max(total, 1), 2), f"Deleted {done}/{total} image(s)")
+
+        with transaction.atomic():
+            SKU.all_objects.filter(id=sku_id).delete()
+
+        folder_path = default_storage.path(sku_folder(sku_id))
+        if os.path.exists(folder_path):
+            shutil.rmtree(folder_path)
+    except Exception as e:
+        logger.exception("Deleting SKU %s failed", sku_id)
+        push_progress(job_key, 100, f"Failed: {e}")
+        return
+
+    push_progress(job_key, 100, "SKU and its associated versions, images, and folders deleted successfully")
+
+
+def _run_in_thread(sku_id):
+    try:
+        delete_sku(sku_id)
+    finally:
+        close_old_connections()
+
+
+def _thread_executor():
+    global _executor
+    if _executor is None:
+        # One deletion at a time, they are bound by the same disk and database
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sku-delete')
+    return _executor
+
+
+def dispatch_sku_deletion(sku_id):
+    """Hand the deletion to Celery or the in-process executor, like the ingest jobs (SKU_INGEST_BACKEND)."""
+    if settings.SKU_INGEST_BACKEND == 'celery':
+        try:
+            delete_sku_task.delay(sku_id)
+            return
+        except Exception as e:
+            logger.warning("Celery broker unavailable (%s), deleting SKU %s in-process", e, sku_id)
+    _thread_executor().submit(_run_in_thread, sku_id)
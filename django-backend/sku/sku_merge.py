@@ -0,0 +1,110 @@
+import errno
+import os
+
+from django.core.files.storage import default_storage
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from .blobs import PLACED_COPIED, PLACED_RENAMED, place_file, unplace_file
+from .models import SKUImages, TestResults
+
+
+def version_folder(sku_id, version_name):
+    return f'sku_images/{sku_id}/{version_name}'
+
+
+def _folder_is_exclusive(folder, version_id, names):
+    """
+    True when ``folder`` holds nothing but ``names``, the files of the images
+    of ``version_id``, so it can move as a whole.
+    """
+    try:
+        with os.scandir(default_storage.path(folder)) as entries:
+            if sorted(entry.name for entry in entries) != sorted(os.path.basename(name) for name in names):
+                return False
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    prefix = folder + '/'
+    return not (
+        SKUImages.objects.filter(image__startswith=prefix).exclude(version_id=version_id).exists()
+        or TestResults.objects.filter(image__startswith=prefix).exists()
+    )
+
+
+class VersionFileMove:
+    """
+    Moves the files of one version into another SKU/version folder before the
+    rows are updated: a whole-directory rename where the version owns its
+    folder, file by file otherwise. apply_paths() rewrites the image names of
+    the moved rows; undo() puts the files back if the rows could not be saved.
+    """
+
+    def __init__(self, source_sku_id, version_id, target_folder):
+        self.source_root = f'sku_images/{source_sku_id}/'
+        self.version_id = version_id
+        self.target_folder = target_folder
+        self.renamed_folders = []  # (old folder, new folder) storage names
+        self.renamed_files = {}  # image id -> new storage name
+        self.placed = []  # (source path, target path, how) for undo()
+        self.copied_sources = []  # Storage names of sources copied rather than renamed
+
+    def run(self, on_file=None):
+        """Move the files; ``on_file(count)`` is called as files are moved. Returns the number of files moved."""
+        rows = SKUImages.objects.filter(version_id=self.version_id, blob__isnull=True).exclude(image='').values_list('id', 'image')
+        by_folder = {}
+        for image_id, name in rows:
+            by_folder.setdefault(os.path.dirname(name), []).append((image_id, name))
+
+        moved = 0
+        for folder, images in by_folder.items():
+            target_path = default_storage.path(self.target_folder)
+            if (
+                folder.startswith(self.source_root)
+                and not os.path.exists(target_path)
+                and _folder_is_exclusive(folder, self.version_id, [name for _, name in images])
+            ):
+                source_path = default_storage.path(folder)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                try:
+                    os.rename(source_path, target_path)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    # Another filesystem: go file by file, copying
+                else:
+                    self.placed.append((source_path, target_path, PLACED_RENAMED))
+                    self.renamed_folders.append((folder, self.target_folder))
+                    moved += len(images)
+                    if on_file:
+                        on_file(len(images))
+                    continue
+            for image_id, name in images:
+                source_path = default_storage.path(name)
+                if not os.path.exists(source_path):
+                    continue
+                new_name = default_storage.get_available_name(f'{self.target_folder}/{os.path.basename(name)}')
+                target_path = default_storage.path(new_name)
+                how = place_file(source_path, target_path, move=True)
+                self.placed.append((source_path, target_path, how))
+                if how == PLACED_COPIED:
+                    self.copied_sources.append(name)
+                self.renamed_files[image_id] = new_name
+                moved += 1
+                if on_file:
+                    on_file(1)
+        return moved
+
+    def apply_paths(self, images):
+        """Point ``images`` (the moved rows) at their new file names with one UPDATE per moved folder plus one bulk_update."""
+        for old_folder, new_folder in self.renamed_folders:
+            old_prefix = old_folder + '/'
+            images.filter(image__startswith=old_prefix).update(
+                image=Concat(Value(new_folder + '/'), Substr('image', len(old_prefix) + 1))
+            )
+        if self.renamed_files:
+            rows = [SKUImages(id=image_id, image=name) for image_id, name in self.renamed_files.items()]
+            SKUImages.objects.bulk_update(rows, ['image'], batch_size=500)
+
+    def undo(self):
+        for source_path, target_path, how in reversed(self.placed):
+            unplace_file(source_path, target_path, how)
@@ -0,0 +1,73 @@
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Rows fetched per database round trip by QuerySet.iterator()
+STREAM_CHUNK_SIZE = 2000
+# Rows encoded into one chunk of the response body
+ROWS_PER_WRITE = 500
+
+STREAM_MODES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Same output as DRF's JSONRenderer: compact separators, UTF-8 rather than \u escapes
+_encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def encode(value):
+    return _encoder.encode(value)
+
+
+def stream_mode(request):
+    """
+    The `stream` query param ("json" or "ndjson"), None when the regular
+    Response is wanted. Raises ValueError on other values.
+    """
+    mode = request.query_params.get('stream')
+    if not mode:
+        return None
+    mode = mode.lower()
+    if mode not in STREAM_MODES:
+        raise ValueError(f"Invalid stream value. Allowed: {', '.join(STREAM_MODES)}")
+    return mode
+
+
+def _batched(chunks):
+    """Join encoded pieces into writes of ROWS_PER_WRITE, one yield per row costs more than the encoding."""
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= ROWS_PER_WRITE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def json_array(rows):
+    """Encode ``rows`` as one JSON array, row by row."""
+    yield '['
+    separator = ''
+    for row in rows:
+        yield separator + encode(row)
+        separator = ','
+    yield ']'
+
+
+def ndjson(rows):
+    """Encode ``rows`` as newline-delimited JSON, one row per line."""
+    for row in rows:
+        yield encode(row) + '\n'
+
+
+def streaming_response(chunks, mode):
+    """StreamingHttpResponse sending the encoded ``chunks`` as they are produced."""
+    response = StreamingHttpResponse(_batched(chunks), content_type=STREAM_MODES[mode])
+    # Let reverse proxies pass the body through instead of buffering it
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def stream_rows(rows, mode):
+    return streaming_response(ndjson(rows) if mode == 'ndjson' else json_array(rows), mode)
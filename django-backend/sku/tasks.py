@@ -0,0 +1,37 @@
+# tasks.py
+
+from celery import shared_task
+
+from .blobs import collect_garbage
+from .manifests import collect_stale_manifests
+from .upload_sessions import cleanup_expired_sessions
+
+
+@shared_task
+def cleanup_expired_upload_sessions():
+    count = cleanup_expired_sessions()
+    print(f"🧹 {count} expired upload session(s) cleaned up.")
+
+
+@shared_task
+def collect_unreferenced_blobs():
+    count = collect_garbage()
+    print(f"🧹 {count} unreferenced image blob(s) removed.")
+
+
+@shared_task
+def collect_stale_dataset_manifests():
+    count = collect_stale_manifests()
+    print(f"🧹 {count} stale dataset manifest(s) removed.")
+
+
+@shared_task
+def process_ingest_job_task(job_id):
+    from .ingest_jobs import process_ingest_job
+    process_ingest_job(job_id)
+
+
+@shared_task
+def delete_sku_task(sku_id):
+    from .sku_deletion import delete_sku
+    delete_sku(sku_id)
@@ -1,3 +1,392 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from functools import partial
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .ingest import BulkImageIngestor
+from .manifests import MANIFEST_ROOT, collect_stale_manifests
+from .models import SKU, Labels, SKUImages, Tags, Versions
+from .sku_deletion import delete_sku, deletion_job_key
+from .views import parse_capture_timestamp
+from .version_stats import record_created, version_summaries
+
+
+class TempMediaRootMixin:
+    """Run the test against an empty MEDIA_ROOT removed afterwards, never the configured one."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+def png_bytes(color, size=(8, 8)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class SKUListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tag = Tags.objects.create(name="fruit")
+
+    def create_skus(self, count):
+        for index in range(count):
+            sku = SKU.objects.create(name=f"sku-{index}", tag=self.tag)
+            version = Versions.objects.create(name="v1", sku=sku)
+            Versions.objects.create(name="v2", sku=sku)
+            SKUImages.objects.bulk_create([
+                SKUImages(sku=sku, version=version, image=f"sku/{index}/{n}.png") for n in range(3)
+            ])
+
+    def list_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/sku/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()["results"]
+
+    def test_query_count_does_not_grow_with_skus(self):
+        self.create_skus(2)
+        few_queries, _ = self.list_query_count()
+
+        self.create_skus(10)
+        many_queries, results = self.list_query_count()
+
+        self.assertEqual(len(results), 12)
+        self.assertEqual(few_queries, many_queries)
+        # The ETag revision lookup plus the annotated SKU query
+        self.assertEqual(many_queries, 2)
+
+    def test_list_values(self):
+        self.create_skus(1)
+        SKU.objects.create(name="empty")
+        _, results = self.list_query_count()
+
+        by_name = {sku["name"]: sku for sku in results}
+        self.assertEqual(by_name["sku-0"]["tag_name"], "fruit")
+        self.assertEqual(by_name["sku-0"]["version_count"], 2)
+        self.assertEqual(by_name["sku-0"]["image_count"], 3)
+        self.assertTrue(by_name["sku-0"]["first_image"].endswith("/sku/0/0.png"))
+        self.assertEqual(by_name["empty"]["version_count"], 0)
+        self.assertEqual(by_name["empty"]["image_count"], 0)
+        self.assertIsNone(by_name["empty"]["first_image"])
+        self.assertIsNone(by_name["empty"]["tag_name"])
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.sku = SKU.objects.create(name="etag")
+        self.version = Versions.objects.create(name="v1", sku=self.sku)
+
+    def test_unchanged_listing_is_not_modified(self):
+        url = f'/api/sku-images-list/?sku_id={self.sku.id}&version_id={self.version.id}'
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Only the revision lookups ran, not the listing query
+        self.assertTrue(all('SKUImages' not in query['sql'] for query in queries))
+
+    def test_write_changes_the_etag(self):
+        url = f'/api/versions/?sku={self.sku.id}'
+        etag = self.client.get(url)['ETag']
+
+        self.client.put(f'/api/versions/{self.version.id}/', {"name": "renamed"}, format='json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()["results"][0]["name"], "renamed")
+
+
+class StreamingDataSetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.sku = SKU.objects.create(name="stream")
+        label = Labels.objects.create(name="Good", sku=self.sku)
+        self.versions = [Versions.objects.create(name=name, sku=self.sku) for name in ("b", "a", "a")]
+        for index, version in enumerate(self.versions + [None]):
+            SKUImages.objects.create(
+                sku=self.sku, version=version, image=f"sku/{index}.png", label=label, data_set=True, split_label="train"
+            )
+
+    def test_streamed_json_matches_response(self):
+        for url in (
+            f'/api/final-data-set/?sku_id={self.sku.id}',
+            f'/api/data-set/?sku_id={self.sku.id}&version_id={self.versions[0].id},{self.versions[1].id}',
+        ):
+            expected = self.client.get(url).json()
+            response = self.client.get(url + '&stream=json')
+            self.assertTrue(response.streaming)
+            self.assertEqual(json.loads(b''.join(response.streaming_content)), expected)
+
+    def test_ndjson_rows(self):
+        response = self.client.get(f'/api/final-data-set/?sku_id={self.sku.id}&stream=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row["version"] for row in rows], ["Unknown Version", "a", "a", "b"])
+        self.assertEqual(rows[0]["label_name"], "Good")
+
+    def test_invalid_stream_mode(self):
+        response = self.client.get(f'/api/final-data-set/?sku_id={self.sku.id}&stream=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkDeleteTests(TestCase):
+    def test_delete_reports_and_updates_statistics(self):
+        sku = SKU.objects.create(name="delete")
+        version = Versions.objects.create(name="v1", sku=sku)
+        images = SKUImages.objects.bulk_create([
+            SKUImages(sku=sku, version=version, image=f"sku/{n}.png", file_size=10) for n in range(5)
+        ])
+        record_created(images)
+        ids = [image.id for image in images]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().post(
+                '/api/sku-images/delete/', {"image_ids": ids[:3] + [0, "x"]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["deleted"], ids[:3])
+        self.assertEqual(response.json()["not_found"], [0, "x"])
+        self.assertEqual(list(SKUImages.objects.values_list('id', flat=True).order_by('id')), ids[3:])
+        self.assertEqual(version_summaries([version.id])[version.id]["total_image_count"], 2)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('DELETE')]), 1)
+
+    def test_invalid_and_repeated_ids_are_not_found(self):
+        sku = SKU.objects.create(name="delete")
+        image = SKUImages.objects.create(sku=sku, image="sku/a.png")
+
+        response = APIClient().post(
+            '/api/sku-images/delete/', {"image_ids": [image.id, str(image.id), {"a": 1}, [1], True]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["deleted"], [image.id])
+        self.assertEqual(response.json()["not_found"], [str(image.id), {"a": 1}, [1], True])
+
+
+class SKUDeletionTests(TempMediaRootMixin, TestCase):
+    def test_destroy_tombstones_then_job_deletes(self):
+        client = APIClient()
+        sku = SKU.objects.create(name="gone")
+        version = Versions.objects.create(name="v1", sku=sku)
+        SKUImages.objects.create(sku=sku, version=version, image=f"sku_images/{sku.id}/v1/a.png")
+
+        response = client.delete(f'/api/sku/{sku.id}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["job_id"], deletion_job_key(sku.id))
+        self.assertNotIn(sku.id, [row["id"] for row in client.get('/api/sku/').json()["results"]])
+        self.assertEqual(client.get(f'/api/sku/{sku.id}/').status_code, 404)
+        self.assertTrue(SKU.all_objects.filter(id=sku.id, is_deleted=True).exists())
+
+        delete_sku(sku.id)
+        self.assertFalse(SKU.all_objects.filter(id=sku.id).exists())
+        self.assertFalse(Versions.objects.filter(id=version.id).exists())
+        self.assertFalse(SKUImages.objects.filter(sku_id=sku.id).exists())
+
+
+class MergeSKUTests(TempMediaRootMixin, TestCase):
+    def test_version_folders_move_with_their_rows(self):
+        source = SKU.objects.create(name="source")
+        destination = SKU.objects.create(name="destination")
+        Versions.objects.create(name="v1", sku=destination)
+        version = Versions.objects.create(name="v1", sku=source)
+        images = SKUImages.objects.bulk_create([
+            SKUImages(
+                sku=source, version=version, file_size=1,
+                image=default_storage.save(f"sku_images/{source.id}/v1/{n}.png", ContentFile(b"x"))
+            )
+            for n in range(3)
+        ])
+        record_created(images)
+
+        response = APIClient().post('/api/sku-images/merge-sku/', {
+            "source_sku_id": source.id, "destination_sku_id": destination.id, "delete_source_versions": True
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        new_version = Versions.objects.get(id=response.json()["details"][0]["new_version_id"])
+        self.assertEqual(new_version.name, "v1_1")
+        self.assertFalse(Versions.objects.filter(id=version.id).exists())
+
+        names = sorted(SKUImages.objects.filter(version=new_version, sku=destination).values_list('image', flat=True))
+        self.assertEqual(names, [f"sku_images/{destination.id}/v1_1/{n}.png" for n in range(3)])
+        self.assertTrue(all(default_storage.exists(name) for name in names))
+        self.assertFalse(os.path.exists(default_storage.path(f"sku_images/{source.id}/v1")))
+        self.assertEqual(version_summaries([new_version.id])[new_version.id]["total_image_count"], 3)
+
+
+class VersionDuplicateTests(TempMediaRootMixin, TestCase):
+    def test_duplicate_links_files_and_keeps_hashes(self):
+        sku = SKU.objects.create(name="duplicate")
+        version = Versions.objects.create(name="v1", sku=sku)
+        images = SKUImages.objects.bulk_create([
+            SKUImages(
+                sku=sku, version=version, file_size=1, content_hash=f"hash{n}", original_filename=f"{n}.png",
+                image=default_storage.save(f"sku_images/{sku.id}/v1/{n}.png", ContentFile(b"x"))
+            )
+            for n in range(3)
+        ])
+        record_created(images)
+
+        response = APIClient().post(
+            '/api/version-duplicate/', {"version_id": version.id, "new_version_name": "copy"}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["duplicated_images_count"], 3)
+        copies = SKUImages.objects.filter(version_id=response.json()["id"]).order_by('original_filename')
+        self.assertEqual([image.content_hash for image in copies], ["hash0", "hash1", "hash2"])
+        for image in copies:
+            self.assertEqual(image.image.name, f"sku_images/{sku.id}/copy/{image.original_filename}")
+            self.assertEqual(default_storage.open(image.image.name).read(), b"x")
+        self.assertEqual(version_summaries([response.json()["id"]])[response.json()["id"]]["total_image_count"], 3)
+
+    def test_missing_files_are_reported(self):
+        sku = SKU.objects.create(name="duplicate")
+        version = Versions.objects.create(name="v1", sku=sku)
+        missing = SKUImages.objects.create(sku=sku, version=version, original_filename="gone.png", image=f"sku_images/{sku.id}/v1/gone.png")
+
+        with self.assertLogs('sku.views', level='WARNING'):
+            response = APIClient().post(
+                '/api/version-duplicate/', {"version_id": version.id, "new_version_name": "copy"}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["duplicated_images_count"], 0)
+        self.assertEqual(response.json()["skipped"], [
+            {"image_id": missing.id, "filename": "gone.png", "reason": "File not found"}
+        ])
+
+
+class BinaryCaptureTests(TempMediaRootMixin, TestCase):
+    def test_raw_body_over_the_form_memory_limit(self):
+        sku = SKU.objects.create(name="camera")
+        version = Versions.objects.create(name="v1", sku=sku)
+        # Noise does not compress, a 1024x1024 PNG is over DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MB)
+        frame = io.BytesIO()
+        Image.frombytes('RGB', (1024, 1024), os.urandom(1024 * 1024 * 3)).save(frame, 'PNG')
+        self.assertGreater(frame.tell(), 2.5 * 1024 * 1024)
+
+        response = APIClient().post(
+            f'/api/capture-images/binary/?sku_id={sku.id}&version_id={version.id}&image_format=png&async=false',
+            frame.getvalue(), content_type='application/octet-stream'
+        )
+        self.assertEqual(response.status_code, 201)
+        image = SKUImages.objects.get(version=version)
+        self.assertEqual(image.file_size, frame.tell())
+        self.assertEqual(default_storage.open(image.image.name).read(), frame.getvalue())
+
+
+class CaptureBatchValidationTests(TestCase):
+    def test_metadata_entries_must_be_objects(self):
+        sku = SKU.objects.create(name="camera")
+        version = Versions.objects.create(name="v1", sku=sku)
+        response = APIClient().post(f'/api/capture-images/batch/?sku_id={sku.id}&version_id={version.id}', {
+            "images": [ContentFile(b"x", name="a.png")], "metadata": json.dumps(["a.png"])
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_out_of_range_epoch_is_invalid(self):
+        self.assertIsNone(parse_capture_timestamp(10 ** 20))
+        self.assertIsNone(parse_capture_timestamp(1e300))
+        self.assertIsNotNone(parse_capture_timestamp(1700000000))
+
+
+class ManifestCollectionTests(TempMediaRootMixin, TestCase):
+    def write(self, file_name, age_hours):
+        name = default_storage.save(f"{MANIFEST_ROOT}/1/{file_name}", ContentFile(b"arrow"))
+        mtime = time.time() - age_hours * 3600
+        os.utime(default_storage.path(name), (mtime, mtime))
+        return name
+
+    def test_superseded_snapshots_are_kept_for_the_grace_period(self):
+        old = self.write("sel-a.arrow", 48)
+        recent = self.write("sel-b.arrow", 2)
+        # Written long ago but handed out again just now, which makes it the latest snapshot
+        latest = self.write("sel-c.arrow", 30)
+        os.utime(default_storage.path(latest))
+        # The only snapshot of its selection is never collected
+        lone = self.write("other-a.arrow", 72)
+
+        self.assertEqual(collect_stale_manifests(timedelta(hours=24)), 1)
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(all(default_storage.exists(name) for name in (recent, latest, lone)))
+
+
+class MergeVersionsTests(TempMediaRootMixin, TestCase):
+    def test_failed_overwrite_keeps_the_target_file(self):
+        sku = SKU.objects.create(name="merge")
+        source = Versions.objects.create(name="source", sku=sku)
+        target = Versions.objects.create(name="target", sku=sku)
+        existing = SKUImages.objects.create(
+            sku=sku, version=target, original_filename="a.png",
+            image=default_storage.save(f"sku_images/{sku.id}/target/a.png", ContentFile(b"old"))
+        )
+        SKUImages.objects.create(
+            sku=sku, version=source, original_filename="a.png",
+            image=default_storage.save(f"sku_images/{sku.id}/source/a.png", ContentFile(b"new"))
+        )
+
+        with mock.patch('sku.views.record_created', side_effect=RuntimeError("boom")):
+            response = APIClient().post('/api/sku-images/merge-versions/', {
+                "source_version_id": source.id, "target_version_id": target.id, "sku_id": sku.id,
+                "overwrite": True, "skip_duplicates": False
+            }, format='json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(list(SKUImages.objects.filter(version=target)), [existing])
+        self.assertEqual(default_storage.open(existing.image.name).read(), b"old")
+        self.assertEqual(os.listdir(default_storage.path(f"sku_images/{sku.id}/target")), ["a.png"])
+
+
+class IngestOverwriteTests(TempMediaRootMixin, TestCase):
+    def ingest(self, version, files, **options):
+        ingestor = BulkImageIngestor(version.sku, version, workers=1, **options)
+        ingestor.ingest([(name, partial(io.BytesIO, content)) for name, content in files])
+        ingestor.commit()
+        return ingestor
+
+    def test_overwrite_with_content_of_another_image_replaces_it(self):
+        sku = SKU.objects.create(name="ingest")
+        version = Versions.objects.create(name="v1", sku=sku)
+        red, blue = png_bytes('red'), png_bytes('blue')
+        self.ingest(version, [("a.png", red), ("b.png", blue)])
+
+        # a.png now carries the bytes of b.png: the overwrite wins over the content duplicate check
+        ingestor = self.ingest(version, [("a.png", blue)], overwrite=True)
+        self.assertEqual(ingestor.skipped, [])
+        rows = {image.original_filename: image for image in SKUImages.objects.filter(version=version)}
+        self.assertEqual(sorted(rows), ["a.png", "b.png"])
+        self.assertEqual(default_storage.open(rows["a.png"].image.name).read(), blue)
+        self.assertEqual(default_storage.open(rows["b.png"].image.name).read(), blue)
+
+    def test_replaced_file_survives_an_outer_rollback(self):
+        sku = SKU.objects.create(name="ingest")
+        version = Versions.objects.create(name="v1", sku=sku)
+        self.ingest(version, [("a.png", png_bytes('red'))])
+        old = SKUImages.objects.get(version=version)
+
+        ingestor = BulkImageIngestor(sku, version, workers=1, overwrite=True)
+        ingestor.ingest([("a.png", partial(io.BytesIO, png_bytes('blue')))])
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                ingestor.commit()
+                raise RuntimeError("job update failed")
+        self.assertEqual(list(SKUImages.objects.filter(version=version)), [old])
+        self.assertTrue(default_storage.exists(old.image.name))
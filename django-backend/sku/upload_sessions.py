@@ -0,0 +1,119 @@
+import hashlib
+import os
+import shutil
+
+from django.conf import settings
+from django.utils import timezone
+
+from .ingest import CHUNK_SIZE
+from .models import UploadSession
+
+
+class InvalidChunkError(ValueError):
+    pass
+
+
+def session_dir(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, str(session.id))
+
+
+def chunk_path(session, index):
+    return os.path.join(session_dir(session), f"{index:06d}.part")
+
+
+def received_chunks(session):
+    directory = session_dir(session)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        int(entry.split('.')[0])
+        for entry in os.listdir(directory)
+        if entry.endswith('.part')
+    )
+
+
+def missing_chunks(session):
+    received = set(received_chunks(session))
+    return [index for index in range(session.total_chunks) if index not in received]
+
+
+def write_chunk(session, index, stream, checksum=None):
+    """
+    Stream one chunk body to disk. The chunk only becomes visible under its final
+    name once its MD5 matched ``checksum`` (when given), so a dropped connection
+    never leaves a half-written part behind.
+    """
+    os.makedirs(session_dir(session), exist_ok=True)
+    final_path = chunk_path(session, index)
+    tmp_path = f"{final_path}.tmp"
+
+    md5 = hashlib.md5()
+    written = 0
+    with open(tmp_path, 'wb') as part:
+        for data in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            written += len(data)
+            if written > session.chunk_size:
+                break
+            md5.update(data)
+            part.write(data)
+
+    if written > session.chunk_size:
+        os.remove(tmp_path)
+        raise InvalidChunkError(f"Chunk {index} is larger than the session chunk_size ({session.chunk_size} bytes).")
+    if not written:
+        os.remove(tmp_path)
+        raise InvalidChunkError(f"Chunk {index} is empty.")
+
+    digest = md5.hexdigest()
+    if checksum and checksum.lower() != digest:
+        os.remove(tmp_path)
+        raise InvalidChunkError(f"Checksum mismatch for chunk {index}: expected {checksum}, got {digest}.")
+
+    os.replace(tmp_path, final_path)
+    return digest, written
+
+
+def assemble(session):
+    """Concatenate all parts in order into a single file and return its path."""
+    assembled_path = os.path.join(session_dir(session), "assembled")
+    with open(assembled_path, 'wb') as assembled:
+        for index in range(session.total_chunks):
+            with open(chunk_path(session, index), 'rb') as part:
+                shutil.copyfileobj(part, assembled, CHUNK_SIZE)
+            # Parts are no longer needed once appended, keeps peak disk usage at ~1x
+            os.remove(chunk_path(session, index))
+    return assembled_path
+
+
+def remove_session_files(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def extend_expiry(session):
+    session.expires_at = timezone.now() + settings.UPLOAD_SESSION_TTL
+    UploadSession.objects.filter(id=session.id).update(expires_at=session.expires_at)
+
+
+def cleanup_expired_sessions():
+    """
+    Mark open sessions past their expiry as expired and delete their parts.
+    Sessions left finalizing by a crashed worker are expired the same way,
+    finalize extends the expiry when it claims a session so running ones are spared.
+    """
+    expired = UploadSession.objects.filter(
+        status__in=[UploadSession.STATUS_OPEN, UploadSession.STATUS_FINALIZING],
+        expires_at__lt=timezone.now()
+    )
+    count = 0
+    for session in expired:
+        remove_session_files(session)
+        count += 1
+    expired.update(status=UploadSession.STATUS_EXPIRED)
+
+    # Finished sessions keep their row for status queries but no longer need files
+    for session in UploadSession.objects.filter(
+        status__in=[UploadSession.STATUS_COMPLETED, UploadSession.STATUS_FAILED],
+        expires_at__lt=timezone.now()
+    ):
+        remove_session_files(session)
+    return count
@@ -1,11 +1,13 @@
 # sku/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SKUViewSet,SKUImagesViewSet,SKUListImages,TagsViewSet,VersionsViewSet,LabelsViewSet,AnnotationViewSet,CameraImageCaptureViewset,DataSetViewset,DatasetSplitViewSet,ScriptRunnerViewSet,FinalDataSet,TrainingRunnerViewSet,TestResultsViewSet,TestResultsFolderViewSet,TestRunnerViewSet,FileExplorerViewSet,ModelFileExplorerViewSet,VersionDuplicateViewSet,ImageStreamViewSet,stream_page_view,stream_images_view,TrainingProgressViewSet,stream_progress_view,stream_page,TestingProgressViewset,stream_test_progress_view
+from .views import SKUViewSet,SKUImagesViewSet,SKUListImages,TagsViewSet,VersionsViewSet,LabelsViewSet,AnnotationViewSet,CameraImageCaptureViewset,DataSetViewset,DatasetSplitViewSet,ScriptRunnerViewSet,FinalDataSet,TrainingRunnerViewSet,TestResultsViewSet,TestResultsFolderViewSet,TestRunnerViewSet,FileExplorerViewSet,ModelFileExplorerViewSet,VersionDuplicateViewSet,ImageStreamViewSet,stream_page_view,stream_images_view,TrainingProgressViewSet,stream_progress_view,stream_page,TestingProgressViewset,stream_test_progress_view,UploadSessionViewSet,IngestJobViewSet
 router = DefaultRouter()
 router.register('sku', SKUViewSet, basename='sku')
 router.register('sku-images', SKUImagesViewSet, basename='sku-images')
 router.register('sku-images-list',SKUListImages,basename="skuimagenames")
+router.register('upload-sessions', UploadSessionViewSet, basename='upload-sessions')
+router.register('ingest-jobs', IngestJobViewSet, basename='ingest-jobs')
 router.register('tags',TagsViewSet,basename='Tags')
 router.register('versions',VersionsViewSet,basename='Version')
 router.register('label',LabelsViewSet,basename="Labels")
@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import SKUImages, VersionImageStats, Versions
+from .revisions import bump_versions
+
+# SKUImages attributes that decide which VersionImageStats row an image is counted in
+BUCKET_FIELDS = ('version_id', 'label_id', 'rejected', 'data_set', 'split_label')
+
+
+def image_bucket(image):
+    return tuple(getattr(image, field) for field in BUCKET_FIELDS)
+
+
+def _grouped(queryset):
+    """Image count and bytes of ``queryset`` per bucket, computed by the database."""
+    return queryset.order_by().values(*BUCKET_FIELDS).annotate(
+        rows=Count('id'), size=Coalesce(Sum('file_size'), 0)
+    )
+
+
+class StatsDelta:
+    """Pending count/byte changes per bucket, written to VersionImageStats by apply()."""
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [0, 0])
+
+    def add_bucket(self, bucket, count, size):
+        if bucket[0] is None:  # Images outside a version are not counted
+            return
+        change = self.changes[bucket]
+        change[0] += count
+        change[1] += size
+
+    def add(self, image, sign=1):
+        self.add_bucket(image_bucket(image), sign, sign * (image.file_size or 0))
+
+    def remove(self, image):
+        self.add(image, -1)
+
+    def move(self, bucket_before, image):
+        """``image`` was saved with new bucket fields; ``bucket_before`` is image_bucket() taken before the change."""
+        if bucket_before == image_bucket(image):
+            return
+        size = image.file_size or 0
+        self.add_bucket(bucket_before, -1, -size)
+        self.add_bucket(image_bucket(image), 1, size)
+
+    def apply(self):
+        """One UPDATE (or INSERT for a new bucket) per changed bucket, whatever the number of images."""
+        with transaction.atomic():
+            for bucket, (count, size) in self.changes.items():
+                if not count and not size:
+                    continue
+                lookup = dict(zip(BUCKET_FIELDS, bucket))
+                row_id = VersionImageStats.objects.filter(**lookup).values_list('id', flat=True).first()
+                if row_id is None:
+                    VersionImageStats.objects.create(image_count=count, total_bytes=size, **lookup)
+                else:
+                    VersionImageStats.objects.filter(id=row_id).update(
+                        image_count=F('image_count') + count, total_bytes=F('total_bytes') + size
+                    )
+            bump_versions({bucket[0] for bucket in self.changes})
+        self.changes.clear()
+
+
+def record_created(images):
+    delta = StatsDelta()
+    for image in images:
+        delta.add(image)
+    delta.apply()
+
+
+def record_deleted(images):
+    delta = StatsDelta()
+    for image in images:
+        delta.remove(image)
+    delta.apply()
+
+
+def delete_images(queryset):
+    """Delete the SKUImages in ``queryset`` and take them out of the statistics. Returns the rows deleted."""
+    with transaction.atomic():
+        delta = StatsDelta()
+        for row in _grouped(queryset):
+            delta.add_bucket(tuple(row[field] for field in BUCKET_FIELDS), -row['rows'], -row['size'])
+        deleted = queryset.delete()[1].get(SKUImages._meta.label, 0)
+        delta.apply()
+    return deleted
+
+
+def update_images(queryset, **changes):
+    """``queryset.update(**changes)`` that also moves the images between statistics buckets."""
+    # Field names (label=...) and attnames (label_id=...) are both accepted, like update()
+    new_values = {}
+    for name, value in changes.items():
+        field = SKUImages._meta.get_field(name)
+        new_values[field.attname] = value.pk if isinstance(value, models.Model) else value
+
+    with transaction.atomic():
+        delta = StatsDelta()
+        for row in _grouped(queryset):
+            bucket = tuple(row[field] for field in BUCKET_FIELDS)
+            moved = tuple(new_values.get(field, row[field]) for field in BUCKET_FIELDS)
+            if moved != bucket:
+                delta.add_bucket(bucket, -row['rows'], -row['size'])
+                delta.add_bucket(moved, row['rows'], row['size'])
+        updated = queryset.update(**changes)
+        delta.apply()
+    return updated
+
+
+def reconcile(versions=None):
+    """
+    Rebuild the statistics of ``versions`` (a Versions queryset, every version
+    by default) from SKUImages. Returns the number of bucket rows written.
+    """
+    versions = Versions.objects.all() if versions is None else versions
+    with transaction.atomic():
+        VersionImageStats.objects.filter(version__in=versions).delete()
+        rows = [
+            VersionImageStats(
+                image_count=row['rows'],
+                total_bytes=row['size'],
+                **{field: row[field] for field in BUCKET_FIELDS}
+            )
+            for row in _grouped(SKUImages.objects.filter(version__in=versions))
+        ]
+        VersionImageStats.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def empty_summary():
+    return {
+        "total_image_count": 0,
+        "labeled_image_count": 0,
+        "unlabeled_image_count": 0,
+        "rejected_image_count": 0,
+        "data_set_image_count": 0,
+        "split_counts": {},
+        "label_counts": {},
+        "total_bytes": 0,
+    }
+
+
+def version_summaries(version_ids):
+    """Per-version counters for ``version_ids`` from the statistics rows alone (no SKUImages scan)."""
+    summaries = {version_id: empty_summary() for version_id in version_ids}
+    # Buckets emptied by deletes or moves stay around with a zero count until the next reconcile
+    stats = VersionImageStats.objects.filter(version_id__in=summaries).exclude(image_count=0).values(
+        *BUCKET_FIELDS, 'image_count', 'total_bytes'
+    )
+    for row in stats:
+        summary = summaries[row['version_id']]
+        count = row['image_count']
+        summary["total_image_count"] += count
+        summary["total_bytes"] += row['total_bytes']
+        if row['label_id'] is None:
+            summary["unlabeled_image_count"] += count
+        else:
+            summary["labeled_image_count"] += count
+            summary["label_counts"][row['label_id']] = summary["label_counts"].get(row['label_id'], 0) + count
+        if row['rejected']:
+            summary["rejected_image_count"] += count
+        if row['data_set']:
+            summary["data_set_image_count"] += count
+        if row['split_label']:
+            summary["split_counts"][row['split_label']] = summary["split_counts"].get(row['split_label'], 0) + count
+    return summaries
@@ -2,7 +2,7 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import SKU,Tags,Versions,Labels,TestResults,TestResultsFolder
-from .serializers import SKUSerializer,SKUImageLabelSerializer
+from .serializers import SKUSerializer,SKUImageLabelRows,SKUImageRows,DataSetImageRows,annotate_sku_listing
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -24,17 +24,115 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.core.files import File
 from django.core.files.storage import default_storage
-import shutil
 import os
 from django.db import transaction
 from django.conf import settings
-from django.db.models import Count,Q
+from django.db.models import Count,Value
+from django.db.models.functions import Coalesce
+from django.http import FileResponse
 import hashlib
 import zipfile
 import tempfile
-from django.core.files.uploadedfile import SimpleUploadedFile
+import uuid
+from .ingest import BULK_BATCH_SIZE, CHUNK_SIZE, BulkImageIngestor, hash_stream, upload_items, zip_items
+from .blobs import (
+    PLACED_COPIED, cas_enabled, place_file, register_blobs, release_file, release_files, unlink_on_commit, unplace_file,
+    write_blob,
+)
+from .phash import MAX_DISTANCE as MAX_NEAR_DUPLICATE_DISTANCE, dhash, near_duplicate_clusters
+from .previews import generate_previews
+from .sku_deletion import mark_sku_deleted
+from .sku_merge import VersionFileMove, version_folder
+from .manifests import MANIFEST_CONTENT_TYPE, ManifestUnavailable, write_manifest
+from .streaming import STREAM_CHUNK_SIZE, encode, stream_mode, stream_rows, streaming_response
+from .revisions import (
+    bump_labels, bump_skus, bump_versions, conditional_list, image_list_revision, label_list_revision,
+    sku_list_revision, version_list_revision
+)
+from .version_stats import StatsDelta, delete_images, image_bucket, record_created, record_deleted, update_images, version_summaries
+from utils.custom_pagination import IdCursorPagination
+from .ingest_jobs import spool_ingest_job
+from .models import IngestJob
+from concurrent.futures import ThreadPoolExecutor
+from .progress import push_progress
+from .models import UploadSession
+from .upload_sessions import (
+    InvalidChunkError, assemble, extend_expiry, missing_chunks, received_chunks,
+    remove_session_files, write_chunk,
+)
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from functools import partial
+import io
+import json
+
+logger = logging.getLogger(__name__)
+
+
+def wants_async_ingest(value):
+    """Async ingest flag of a request; falls back to SKU_INGEST_ASYNC when not given."""
+    if value is None or str(value).strip() == '':
+        return settings.SKU_INGEST_ASYNC
+    return str(value).lower() in ['true', '1']
+
+
+def ingest_job_accepted(request, job):
+    return Response({
+        "message": f"Ingest job queued with {len(job.manifest)} file(s).",
+        "ingest_id": str(job.id),
+        "status": job.status,
+        "status_url": request.build_absolute_uri(f"/api/ingest-jobs/{job.id}/")
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+def parse_near_duplicate_distance(value):
+    """Validate the optional near-duplicate distance of an upload; raises ValueError when invalid."""
+    if value is None or str(value).strip() == '':
+        return None
+    distance = int(value)
+    if not 0 <= distance <= MAX_NEAR_DUPLICATE_DISTANCE:
+        raise ValueError
+    return distance
+
+
+def parse_capture_timestamp(value):
+    """Parse an ISO 8601 string or Unix epoch (seconds) into an aware datetime, None if invalid."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        return None
+    if parsed is None:
+        try:
+            return datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def dataset_manifest_args(sku_id, version_ids):
+    """
+    `--manifest_path` for a training/testing job of the given versions
+    ("1,2,3"), so the job memory-maps the dataset instead of fetching it as
+    JSON. Empty when no manifest can be written; the job then uses the URL.
+    """
+    version_id_list = [int(v.strip()) for v in str(version_ids).split(',') if v.strip().isdigit()]
+    if not version_id_list:
+        return []
+    try:
+        return ["--manifest_path", default_storage.path(write_manifest(int(sku_id), version_id_list))]
+    except (ManifestUnavailable, NotImplementedError, ValueError):
+        return []
 
-# logger = logging.getLogger(_name_)
 
 class SKUViewSet(viewsets.ViewSet):
     
@@ -59,6 +157,7 @@ class SKUViewSet(viewsets.ViewSet):
         ],
         responses={200: SKUSerializer(many=True)}
     )
+    @conditional_list(sku_list_revision)
     def list(self, request):
         workspace_id = request.query_params.get("workspace_id")
         tag_id = request.query_params.get("tag_id")
@@ -70,7 +169,7 @@ class SKUViewSet(viewsets.ViewSet):
         if tag_id:
             queryset = queryset.filter(tag_id=tag_id)
 
-        serializer = SKUSerializer(queryset, many=True)
+        serializer = SKUSerializer(annotate_sku_listing(queryset), many=True)
         return Response({"results": serializer.data}, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -139,7 +238,7 @@ class SKUViewSet(viewsets.ViewSet):
 
     @swagger_auto_schema(responses={200: SKUSerializer})
     def retrieve(self, request, pk=None):
-        sku = get_object_or_404(SKU, pk=pk)
+        sku = get_object_or_404(annotate_sku_listing(SKU.objects.all()), pk=pk)
         serializer = SKUSerializer(sku)
         return Response({"results":serializer.data})
 
@@ -181,58 +280,33 @@ class SKUViewSet(viewsets.ViewSet):
         serializer = SKUSerializer(sku, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            bump_skus([sku.id])
             return Response({"message": "SKU updated successfully", "results": serializer.data})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 
-    @swagger_auto_schema(responses={204: 'No content'})
+    @swagger_auto_schema(
+        operation_description=(
+            "Marks the SKU as deleted right away (it disappears from listings) and removes its versions, "
+            "images and sku_images/<id> folder in the background. Progress is reported on the progress "
+            "stream under the returned job_id."
+        ),
+        responses={202: 'Deletion queued'}
+    )
     def destroy(self, request, pk=None):
         sku = get_object_or_404(SKU, pk=pk)
 
-        # Fetch all versions related to this SKU
-        versions = Versions.objects.filter(sku=sku)
-
-        for version in versions:
-            # Fetch all images in this version
-            images = SKUImages.objects.filter(version=version)
-
-            for image in images:
-                # Delete image file from storage if it exists
-                if image.image and default_storage.exists(image.image.name):
-                    default_storage.delete(image.image.name)
+        with transaction.atomic():
+            job_id = mark_sku_deleted(sku)
 
-                # Delete SKUImage instance
-                image.delete()
-
-            # Delete version after its images are deleted
-            version.delete()
-
-        # Delete any SKUImages directly tied to SKU but not any version
-        loose_images = SKUImages.objects.filter(sku=sku, version__isnull=True)
-        for image in loose_images:
-            if image.image and default_storage.exists(image.image.name):
-                default_storage.delete(image.image.name)
-            image.delete()
-
-        # Delete the SKU
-        sku.delete()
+        return Response({
+            "message": "SKU deletion started. Its versions, images and folders are being removed in the background.",
+            "job_id": job_id,
+            "status": 202
+        }, status=status.HTTP_202_ACCEPTED)
 
-        # After deleting, remove the folder sku_images/<sku.id> from media storage
-        sku_folder_path = os.path.join(settings.MEDIA_ROOT, f"sku_images/{pk}")
-        if os.path.exists(sku_folder_path):
-            try:
-                shutil.rmtree(sku_folder_path)  # Force delete the folder and its contents
-            except Exception as e:
-                return Response({
-                    "message": f"SKU deleted, but failed to delete image folder: {str(e)}",
-                    "status": 500
-                }, status=500)
 
-        return Response({
-            "message": "SKU and its associated versions, images, and folders deleted successfully",
-            "status": 204
-        })
 class SKUImagesViewSet(viewsets.ViewSet):
 
     def create(self, request, *args, **kwargs):
@@ -243,9 +317,17 @@ class SKUImagesViewSet(viewsets.ViewSet):
         overwrite = request.data.get('overwrite', 'false').lower() == 'true'
         zip_file = request.FILES.get('zip_folder')
         image_files = request.FILES.getlist('images')
+        upload_id = request.data.get('upload_id') or str(uuid.uuid4())
 
         if not sku_id or not version_id:
             return Response({"message": "Both 'sku_id' and 'version_id' are required.","status": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            near_duplicate_distance = parse_near_duplicate_distance(request.data.get('near_duplicate_distance'))
+        except ValueError:
+            return Response(
+                {"message": f"near_duplicate_distance must be an integer between 0 and {MAX_NEAR_DUPLICATE_DISTANCE}.","status": status.HTTP_400_BAD_REQUEST},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         # Don't allow both zip and image files at the same time
         if zip_file and image_files:
             return Response(
@@ -258,95 +340,122 @@ class SKUImagesViewSet(viewsets.ViewSet):
         except (SKU.DoesNotExist, Versions.DoesNotExist):
             return Response({"message": "Invalid sku_id or version_id."}, status=status.HTTP_404_NOT_FOUND)
 
-        created_entries = []
-        skipped_entries = []
-        processed_hashes = set()
+        # Async mode: spool the bytes, answer 202 and let the ingest workers do the rest
+        if wants_async_ingest(request.data.get('async')):
+            uploads = image_files + ([zip_file] if zip_file else [])
+            for upload in uploads:
+                upload.seek(0)
+            entries = [
+                (upload, os.path.basename(upload.name), {"zip": True} if upload is zip_file else {})
+                for upload in uploads
+            ]
+            job = spool_ingest_job(
+                sku,
+                version,
+                entries,
+                tags=tags,
+                allow_duplicates=allow_duplicates,
+                overwrite=overwrite,
+                near_duplicate_distance=near_duplicate_distance
+            )
+            return ingest_job_accepted(request, job)
 
-        existing_hashes = set(
-            SKUImages.objects.filter(sku=sku, version=version)
-            .exclude(content_hash__isnull=True)
-            .values_list('content_hash', flat=True)
+        ingestor = BulkImageIngestor(
+            sku,
+            version,
+            tags=tags,
+            allow_duplicates=allow_duplicates,
+            overwrite=overwrite,
+            near_duplicate_distance=near_duplicate_distance
         )
 
-        # Helper to handle individual files
-        def handle_file(file_obj, file_name):
-            nonlocal created_entries, skipped_entries, processed_hashes, existing_hashes
-
-            file_content = file_obj.read()
-            content_hash = hashlib.md5(file_content).hexdigest()
-            file_obj.seek(0)
-
-            existing_entry = SKUImages.objects.filter(
-                sku=sku,
-                version=version,
-                original_filename=file_name
-            ).first()
-
-            if existing_entry and overwrite:
-                if existing_entry.image and existing_entry.image.storage.exists(existing_entry.image.name):
-                    existing_entry.image.delete(save=False)
-                existing_entry.delete()
-
-            elif existing_entry and not allow_duplicates:
-                skipped_entries.append({
-                    "filename": file_name,
-                    "reason": "Duplicate image filename",
-                    "content_hash": content_hash,
-                    "version_id": version.id
-                })
-                return
-
-            elif not allow_duplicates and (content_hash in existing_hashes or content_hash in processed_hashes):
-                skipped_entries.append({
-                    "filename": file_name,
-                    "reason": "Duplicate image content",
-                    "content_hash": content_hash,
-                    "version_id": version.id
-                })
-                return
-
-            # Wrap in Django-compatible uploaded file
-            django_file = SimpleUploadedFile(file_name, file_content, content_type='image/jpeg')
-
-            image_instance = SKUImages(
-                sku=sku,
-                version=version,
-                tags=tags,
-                image=django_file,
-                original_filename=file_name,
-                content_hash=content_hash
-            )
-            image_instance.save()
-            created_entries.append(SKUImagesSerializer(image_instance).data)
-            processed_hashes.add(content_hash)
-            existing_hashes.add(content_hash)
+        def report_progress(done, total, file_name):
+            push_progress(upload_id, round(done * 100 / total, 2), f"Processed {file_name} ({done}/{total})")
 
         # Process direct image files
-        for img in image_files:
-            handle_file(img, os.path.basename(img.name))
+        if image_files:
+            ingestor.ingest(upload_items(image_files), on_progress=report_progress)
 
-        # Process zip
+        # Process zip member by member, without extracting it to a temp directory
         if zip_file:
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                    zip_ref.extractall(tmp_dir)
-
-                for root, _, files in os.walk(tmp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        with open(file_path, 'rb') as f:
-                            file_bytes = f.read()
-                            # Convert to Django-compatible upload object
-                            django_file = SimpleUploadedFile(file, file_bytes, content_type='image/jpeg')
-                            handle_file(django_file, file)
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                ingestor.ingest(zip_items(zip_ref), on_progress=report_progress)
+
+        created = ingestor.commit()
+        created_entries = SKUImagesSerializer(created, many=True).data
+        skipped_entries = ingestor.skipped
 
         return Response({
             "message": f"{len(created_entries)} image(s) uploaded, {len(skipped_entries)} skipped.",
+            "upload_id": upload_id,
             "uploaded": created_entries,
             "skipped": skipped_entries
         }, status=status.HTTP_201_CREATED)
 
 
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="List near-duplicate image clusters of a version",
+        operation_description="""
+        Groups the images of a version whose perceptual hashes (dHash) are within `distance` bits
+        of each other. Clusters are returned largest first; images without a perceptual hash
+        (uploaded before hashing existed, see the `compute_perceptual_hashes` command) are counted
+        in `unhashed_count` and left out.
+        """,
+        manual_parameters=[
+            openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the Version"),
+            openapi.Parameter('distance', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Max Hamming distance (default 4)"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Max clusters returned (default 100)"),
+        ],
+        responses={200: "Near-duplicate clusters", 400: "Bad request"}
+    )
+    @action(detail=False, methods=['get'], url_path='near-duplicates')
+    def near_duplicates(self, request):
+        version_id = request.query_params.get('version_id')
+        try:
+            distance = int(request.query_params.get('distance', 4))
+            limit = int(request.query_params.get('limit', 100))
+            if not version_id or not 0 <= distance <= MAX_NEAR_DUPLICATE_DISTANCE or limit <= 0:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"message": f"version_id is required, distance must be between 0 and {MAX_NEAR_DUPLICATE_DISTANCE} and limit positive."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        images = SKUImages.objects.filter(version_id=version_id)
+        rows = [
+            (perceptual_hash, (image_id, original_filename, image_name))
+            for image_id, original_filename, image_name, perceptual_hash in images.filter(perceptual_hash__isnull=False)
+            .order_by('id')
+            .values_list('id', 'original_filename', 'image', 'perceptual_hash')
+            .iterator(chunk_size=5000)
+        ]
+        clusters = near_duplicate_clusters(rows, distance)
+
+        return Response({
+            "version_id": int(version_id),
+            "distance": distance,
+            "image_count": len(rows),
+            "unhashed_count": images.filter(perceptual_hash__isnull=True).count(),
+            "cluster_count": len(clusters),
+            "duplicate_image_count": sum(len(cluster) for cluster in clusters),
+            "clusters": [
+                {
+                    "size": len(cluster),
+                    "images": [
+                        {
+                            "id": image_id,
+                            "original_filename": original_filename,
+                            "image": request.build_absolute_uri(default_storage.url(image_name))
+                        }
+                        for image_id, original_filename, image_name in cluster
+                    ]
+                }
+                for cluster in clusters[:limit]
+            ]
+        }, status=status.HTTP_200_OK)
+
     def destroy(self, request, pk=None):
         """
         DELETE /sku-images/{id}/ → Single delete by ID
@@ -360,9 +469,9 @@ class SKUImagesViewSet(viewsets.ViewSet):
         except SKUImages.DoesNotExist:
             return Response({"message": "Image not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if image.image and image.image.storage.exists(image.image.name):
-            image.image.delete(save=False)
+        release_file(image)
         image.delete()
+        record_deleted([image])
 
         return Response({"message": f"Image {pk} deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
@@ -382,17 +491,35 @@ class SKUImagesViewSet(viewsets.ViewSet):
             return Response({"message": "image_ids must be a non-empty list."},
                             status=status.HTTP_400_BAD_REQUEST)
 
+        # (image_id as sent, primary key or None) in request order; only ints and numeric strings are ids
+        requested = []
+        for image_id in image_ids:
+            pk = None
+            if isinstance(image_id, (int, str)) and not isinstance(image_id, bool):
+                try:
+                    pk = int(image_id)
+                except ValueError:
+                    pass
+            requested.append((image_id, pk))
+
+        # One SELECT of the file names, one DELETE; files are unlinked in the background after commit
+        with transaction.atomic():
+            rows = list(SKUImages.objects.filter(id__in={pk for _, pk in requested if pk is not None}).values(
+                'id', 'image', 'blob_id', 'content_hash', 'previews'
+            ))
+            found = {row['id'] for row in rows}
+            if found:
+                delete_images(SKUImages.objects.filter(id__in=found))
+                release_files(rows)
+
+        # A repeated id ("1" after 1) is only deleted once, later occurrences are not found like in a loop of deletes
         deleted = []
         not_found = []
-
-        for image_id in image_ids:
-            try:
-                image = SKUImages.objects.get(id=image_id)
-                if image.image and image.image.storage.exists(image.image.name):
-                    image.image.delete(save=False)
-                image.delete()
+        for image_id, pk in requested:
+            if pk in found:
                 deleted.append(image_id)
-            except SKUImages.DoesNotExist:
+                found.discard(pk)
+            else:
                 not_found.append(image_id)
 
         return Response({
@@ -472,10 +599,12 @@ class SKUImagesViewSet(viewsets.ViewSet):
         except (SKU.DoesNotExist, Versions.DoesNotExist) as e:
             return Response({"message": str(e)}, status=status.HTTP_404_NOT_FOUND)
 
+        if source_version.id == target_version.id:
+            return Response({"message": "source_version_id and target_version_id must differ"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
         # Get source images
-        source_images = SKUImages.objects.filter(
-            sku=sku, version=source_version
-        ).select_related('version')
+        source_images = list(SKUImages.objects.filter(sku=sku, version=source_version).order_by('id'))
 
         # Get content hashes from target version
         target_hashes = set(
@@ -484,66 +613,92 @@ class SKUImagesViewSet(viewsets.ViewSet):
             .values_list('content_hash', flat=True)
         )
 
-        merged_count = 0
         skipped_count = 0
         skipped_images = []  # Track skipped image filenames
         errors = []
 
+        merged = []  # (source image, new row)
+        placed = []  # (source path, target path, how) of files put in the target version
+        copied_sources = []  # Sources that had to be copied, deleted once the merge commits
+        written = set()
         for source_image in source_images:
-            try:
-                # Skip if already exists in target and skipping is enabled
-                if skip_duplicates and source_image.content_hash in target_hashes:
-                    skipped_count += 1
-                    skipped_images.append(source_image.original_filename)
-                    continue
-
-                old_path = source_image.image.path
-                new_filename = os.path.basename(old_path)
-                new_relative_path = f'sku_images/{sku_id}/{target_version.name}/{new_filename}'
-                new_full_path = default_storage.path(new_relative_path)
+            # Skip if already exists in target and skipping is enabled
+            if skip_duplicates and source_image.content_hash in target_hashes:
+                skipped_count += 1
+                skipped_images.append(source_image.original_filename)
+                continue
 
-                os.makedirs(os.path.dirname(new_full_path), exist_ok=True)
+            merged_image = SKUImages(
+                sku=sku,
+                tags=source_image.tags,
+                version=target_version,
+                image=source_image.image.name,
+                original_filename=source_image.original_filename,
+                content_hash=source_image.content_hash,
+                captured_at=source_image.captured_at,
+                perceptual_hash=source_image.perceptual_hash,
+                file_size=source_image.file_size,
+                blob_id=source_image.blob_id
+            )
 
-                if default_storage.exists(old_path):
-                    # Overwrite existing file if necessary
-                    if overwrite and default_storage.exists(new_relative_path):
-                        default_storage.delete(new_relative_path)
+            # Blob-backed images share their file, merging only copies the row
+            if not source_image.blob_id:
+                old_path = source_image.image.path
+                if not os.path.exists(old_path):
+                    errors.append(f"Source file not found: {old_path}")
+                    continue
 
-                    with default_storage.open(old_path, 'rb') as old_file:
-                        default_storage.save(new_relative_path, old_file)
+                # Always a free name: files of overwritten rows are only released once their rows are deleted
+                new_relative_path = default_storage.get_available_name(
+                    f'sku_images/{sku_id}/{target_version.name}/{os.path.basename(old_path)}'
+                )
+                new_full_path = default_storage.path(new_relative_path)
+                try:
+                    # Same MEDIA_ROOT: a rename (moving) or hard link (copying) instead of rewriting the bytes
+                    how = place_file(old_path, new_full_path, move=delete_source)
+                except OSError as e:
+                    errors.append(str(e))
+                    continue
+                placed.append((old_path, new_full_path, how))
+                if how == PLACED_COPIED and delete_source:
+                    copied_sources.append(source_image.image.name)
+                written.add(new_relative_path)
+                merged_image.image = new_relative_path
 
-                    # Remove existing DB record if overwrite is set
-                    if overwrite:
-                        SKUImages.objects.filter(
-                            sku=sku,
-                            version=target_version,
-                            original_filename=source_image.original_filename
-                        ).delete()
+            merged.append((source_image, merged_image))
 
-                    # Create new record in target version
-                    SKUImages.objects.create(
+        try:
+            with transaction.atomic():
+                # Remove existing DB records if overwrite is set
+                if overwrite and merged:
+                    overwritten = SKUImages.objects.filter(
                         sku=sku,
-                        tags=source_image.tags,
                         version=target_version,
-                        image=new_relative_path,
-                        original_filename=source_image.original_filename,
-                        content_hash=source_image.content_hash
+                        original_filename__in={image.original_filename for _, image in merged}
                     )
+                    overwritten_rows = list(overwritten.values('id', 'image', 'blob_id', 'content_hash', 'previews'))
+                    delete_images(overwritten)
+                    # Release their files unless the merge just wrote one under that name or another row still uses it
+                    keep = written | set(SKUImages.objects.filter(
+                        image__in=[row['image'] for row in overwritten_rows]
+                    ).values_list('image', flat=True))
+                    release_files([
+                        {**row, 'image': None} if row['image'] in keep else row for row in overwritten_rows
+                    ])
+
+                created = SKUImages.objects.bulk_create([image for _, image in merged], batch_size=BULK_BATCH_SIZE)
+                record_created(created)
+
+                # Delete from source if requested
+                if delete_source and merged:
+                    delete_images(SKUImages.objects.filter(id__in=[source.id for source, _ in merged]))
+                    unlink_on_commit(copied_sources)
+        except Exception as e:
+            for old_path, new_full_path, how in placed:
+                unplace_file(old_path, new_full_path, how)
+            return Response({"message": f"Merge failed: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-                    merged_count += 1
-
-                    # Delete from source if requested
-                    if delete_source:
-                        if default_storage.exists(old_path):
-                            default_storage.delete(old_path)
-                        source_image.delete()
-
-                else:
-                    errors.append(f"Source file not found: {old_path}")
-
-            except Exception as e:
-                errors.append(str(e))
-                continue
+        merged_count = len(merged)
 
         return Response({
             "message": f"Merged {merged_count} images, skipped {skipped_count} duplicates",
@@ -559,6 +714,8 @@ class SKUImagesViewSet(viewsets.ViewSet):
         operation_description="""
         This API merges all versions (and their images) from a source SKU to a destination SKU.
         Optionally handles version name conflicts and deletion of the source versions.
+        Version folders are moved as a whole where possible, before the rows are updated;
+        the file moves are reported on the progress stream under `merge_id`.
         """,
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
@@ -568,6 +725,7 @@ class SKUImagesViewSet(viewsets.ViewSet):
                 'destination_sku_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the destination SKU'),
                 'delete_source_versions': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='Delete the source versions after merging', default=False),
                 'rename_conflicts': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='Automatically rename versions to avoid conflicts', default=True),
+                'merge_id': openapi.Schema(type=openapi.TYPE_STRING, description='job_id of the file-move progress updates on the progress stream, generated when omitted'),
             }
         ),
         responses={
@@ -593,7 +751,8 @@ class SKUImagesViewSet(viewsets.ViewSet):
                             }
                         ],
                         "destination_sku_id": 2,
-                        "source_sku_id": 1
+                        "source_sku_id": 1,
+                        "merge_id": "0b5c7f2e-6a0e-4b59-9a43-5d1c3f0f8e21"
                     }
                 }
             ),
@@ -611,13 +770,15 @@ class SKUImagesViewSet(viewsets.ViewSet):
             "source_sku_id": 1,
             "destination_sku_id": 2,
             "delete_source_versions": false,  # optional, default false
-            "rename_conflicts": true  # optional, default true
+            "rename_conflicts": true,  # optional, default true
+            "merge_id": "..."  # optional, job_id of the progress updates
         }
         """
         source_sku_id = request.data.get('source_sku_id')
         destination_sku_id = request.data.get('destination_sku_id')
         delete_source_versions = request.data.get('delete_source_versions', False)
         rename_conflicts = request.data.get('rename_conflicts', True)
+        merge_id = request.data.get('merge_id') or str(uuid.uuid4())
 
         if not source_sku_id or not destination_sku_id:
             return Response(
@@ -635,9 +796,9 @@ class SKUImagesViewSet(viewsets.ViewSet):
             )
 
         # Get all versions to move from source SKU
-        versions_to_merge = Versions.objects.filter(sku=source_sku)
+        versions_to_merge = list(Versions.objects.filter(sku=source_sku).order_by('id'))
 
-        if not versions_to_merge.exists():
+        if not versions_to_merge:
             return Response(
                 {"message": "No versions found under source SKU to merge."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -647,80 +808,399 @@ class SKUImagesViewSet(viewsets.ViewSet):
             Versions.objects.filter(sku=destination_sku).values_list('name', flat=True)
         )
 
+        # Handle version name conflicts
+        new_version_names = []
+        for version in versions_to_merge:
+            new_version_name = version.name
+            conflict_suffix = 1
+            while rename_conflicts and new_version_name in existing_version_names:
+                new_version_name = f"{version.name}_{conflict_suffix}"
+                conflict_suffix += 1
+            existing_version_names.add(new_version_name)
+            new_version_names.append(new_version_name)
+
+        moves = [
+            VersionFileMove(source_sku.id, version.id, version_folder(destination_sku.id, new_version_name))
+            for version, new_version_name in zip(versions_to_merge, new_version_names)
+        ]
+        total_files = SKUImages.objects.filter(
+            version__in=versions_to_merge, blob__isnull=True
+        ).exclude(image='').count()
+        files_moved = 0
+
+        def report_progress(count):
+            nonlocal files_moved
+            files_moved += count
+            push_progress(merge_id, round(files_moved * 90 / max(total_files, 1), 2), f"Moved {files_moved}/{total_files} file(s)")
+
         results = []
         moved_images_count = 0
 
         try:
-            with transaction.atomic():
-                for version in versions_to_merge:
-                    original_name = version.name
-                    new_version_name = original_name
-                    conflict_suffix = 1
+            # Files first, outside of any transaction: whole version folders are renamed where possible
+            push_progress(merge_id, 0, f"Moving {total_files} file(s)")
+            for move in moves:
+                move.run(on_file=report_progress)
 
-                    # Handle version name conflicts
-                    while rename_conflicts and new_version_name in existing_version_names:
-                        new_version_name = f"{original_name}_{conflict_suffix}"
-                        conflict_suffix += 1
-
-                    # Create new version under destination SKU
+            # Then a few UPDATEs re-pointing the rows, the database is only locked for those
+            with transaction.atomic():
+                for version, new_version_name, move in zip(versions_to_merge, new_version_names, moves):
                     new_version = Versions.objects.create(
                         name=new_version_name,
                         sku=destination_sku
                     )
-                    existing_version_names.add(new_version_name)
-
-                    # Move all images from source version to new version
-                    images = SKUImages.objects.filter(version=version)
-                    for image in images:
-                        if not image.image or not default_storage.exists(image.image.name):
-                            continue
-
-                        old_path = image.image.name
-                        new_path = f'sku_images/{destination_sku.id}/{new_version.name}/{image.original_filename}'
-
-                        # Ensure directory exists
-                        dir_path = os.path.dirname(new_path)
-                        if not default_storage.exists(dir_path):
-                            os.makedirs(default_storage.path(dir_path), exist_ok=True)
-
-                        # Move file
-                        with default_storage.open(old_path, 'rb') as f:
-                            default_storage.save(new_path, f)
-                        if default_storage.exists(old_path):
-                            default_storage.delete(old_path)
-
-                        # Update image record
-                        image.version = new_version
-                        image.sku = destination_sku
-                        image.image.name = new_path
-                        image.save()
-                        moved_images_count += 1
+                    images_moved = update_images(
+                        SKUImages.objects.filter(version=version), version=new_version, sku=destination_sku
+                    )
+                    move.apply_paths(SKUImages.objects.filter(version=new_version))
+                    # Sources that had to be copied across filesystems go once the rows point at the copies
+                    unlink_on_commit(move.copied_sources)
+                    moved_images_count += images_moved
 
                     results.append({
                         'source_version_id': version.id,
-                        'source_version_name': original_name,
+                        'source_version_name': version.name,
                         'new_version_id': new_version.id,
                         'new_version_name': new_version.name,
-                        'images_moved': images.count()
+                        'images_moved': images_moved
                     })
 
-                    if delete_source_versions:
-                        version.delete()
+                if delete_source_versions:
+                    Versions.objects.filter(id__in=[version.id for version in versions_to_merge]).delete()
 
-            return Response({
-                'message': f'Successfully merged {len(results)} versions with {moved_images_count} images.',
-                'details': results,
-                'destination_sku_id': destination_sku_id,
-                'source_sku_id': source_sku_id
-            }, status=status.HTTP_200_OK)
+                # Version counts of both SKUs changed, and moved versions may be gone by now
+                bump_skus([source_sku.id, destination_sku.id])
 
         except Exception as e:
+            for move in reversed(moves):
+                move.undo()
+            push_progress(merge_id, 100, f"Failed: {e}")
             return Response(
-                {"message": f"Error during merge: {str(e)}"},
+                {"message": f"Error during merge: {str(e)}", "merge_id": merge_id},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        push_progress(merge_id, 100, f"Merged {len(results)} versions with {moved_images_count} images")
+        return Response({
+            'message': f'Successfully merged {len(results)} versions with {moved_images_count} images.',
+            'details': results,
+            'destination_sku_id': destination_sku_id,
+            'source_sku_id': source_sku_id,
+            'merge_id': merge_id
+        }, status=status.HTTP_200_OK)
+
+
+
+
+class UploadSessionViewSet(viewsets.ViewSet):
+    """
+    Resumable chunked uploads for large dataset archives.
+
+    POST   /upload-sessions/                      → open a session
+    PUT    /upload-sessions/{id}/chunks/{index}/  → upload chunk `index` as the raw request body
+    GET    /upload-sessions/{id}/                 → session status and missing chunks
+    POST   /upload-sessions/{id}/finalize/        → assemble the chunks and ingest them
+    DELETE /upload-sessions/{id}/                 → abort the session
+    """
+
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+    def _session_data(self, session):
+        data = {
+            "session_id": str(session.id),
+            "sku_id": session.sku_id,
+            "version_id": session.version_id,
+            "filename": session.filename,
+            "status": session.status,
+            "chunk_size": session.chunk_size,
+            "total_chunks": session.total_chunks,
+            "total_size": session.total_size,
+            "expires_at": session.expires_at,
+            "result": session.result,
+        }
+        if session.status == UploadSession.STATUS_OPEN:
+            data["received_chunks"] = received_chunks(session)
+            data["missing_chunks"] = missing_chunks(session)
+        return data
+
+    def _get_session(self, pk):
+        try:
+            session = UploadSession.objects.select_related('sku', 'version').get(pk=pk)
+        except (UploadSession.DoesNotExist, ValueError, ValidationError):
+            return None
+
+        if session.status == UploadSession.STATUS_OPEN and session.expires_at < timezone.now():
+            remove_session_files(session)
+            session.status = UploadSession.STATUS_EXPIRED
+            session.save(update_fields=['status'])
+        return session
+
+    @swagger_auto_schema(
+        operation_summary="Open a resumable chunked upload session",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["sku_id", "version_id", "filename"],
+            properties={
+                'sku_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the SKU"),
+                'version_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the Version"),
+                'filename': openapi.Schema(type=openapi.TYPE_STRING, description="Name of the zip archive or image being uploaded"),
+                'total_size': openapi.Schema(type=openapi.TYPE_INTEGER, description="Total size in bytes (required unless total_chunks is given)"),
+                'chunk_size': openapi.Schema(type=openapi.TYPE_INTEGER, description="Chunk size in bytes (default 8 MB)"),
+                'total_chunks': openapi.Schema(type=openapi.TYPE_INTEGER, description="Number of chunks (derived from total_size if omitted)"),
+                'tags': openapi.Schema(type=openapi.TYPE_STRING, description="Optional image tags"),
+                'allow_duplicates': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=False),
+                'overwrite': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=False),
+                'near_duplicate_distance': openapi.Schema(type=openapi.TYPE_INTEGER, description="Skip images within this many dHash bits of an existing one"),
+            }
+        ),
+        responses={201: "Session created", 400: "Bad request", 404: "SKU or Version not found"}
+    )
+    def create(self, request):
+        sku_id = request.data.get('sku_id')
+        version_id = request.data.get('version_id')
+        filename = os.path.basename(str(request.data.get('filename') or ''))
+
+        if not all([sku_id, version_id, filename]):
+            return Response({"message": "sku_id, version_id and filename are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            chunk_size = int(request.data.get('chunk_size') or self.DEFAULT_CHUNK_SIZE)
+            total_size = request.data.get('total_size')
+            total_size = int(total_size) if total_size not in (None, '') else None
+            total_chunks = request.data.get('total_chunks')
+            if total_chunks in (None, ''):
+                if total_size is None:
+                    raise ValueError
+                total_chunks = max(1, -(-total_size // chunk_size))
+            total_chunks = int(total_chunks)
+        except (TypeError, ValueError):
+            return Response({"message": "Provide a valid total_size or total_chunks, and an integer chunk_size."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            near_duplicate_distance = parse_near_duplicate_distance(request.data.get('near_duplicate_distance'))
+        except ValueError:
+            return Response({"message": f"near_duplicate_distance must be an integer between 0 and {MAX_NEAR_DUPLICATE_DISTANCE}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not 0 < chunk_size <= settings.UPLOAD_SESSION_MAX_CHUNK_SIZE or total_chunks <= 0:
+            return Response({"message": f"chunk_size must be between 1 and {settings.UPLOAD_SESSION_MAX_CHUNK_SIZE} bytes."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sku = SKU.objects.get(id=sku_id)
+            version = Versions.objects.get(id=version_id)
+        except (SKU.DoesNotExist, Versions.DoesNotExist):
+            return Response({"message": "Invalid sku_id or version_id."}, status=status.HTTP_404_NOT_FOUND)
+
+        session = UploadSession.objects.create(
+            sku=sku,
+            version=version,
+            filename=filename,
+            tags=request.data.get('tags', ''),
+            allow_duplicates=str(request.data.get('allow_duplicates', 'false')).lower() == 'true',
+            overwrite=str(request.data.get('overwrite', 'false')).lower() == 'true',
+            near_duplicate_distance=near_duplicate_distance,
+            chunk_size=chunk_size,
+            total_chunks=total_chunks,
+            total_size=total_size,
+            expires_at=timezone.now() + settings.UPLOAD_SESSION_TTL
+        )
+        return Response(self._session_data(session), status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_summary="Get upload session status (received and missing chunks)",
+        responses={200: "Session status", 404: "Session not found"}
+    )
+    def retrieve(self, request, pk=None):
+        session = self._get_session(pk)
+        if not session:
+            return Response({"message": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self._session_data(session), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        method='put',
+        operation_summary="Upload one chunk of a session",
+        operation_description="The request body is the raw chunk. Send its MD5 hex digest in the `X-Chunk-Checksum` header (or `checksum` query param) to have it verified.",
+        responses={200: "Chunk stored", 400: "Checksum mismatch or invalid index", 404: "Session not found", 409: "Session is not open"}
+    )
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>[0-9]+)')
+    def chunks(self, request, pk=None, index=None):
+        session = self._get_session(pk)
+        if not session:
+            return Response({"message": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        if session.status != UploadSession.STATUS_OPEN:
+            return Response({"message": f"Upload session is {session.status}."}, status=status.HTTP_409_CONFLICT)
+
+        index = int(index)
+        if index >= session.total_chunks:
+            return Response({"message": f"Chunk index must be between 0 and {session.total_chunks - 1}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        checksum = request.headers.get('X-Chunk-Checksum') or request.query_params.get('checksum')
+        try:
+            # Read the raw body as a stream so the chunk is never held in memory as a whole
+            digest, size = write_chunk(session, index, request.stream or io.BytesIO(), checksum)
+        except InvalidChunkError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        extend_expiry(session)
+        return Response({
+            "session_id": str(session.id),
+            "index": index,
+            "size": size,
+            "checksum": digest,
+            "missing_chunks": missing_chunks(session),
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Assemble the chunks and ingest them into the SKU version",
+        responses={201: "Upload ingested", 400: "Chunks missing", 404: "Session not found", 409: "Session is not open"}
+    )
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self._get_session(pk)
+        if not session:
+            return Response({"message": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Only one finalize may win the race for an open session
+        claimed = UploadSession.objects.filter(id=session.id, status=UploadSession.STATUS_OPEN) \
+            .update(status=UploadSession.STATUS_FINALIZING)
+        if not claimed:
+            return Response({"message": f"Upload session is {session.status}."}, status=status.HTTP_409_CONFLICT)
+        # A full TTL for the assembly and ingest, cleanup expires finalizing sessions left behind by a crash
+        extend_expiry(session)
+
+        missing = missing_chunks(session)
+        if missing:
+            UploadSession.objects.filter(id=session.id).update(status=UploadSession.STATUS_OPEN)
+            return Response({"message": f"{len(missing)} chunk(s) missing.", "missing_chunks": missing},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        upload_id = str(session.id)
+
+        def report_progress(done, total, file_name):
+            push_progress(upload_id, round(done * 100 / total, 2), f"Processed {file_name} ({done}/{total})")
+
+        try:
+            assembled_path = assemble(session)
+            if session.total_size is not None and os.path.getsize(assembled_path) != session.total_size:
+                raise ValueError(
+                    f"Assembled size {os.path.getsize(assembled_path)} does not match total_size {session.total_size}."
+                )
+
+            ingestor = BulkImageIngestor(
+                session.sku,
+                session.version,
+                tags=session.tags,
+                allow_duplicates=session.allow_duplicates,
+                overwrite=session.overwrite,
+                near_duplicate_distance=session.near_duplicate_distance
+            )
+            if zipfile.is_zipfile(assembled_path):
+                with zipfile.ZipFile(assembled_path, 'r') as zip_ref:
+                    ingestor.ingest(zip_items(zip_ref), on_progress=report_progress)
+            else:
+                ingestor.ingest([(session.filename, partial(open, assembled_path, 'rb'))], on_progress=report_progress)
+            created = ingestor.commit()
+        except Exception as e:
+            session.status = UploadSession.STATUS_FAILED
+            session.result = {"message": str(e)}
+            session.save(update_fields=['status', 'result'])
+            remove_session_files(session)
+            return Response({"message": f"Error finalizing upload: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        created_entries = SKUImagesSerializer(created, many=True).data
+        skipped_entries = ingestor.skipped
+        message = f"{len(created_entries)} image(s) uploaded, {len(skipped_entries)} skipped."
+
+        session.status = UploadSession.STATUS_COMPLETED
+        session.result = {"message": message, "uploaded_count": len(created_entries), "skipped": skipped_entries}
+        session.save(update_fields=['status', 'result'])
+        remove_session_files(session)
+
+        return Response({
+            "message": message,
+            "upload_id": upload_id,
+            "uploaded": created_entries,
+            "skipped": skipped_entries
+        }, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_summary="Abort an upload session and delete its chunks",
+        responses={204: "Session aborted", 404: "Session not found"}
+    )
+    def destroy(self, request, pk=None):
+        session = self._get_session(pk)
+        if not session:
+            return Response({"message": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        remove_session_files(session)
+        session.delete()
+        return Response({"message": f"Upload session {pk} aborted."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class IngestJobViewSet(viewsets.ViewSet):
+    """
+    Status of asynchronous ingest jobs (uploads/captures sent with async=true).
+
+    GET /ingest-jobs/?sku_id=&version_id=&status=  → recent jobs
+    GET /ingest-jobs/{id}/                         → one job, with its result once finished
+    """
+
+    def _job_data(self, job):
+        return {
+            "ingest_id": str(job.id),
+            "sku_id": job.sku_id,
+            "version_id": job.version_id,
+            "kind": job.kind,
+            "status": job.status,
+            "total_files": job.total_files,
+            "processed_files": job.processed_files,
+            "result": job.result,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
 
+    @swagger_auto_schema(
+        operation_summary="List ingest jobs",
+        manual_parameters=[
+            openapi.Parameter('sku_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filter by SKU ID"),
+            openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filter by Version ID"),
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="queued, processing, completed or failed"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Max jobs returned, newest first (default 50)"),
+        ],
+        responses={200: "Ingest jobs"}
+    )
+    def list(self, request):
+        jobs = IngestJob.objects.defer('manifest').order_by('-created_at')
+        if request.query_params.get('sku_id'):
+            jobs = jobs.filter(sku_id=request.query_params['sku_id'])
+        if request.query_params.get('version_id'):
+            jobs = jobs.filter(version_id=request.query_params['version_id'])
+        if request.query_params.get('status'):
+            jobs = jobs.filter(status=request.query_params['status'])
+        try:
+            limit = max(1, int(request.query_params.get('limit', 50)))
+        except ValueError:
+            return Response({"message": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"results": [self._job_data(job) for job in jobs[:limit]]}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Get the status of an ingest job",
+        responses={200: "Ingest job status", 404: "Ingest job not found"}
+    )
+    def retrieve(self, request, pk=None):
+        try:
+            job = IngestJob.objects.defer('manifest').get(pk=pk)
+        except (IngestJob.DoesNotExist, ValueError, ValidationError):
+            return Response({"message": "Ingest job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self._job_data(job), status=status.HTTP_200_OK)
 
 
 # class SKUListImages(viewsets.ViewSet):
@@ -788,13 +1268,35 @@ class SKUListImages(viewsets.ViewSet):
                 'data_set', openapi.IN_QUERY,
                 description="Filter by Dataset Flag (true or false)", type=openapi.TYPE_BOOLEAN
             ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Opaque cursor from a previous page's next/previous link", type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Images per page (max 1000). Passing cursor or page_size enables keyset pagination", type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'include_count', openapi.IN_QUERY,
+                description="Also return total_count of the filtered images (costs a COUNT query)", type=openapi.TYPE_BOOLEAN
+            ),
+            openapi.Parameter(
+                'fields', openapi.IN_QUERY,
+                description="Comma-separated subset of the image fields to return (e.g. id,image,label_id)", type=openapi.TYPE_STRING
+            ),
         ],
         responses={200: SKUImagesSerializer(many=True)},
         operation_summary="List SKU Images",
-        operation_description="Retrieve SKU images filtered by SKU ID, version ID, tags, label ID, rejected flag, and dataset flag."
+        operation_description="Retrieve SKU images filtered by SKU ID, version ID, tags, label ID, rejected flag, and dataset flag. "
+                              "Ordered by id; paginated by id cursor when cursor or page_size is given."
     )
+    @conditional_list(image_list_revision)
     def list(self, request):
-        queryset = SKUImages.objects.all()
+        try:
+            rows = SKUImageRows(SKUImageRows.parse_fields(request.query_params.get('fields')), context={'request': request})
+        except ValueError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = SKUImages.objects.order_by('id')
         sku_id = request.query_params.get('sku_id')
         version_id = request.query_params.get('version_id')
         tags = request.query_params.get('tags')
@@ -821,8 +1323,13 @@ class SKUListImages(viewsets.ViewSet):
             elif data_set.lower() in ['false', '0']:
                 queryset = queryset.filter(data_set=False)
 
-        serializer = SKUImagesSerializer(queryset, many=True)
-        return Response({"results": serializer.data}, status=status.HTTP_200_OK)
+        # Rows come from one values() query with the names joined in, not a serializer per image
+        if IdCursorPagination.is_requested(request):
+            paginator = IdCursorPagination()
+            page = paginator.paginate_queryset(rows.values(queryset, 'id'), request, view=self)
+            return paginator.get_paginated_response(rows.to_rows(page))
+
+        return Response({"results": rows.serialize(queryset)}, status=status.HTTP_200_OK)
 
     
 class TagsViewSet(viewsets.ViewSet):
@@ -896,6 +1403,8 @@ class TagsViewSet(viewsets.ViewSet):
         tag.name = request.data.get("name", tag.name)
         tag.is_active = request.data.get("is_active", tag.is_active)
         tag.save()
+        # SKU listings show the tag name
+        bump_skus(SKU.objects.filter(tag=tag).values_list('id', flat=True))
 
         return Response({"id": tag.id, "name": tag.name, "is_active": tag.is_active})
 
@@ -912,6 +1421,7 @@ class TagsViewSet(viewsets.ViewSet):
         except Tags.DoesNotExist:
             return Response({"message": "Tag not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        bump_skus(SKU.objects.filter(tag=tag).values_list('id', flat=True))
         tag.delete()
         return Response({"message": "Tag deleted"}, status=status.HTTP_204_NO_CONTENT)
     
@@ -930,6 +1440,7 @@ class VersionsViewSet(viewsets.ViewSet):
         ],
         responses={200: 'Returns a list of version objects with image annotation stats'}
     )
+    @conditional_list(version_list_revision)
     def list(self, request):
         sku_id = request.query_params.get("sku")
 
@@ -938,20 +1449,16 @@ class VersionsViewSet(viewsets.ViewSet):
         else:
             versions = Versions.objects.all()
 
-        versions = versions.annotate(
-            total_image_count=Count('skuimages'),
-            labeled_image_count=Count('skuimages', filter=Q(skuimages__label__isnull=False)),
-            unlabeled_image_count=Count('skuimages', filter=Q(skuimages__label__isnull=True))
-        )
+        # Counts come from the per-version statistics rows, not from scanning SKUImages
+        versions = list(versions)
+        summaries = version_summaries([version.id for version in versions])
 
         version_data = [
             {
                 "id": version.id,
                 "name": version.name,
                 "sku_id": version.sku_id,
-                "total_image_count": version.total_image_count,
-                "labeled_image_count": version.labeled_image_count,
-                "unlabeled_image_count": version.unlabeled_image_count,
+                **summaries[version.id],
             }
             for version in versions
         ]
@@ -990,6 +1497,7 @@ class VersionsViewSet(viewsets.ViewSet):
             )
 
         version = Versions.objects.create(name=name, sku=sku)
+        bump_skus([sku.id])
         return Response({"id": version.id, "name": version.name, "sku": version.sku.id}, status=status.HTTP_201_CREATED)
 
     @swagger_auto_schema(
@@ -1039,9 +1547,12 @@ class VersionsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
             
+        previous_sku_id = version.sku_id
         version.name = name
         version.sku = sku
         version.save()
+        bump_versions([version.id])
+        bump_skus([previous_sku_id])
 
         return Response({"id": version.id, "name": version.name, "sku": version.sku.id}, status=status.HTTP_200_OK)
 
@@ -1056,6 +1567,7 @@ class VersionsViewSet(viewsets.ViewSet):
             return Response({"message": "Version not found."}, status=status.HTTP_404_NOT_FOUND)
 
         version.delete()
+        bump_skus([version.sku_id])
         return Response({"message": f"Version {pk} deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1132,6 +1644,7 @@ class LabelsViewSet(viewsets.ViewSet):
         ],
         responses={200: openapi.Response("List of labels")}
     )
+    @conditional_list(label_list_revision)
     def list(self, request):
         is_active = request.query_params.get('is_active', None)
         sku = request.query_params.get('sku', None)
@@ -1220,6 +1733,7 @@ class LabelsViewSet(viewsets.ViewSet):
             color_code=color_code,
             is_active=is_active
         )
+        bump_skus([sku_id])
 
         return Response({
             "message": "Label Created Successfully",
@@ -1281,6 +1795,7 @@ class LabelsViewSet(viewsets.ViewSet):
         label.color_code = color_code
         label.is_active = is_active
         label.save()
+        bump_labels([label])
 
         return Response({
             "message": "Label updated successfully",
@@ -1325,6 +1840,7 @@ class AnnotationViewSet(viewsets.ViewSet):
                 {"message": "Image not found.", "status": status.HTTP_404_NOT_FOUND},
                 status=status.HTTP_404_NOT_FOUND
             )
+        bucket_before = image_bucket(image)
 
         if label_id:
             try:
@@ -1340,6 +1856,9 @@ class AnnotationViewSet(viewsets.ViewSet):
             image.rejected = bool(rejected)
 
         image.save()
+        stats_delta = StatsDelta()
+        stats_delta.move(bucket_before, image)
+        stats_delta.apply()
 
         return Response({
             "message": "Image updated successfully.",
@@ -1400,6 +1919,7 @@ class AnnotationViewSet(viewsets.ViewSet):
             image = SKUImages.objects.get(pk=pk)
         except SKUImages.DoesNotExist:
             return Response({"message": "Image not found.", "status": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
+        bucket_before = image_bucket(image)
 
         if label_id:
             try:
@@ -1416,6 +1936,9 @@ class AnnotationViewSet(viewsets.ViewSet):
             image.rejected = bool(rejected)
 
         image.save()
+        stats_delta = StatsDelta()
+        stats_delta.move(bucket_before, image)
+        stats_delta.apply()
 
         return Response({
             "message": "Annotation updated successfully.",
@@ -1436,11 +1959,13 @@ class CameraImageCaptureViewset(viewsets.ViewSet):
                 'sku_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the SKU"),
                 'version_id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID of the Version"),
                 'tags': openapi.Schema(type=openapi.TYPE_STRING, description="Optional image tags"),
-                'image': openapi.Schema(type=openapi.TYPE_STRING, description="Base64 encoded image (with MIME prefix)")
+                'image': openapi.Schema(type=openapi.TYPE_STRING, description="Base64 encoded image (with MIME prefix)"),
+                'async': openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Spool the frame and return 202 with an ingest_id (default SKU_INGEST_ASYNC)")
             }
         ),
         responses={
             201: openapi.Response(description="Image uploaded successfully", schema=SKUImagesSerializer),
+            202: "Frame queued for ingest",
             400: "Bad request",
             404: "SKU or Version not found"
         }
@@ -1472,24 +1997,265 @@ class CameraImageCaptureViewset(viewsets.ViewSet):
         except Exception:
             return Response({"message": "Invalid base64 image format."}, status=status.HTTP_400_BAD_REQUEST)
 
-        content_hash = hashlib.md5(decoded_image).hexdigest()
-        random_name = secrets.token_hex(4)[:7]
-        filename = f"{random_name}.{ext}"
-        image_file = ContentFile(decoded_image, name=filename)
+        if wants_async_ingest(request.data.get('async')):
+            return self._spool_frame(request, sku, version, tags, decoded_image, ext)
+
+        self._save_frame(sku, version, tags, decoded_image, ext)
 
-        image_obj = SKUImages.objects.create(
+        return Response({
+            "message": "Image uploaded successfully.",
+            "status": status.HTTP_201_CREATED,
+        }, status=status.HTTP_201_CREATED)
+
+    CAPTURE_FORMATS = {"png", "jpg", "jpeg", "webp", "bmp"}
+
+    def _build_frame(self, sku, version, tags, image_bytes, filename, captured_at=None):
+        """Store the bytes of one captured frame and return its unsaved SKUImages row."""
+        image_obj = SKUImages(
             sku=sku,
             version=version,
             tags=tags,
-            image=image_file,
             original_filename=filename,
-            content_hash=content_hash
+            captured_at=captured_at or timezone.now()
         )
 
+        if cas_enabled():
+            image_obj.image.name, image_obj.content_hash, image_obj.file_size = write_blob(io.BytesIO(image_bytes), filename)
+        else:
+            image_obj.content_hash = hashlib.md5(image_bytes).hexdigest()
+            image_obj.file_size = len(image_bytes)
+            image_obj.image.save(filename, ContentFile(image_bytes), save=False)
+        image_obj.perceptual_hash = dhash(io.BytesIO(image_bytes))
+        image_obj.previews, image_obj.width, image_obj.height = generate_previews(io.BytesIO(image_bytes), image_obj.content_hash)
+        return image_obj
+
+    def _save_frame(self, sku, version, tags, image_bytes, ext):
+        """Store one captured frame under a random name and create its SKUImages row."""
+        random_name = secrets.token_hex(4)[:7]
+        image_obj = self._build_frame(sku, version, tags, image_bytes, f"{random_name}.{ext}")
+        if cas_enabled():
+            register_blobs([image_obj])
+        image_obj.save()
+        record_created([image_obj])
+        return image_obj
+
+    def _spool_frame(self, request, sku, version, tags, image_bytes, ext):
+        """Queue one captured frame as an ingest job and answer 202."""
+        filename = f"{secrets.token_hex(4)[:7]}.{ext}"
+        job = spool_ingest_job(
+            sku,
+            version,
+            [(io.BytesIO(image_bytes), filename, {"captured_at": timezone.now().isoformat()})],
+            kind=IngestJob.KIND_CAPTURE,
+            tags=tags,
+            allow_duplicates=True
+        )
+        return ingest_job_accepted(request, job)
+
+    @staticmethod
+    def _spool_body(request):
+        """
+        Copy the raw request body in chunks into a SpooledTemporaryFile (kept in
+        memory up to FILE_UPLOAD_MAX_MEMORY_SIZE) and return it rewound, None when
+        it exceeds SKU_CAPTURE_MAX_FRAME_SIZE.
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        stream = request.stream
+        size = 0
+        if stream is not None:
+            for data in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                size += len(data)
+                if size > settings.SKU_CAPTURE_MAX_FRAME_SIZE:
+                    body.close()
+                    return None
+                body.write(data)
+        body.seek(0)
+        return body
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Upload a raw (binary) camera frame to SKUImages",
+        operation_description="""
+        Same as the base64 capture endpoint without the base64/JSON overhead.
+        Send the frame either as the raw request body (`Content-Type: application/octet-stream`
+        or `image/<format>`) with `sku_id`, `version_id`, `tags` and `image_format` in the query string,
+        or as a multipart `image` file (fields may then also be sent in the form).
+        """,
+        manual_parameters=[
+            openapi.Parameter('sku_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the SKU"),
+            openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the Version"),
+            openapi.Parameter('tags', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Optional image tags"),
+            openapi.Parameter('image_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Image format of a raw body (png, jpg, webp, ...), defaults to the Content-Type subtype or png"),
+            openapi.Parameter('async', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Spool the frame and return 202 with an ingest_id (default SKU_INGEST_ASYNC)"),
+        ],
+        responses={201: "Image uploaded successfully", 400: "Bad request", 404: "SKU or Version not found", 413: "Frame too large"}
+    )
+    @action(detail=False, methods=['post'], url_path='binary')
+    def binary(self, request):
+        params = request.query_params
+        content_type = (request.content_type or '').split(';')[0].strip().lower()
+
+        if content_type.startswith('multipart/'):
+            upload = request.FILES.get('image')
+            if not upload:
+                return Response({"message": "image file is required."}, status=status.HTTP_400_BAD_REQUEST)
+            fields = request.data
+            image_bytes = upload.read()
+            ext = os.path.splitext(upload.name)[1].lstrip('.') or params.get('image_format') or 'png'
+        else:
+            fields = params
+            # Raw body: streamed rather than request.body, which DATA_UPLOAD_MAX_MEMORY_SIZE caps at 2.5 MB
+            body = self._spool_body(request)
+            if body is None:
+                return Response({"message": f"Frame exceeds {settings.SKU_CAPTURE_MAX_FRAME_SIZE} bytes."},
+                                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            image_bytes = body.read()
+            subtype = content_type.split('/')[-1] if content_type.startswith('image/') else ''
+            ext = params.get('image_format') or subtype or 'png'
+
+        sku_id = params.get('sku_id') or fields.get('sku_id')
+        version_id = params.get('version_id') or fields.get('version_id')
+        tags = params.get('tags') or fields.get('tags', '')
+        ext = ext.lower()
+
+        if not all([sku_id, version_id, image_bytes]):
+            return Response({"message": "sku_id, version_id, and image are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if ext not in self.CAPTURE_FORMATS:
+            return Response({"message": f"Unsupported image format '{ext}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sku = SKU.objects.get(id=sku_id)
+        except SKU.DoesNotExist:
+            return Response({"message": "Invalid sku_id."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            version = Versions.objects.get(id=version_id)
+        except Versions.DoesNotExist:
+            return Response({"message": "Invalid version_id."}, status=status.HTTP_404_NOT_FOUND)
+
+        if wants_async_ingest(params.get('async')):
+            return self._spool_frame(request, sku, version, tags, image_bytes, ext)
+
+        self._save_frame(sku, version, tags, image_bytes, ext)
+
         return Response({
             "message": "Image uploaded successfully.",
             "status": status.HTTP_201_CREATED,
         }, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Upload a batch of camera frames to SKUImages",
+        operation_description="""
+        Multipart request carrying N frames as repeated `images` file parts, inserted with one bulk write.
+        `sku_id`, `version_id` and `tags` may be sent in the query string or the form.
+        The optional `metadata` form field is a JSON list aligned with the `images` parts,
+        e.g. `[{"filename": "cam1_0001.png", "timestamp": "2025-01-01T10:00:00.123Z"}, ...]`;
+        `timestamp` may also be a Unix epoch in seconds. Missing filenames fall back to the
+        part's filename, missing timestamps to the time of arrival.
+        """,
+        manual_parameters=[
+            openapi.Parameter('sku_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the SKU"),
+            openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the Version"),
+            openapi.Parameter('tags', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Optional image tags"),
+            openapi.Parameter('async', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Spool the frames and return 202 with an ingest_id (default SKU_INGEST_ASYNC)"),
+        ],
+        responses={201: "Frames uploaded successfully", 202: "Frames queued for ingest", 400: "Bad request", 404: "SKU or Version not found"}
+    )
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        params = request.query_params
+        sku_id = params.get('sku_id') or request.data.get('sku_id')
+        version_id = params.get('version_id') or request.data.get('version_id')
+        tags = params.get('tags') or request.data.get('tags', '')
+        uploads = request.FILES.getlist('images')
+
+        if not all([sku_id, version_id, uploads]):
+            return Response({"message": "sku_id, version_id, and images are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            metadata = json.loads(request.data.get('metadata') or '[]')
+            if not isinstance(metadata, list) or not all(isinstance(meta, dict) for meta in metadata):
+                raise ValueError
+        except ValueError:
+            return Response({"message": "metadata must be a JSON list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if metadata and len(metadata) != len(uploads):
+            return Response({"message": f"metadata has {len(metadata)} entries for {len(uploads)} images."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        frames_info = []
+        for index, upload in enumerate(uploads):
+            meta = metadata[index] if metadata else {}
+            filename = os.path.basename(str(meta.get('filename') or upload.name))
+            ext = os.path.splitext(filename)[1].lstrip('.').lower()
+            if ext not in self.CAPTURE_FORMATS:
+                return Response({"message": f"Unsupported image format for '{filename}'."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            captured_at = parse_capture_timestamp(meta.get('timestamp'))
+            if meta.get('timestamp') is not None and captured_at is None:
+                return Response({"message": f"Invalid timestamp for '{filename}'."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            frames_info.append((upload, filename, captured_at))
+
+        try:
+            sku = SKU.objects.get(id=sku_id)
+        except SKU.DoesNotExist:
+            return Response({"message": "Invalid sku_id."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            version = Versions.objects.get(id=version_id)
+        except Versions.DoesNotExist:
+            return Response({"message": "Invalid version_id."}, status=status.HTTP_404_NOT_FOUND)
+
+        if wants_async_ingest(params.get('async') or request.data.get('async')):
+            job = spool_ingest_job(
+                sku,
+                version,
+                [
+                    (upload, filename, {"captured_at": (captured_at or timezone.now()).isoformat()})
+                    for upload, filename, captured_at in frames_info
+                ],
+                kind=IngestJob.KIND_CAPTURE,
+                tags=tags,
+                allow_duplicates=True
+            )
+            return ingest_job_accepted(request, job)
+
+        def build(frame_info):
+            upload, filename, captured_at = frame_info
+            return self._build_frame(sku, version, tags, upload.read(), filename, captured_at)
+
+        frames = []
+        try:
+            # Hashing and preview encoding are CPU bound per frame, spread them like uploads
+            with ThreadPoolExecutor(max_workers=settings.SKU_UPLOAD_WORKERS) as executor:
+                futures = [executor.submit(build, frame_info) for frame_info in frames_info]
+            # The pool is drained here; keep every written frame so a failure cleans them all up
+            frames = [future.result() for future in futures if not future.exception()]
+            errors = [future.exception() for future in futures if future.exception()]
+            if errors:
+                raise errors[0]
+
+            with transaction.atomic():
+                if cas_enabled():
+                    register_blobs(frames)
+                SKUImages.objects.bulk_create(frames, batch_size=BULK_BATCH_SIZE)
+                record_created(frames)
+        except Exception as e:
+            # Blob files may be shared and are left to the blob GC
+            if not cas_enabled():
+                for frame in frames:
+                    frame.image.delete(save=False)
+            return Response({"message": f"Error saving frames: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            "message": f"{len(frames)} frame(s) uploaded successfully.",
+            "count": len(frames),
+            "status": status.HTTP_201_CREATED,
+        }, status=status.HTTP_201_CREATED)
         
         
 class DataSetViewset(viewsets.ViewSet):
@@ -1501,6 +2267,8 @@ class DataSetViewset(viewsets.ViewSet):
             openapi.Parameter('sku_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the SKU"),
             openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description="Comma-separated Version IDs (e.g., 1,2,3 or just 3)"),
             openapi.Parameter('absolute_path', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False, description="Whether to return absolute paths"),
+            openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Comma-separated subset of image,label_id,split_label"),
+            openapi.Parameter('stream', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, enum=['json', 'ndjson'], description="Stream the rows as they are read: a JSON array (json) or one JSON object per line (ndjson)"),
         ],
         responses={
             200: openapi.Response(description="Filtered image list", schema=openapi.Schema(
@@ -1529,18 +2297,64 @@ class DataSetViewset(viewsets.ViewSet):
         except ValueError:
             return Response({"message": "Invalid version_ids format. Must be comma-separated integers."}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            rows = SKUImageLabelRows(
+                SKUImageLabelRows.parse_fields(request.query_params.get('fields')),
+                context={'request': request, 'absolute_path': absolute_path}
+            )
+            mode = stream_mode(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         queryset = SKUImages.objects.filter(
             sku_id=sku_id,
             version_id__in=version_id_list,
             label__isnull=False
         )
 
-        serializer = SKUImageLabelSerializer(
-            queryset,
-            many=True,
-            context={'request': request, 'absolute_path': absolute_path}
+        if mode:
+            return stream_rows(rows.stream(queryset, chunk_size=STREAM_CHUNK_SIZE), mode)
+        return Response(rows.serialize(queryset), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Download the dataset manifest",
+        operation_description=(
+            "Arrow IPC file with one row per labeled image of the given versions: image_path (absolute), "
+            "label_index (0 for Good, 1 for Bad), split, content_hash, width and height. It is written once per "
+            "dataset snapshot and can be memory-mapped by the training and testing jobs."
+        ),
+        manual_parameters=[
+            openapi.Parameter('sku_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="ID of the SKU"),
+            openapi.Parameter('version_id', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description="Comma-separated Version IDs (e.g., 1,2,3 or just 3)"),
+        ],
+        responses={
+            200: openapi.Response(description="Arrow IPC file"),
+            400: "Missing parameters",
+            501: "pyarrow is not installed",
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='manifest')
+    def manifest(self, request):
+        sku_id = request.query_params.get('sku_id')
+        version_ids = request.query_params.get('version_id')
+        if not sku_id or not version_ids:
+            return Response({"message": "sku_id and version_ids are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        version_id_list = [int(v.strip()) for v in version_ids.split(',') if v.strip().isdigit()]
+        if not sku_id.isdigit() or not version_id_list:
+            return Response({"message": "Invalid sku_id or version_ids format. Must be comma-separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            name = write_manifest(int(sku_id), version_id_list)
+        except ManifestUnavailable as e:
+            return Response({"message": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        return FileResponse(
+            default_storage.open(name, 'rb'),
+            content_type=MANIFEST_CONTENT_TYPE,
+            as_attachment=True,
+            filename=os.path.basename(name),
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
     
@@ -1622,7 +2436,9 @@ class DatasetSplitViewSet(viewsets.ViewSet):
         train_end = int(total * train_split / 100)
         val_end = train_end + int(total * val_split / 100)
 
+        stats_delta = StatsDelta()
         for i, image in enumerate(images):
+            bucket_before = image_bucket(image)
             if i < train_end:
                 image.split_label = "train"
             elif i < val_end:
@@ -1633,6 +2449,8 @@ class DatasetSplitViewSet(viewsets.ViewSet):
             # ✅ Mark as part of dataset
             image.data_set = True  
             image.save()
+            stats_delta.move(bucket_before, image)
+        stats_delta.apply()
 
         return Response({
             "message": "Dataset split successfully.",
@@ -1774,6 +2592,14 @@ class FinalDataSet(viewsets.ViewSet):
                 description="SKU ID to filter dataset images",
                 type=openapi.TYPE_INTEGER,
                 required=True
+            ),
+            openapi.Parameter(
+                'stream',
+                openapi.IN_QUERY,
+                description="Stream the response as it is read: the grouped JSON object (json) or one image per line with its version (ndjson)",
+                type=openapi.TYPE_STRING,
+                enum=['json', 'ndjson'],
+                required=False
             )
         ],
         operation_summary="Get Dataset Images Grouped by Version with Count and Metadata",
@@ -1807,6 +2633,10 @@ class FinalDataSet(viewsets.ViewSet):
         sku_id = request.query_params.get("sku_id")
         if not sku_id:
             return Response({"message": "sku_id is required as query param"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            mode = stream_mode(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         images = SKUImages.objects.filter(
             sku_id=sku_id,
@@ -1817,6 +2647,9 @@ class FinalDataSet(viewsets.ViewSet):
         if not images.exists():
             return Response({"message": "No images found."}, status=status.HTTP_404_NOT_FOUND)
 
+        if mode:
+            return self.stream(request, images, mode)
+
         grouped_data = {}
         for img in images:
             version_name = img.version.name if img.version else "Unknown Version"
@@ -1842,6 +2675,44 @@ class FinalDataSet(viewsets.ViewSet):
             grouped_data[version_name]["count"] += 1
 
         return Response(grouped_data, status=status.HTTP_200_OK)
+
+    def stream(self, request, images, mode):
+        """
+        Send the listing while the images are read. ndjson gives one image per
+        line with its version; json gives the grouped object above. Its groups
+        are written one after the other by ordering on the version name, and
+        their counts, which come before the images, are read up front.
+        """
+        images = images.annotate(
+            version_group=Coalesce("version__name", Value("Unknown Version"))
+        ).order_by("version_group", "id")
+        rows = DataSetImageRows(context={'request': request}).stream(images, chunk_size=STREAM_CHUNK_SIZE)
+        if mode == 'ndjson':
+            return stream_rows(rows, mode)
+
+        counts = dict(images.order_by().values_list("version_group").annotate(count=Count("id")))
+        return streaming_response(self.grouped_json(rows, counts), mode)
+
+    @staticmethod
+    def grouped_json(rows, counts):
+        yield '{'
+        current = None
+        for row in rows:
+            version_name = row.pop('version')
+            version_id = row.pop('version_id')
+            if version_name != current:
+                if current is not None:
+                    yield ']},'
+                yield (
+                    f'{encode(version_name)}:{{"count":{counts.get(version_name, 0)},'
+                    f'"version_id":{encode(version_id)},"images":['
+                )
+                current, separator = version_name, ''
+            yield separator + encode(row)
+            separator = ','
+        if current is not None:
+            yield ']}'
+        yield '}'
     
 # from pathlib import Path
 
@@ -2042,6 +2913,8 @@ class TrainingRunnerViewSet(viewsets.ViewSet):
                 "--max_epochs", str(max_epochs),
                 "--progress_api", progress_api
             ]
+            if "fetch_dataset_url" not in request.data:
+                args.extend(dataset_manifest_args(sku.id, version_id_str))
 
             optional_args = {
                 "seed": 42,
@@ -2260,6 +3133,8 @@ class TestRunnerViewSet(viewsets.ViewSet):
                 "--results_save_dir", results_save_dir,
                 "--progress_api", progress_api
             ]
+            if "fetch_testset_url" not in request.data:
+                args.extend(dataset_manifest_args(sku_id, version_ids))
 
             # Timestamp for result saving (if needed in script)
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
@@ -2443,11 +3318,15 @@ class TestResultsViewSet(viewsets.ViewSet):
         }
     )
     def list(self, request):
+        """
+        Pass `cursor` or `page_size` (and optionally `include_count=true`)
+        to page through the results by id instead of getting them all at once.
+        """
         sku_id = request.query_params.get("sku_id")
         version_id = request.query_params.get("version_id")
         search = request.query_params.get("search")
 
-        test_results = TestResults.objects.all()
+        test_results = TestResults.objects.order_by('id')
 
         if sku_id:
             test_results = test_results.filter(sku_id=sku_id)
@@ -2456,6 +3335,9 @@ class TestResultsViewSet(viewsets.ViewSet):
         if search:
             test_results = test_results.filter(image__icontains=search)
 
+        paginator = IdCursorPagination() if IdCursorPagination.is_requested(request) else None
+        page = paginator.paginate_queryset(test_results, request, view=self) if paginator else test_results
+
         results = [
             {
                 "id": tr.id,
@@ -2465,9 +3347,11 @@ class TestResultsViewSet(viewsets.ViewSet):
                 "image_url": tr.image.url if tr.image else None,
                 "meta_data": tr.meta_data
             }
-            for tr in test_results
+            for tr in page
         ]
 
+        if paginator:
+            return paginator.get_paginated_response(results)
         return Response({"results": results}, status=status.HTTP_200_OK)
 
 class TestResultsFolderViewSet(viewsets.ViewSet):
@@ -3056,63 +3940,90 @@ class VersionDuplicateViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Files first, outside of the transaction: hard links (or reflinks/copies) rather than rewritten bytes
+        new_images = []
+        skipped = []  # Images left out of the duplicate, reported back
+        placed = []
+        for original_image in SKUImages.objects.filter(version=original_version).order_by('id').iterator(chunk_size=BULK_BATCH_SIZE):
+            new_image = SKUImages(
+                sku_id=original_image.sku_id,
+                tags=original_image.tags,
+                original_filename=original_image.original_filename,
+                # Same bytes, the stored hash still holds
+                content_hash=original_image.content_hash,
+                label_id=original_image.label_id,
+                rejected=original_image.rejected,
+                split_label=original_image.split_label,
+                data_set=original_image.data_set,
+                captured_at=original_image.captured_at,
+                perceptual_hash=original_image.perceptual_hash,
+                previews=original_image.previews,
+                width=original_image.width,
+                height=original_image.height,
+                file_size=original_image.file_size
+            )
+
+            if original_image.blob_id:
+                # Shared blob: the duplicate references the same file
+                new_image.image = original_image.image.name
+                new_image.blob_id = original_image.blob_id
+            elif original_image.image:
+                source_path = default_storage.path(original_image.image.name)
+                filename = original_image.original_filename or os.path.basename(original_image.image.name)
+                if not os.path.exists(source_path):
+                    logger.warning("Not duplicating image %s: file not found: %s", original_image.id, source_path)
+                    skipped.append({"image_id": original_image.id, "filename": filename, "reason": "File not found"})
+                    continue
+                new_name = default_storage.get_available_name(
+                    f'sku_images/{original_version.sku_id}/{new_version_name}/{filename}'
+                )
+                target_path = default_storage.path(new_name)
+                try:
+                    placed.append((source_path, target_path, place_file(source_path, target_path)))
+                except OSError as e:
+                    logger.warning("Not duplicating image %s: error copying %s: %s", original_image.id, source_path, e)
+                    skipped.append({"image_id": original_image.id, "filename": filename, "reason": f"Error copying image file: {e}"})
+                    continue
+                new_image.image = new_name
+                if not new_image.content_hash:
+                    with open(target_path, 'rb') as f:
+                        new_image.content_hash = hash_stream(f)
+
+            new_images.append(new_image)
+
         try:
             with transaction.atomic():
                 new_version = Versions.objects.create(
                     name=new_version_name,
                     sku=original_version.sku
                 )
-
-                original_images = SKUImages.objects.filter(version=original_version)
-                duplicated_images_count = 0
-
-                for original_image in original_images:
-                    new_image = SKUImages(
-                        sku=original_image.sku,
-                        tags=original_image.tags,
-                        version=new_version,
-                        original_filename=original_image.original_filename,
-                        content_hash=original_image.content_hash,
-                        label=original_image.label,
-                        rejected=original_image.rejected,
-                        split_label=original_image.split_label,
-                        data_set=original_image.data_set
-                    )
-
-                    if original_image.image:
-                        try:
-                            original_image.image.seek(0)
-                            image_content = original_image.image.read()
-                            filename = original_image.original_filename or original_image.image.name.split('/')[-1]
-                            new_image.image.save(
-                                filename,
-                                ContentFile(image_content),
-                                save=False
-                            )
-                            new_image.content_hash = hashlib.md5(image_content).hexdigest()
-                        except Exception as e:
-                            print(f"Error copying image file: {e}")
-                            continue
-
-                    new_image.save()
-                    duplicated_images_count += 1
-
-                return Response({
-                    "id": new_version.id,
-                    "name": new_version.name,
-                    "sku": new_version.sku.id,
-                    "duplicated_images_count": duplicated_images_count,
-                    "message": f"Version '{new_version_name}' created successfully with {duplicated_images_count} images duplicated."
-                }, status=status.HTTP_201_CREATED)
-
+                for new_image in new_images:
+                    new_image.version = new_version
+                created = SKUImages.objects.bulk_create(new_images, batch_size=BULK_BATCH_SIZE)
+                record_created(created)
         except Exception as e:
+            for source_path, target_path, how in placed:
+                unplace_file(source_path, target_path, how)
             return Response(
                 {"message": f"Error duplicating version: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+        duplicated_images_count = len(created)
+        message = f"Version '{new_version_name}' created successfully with {duplicated_images_count} images duplicated."
+        if skipped:
+            message += f" {len(skipped)} image(s) skipped."
+        return Response({
+            "id": new_version.id,
+            "name": new_version.name,
+            "sku": new_version.sku.id,
+            "duplicated_images_count": duplicated_images_count,
+            "skipped": skipped,
+            "message": message
+        }, status=status.HTTP_201_CREATED)
             
 
-progress_queue = deque(maxlen=1000)
+from .progress import progress_queue
 active_streams = {}
 
 class TrainingProgressViewSet(viewsets.ViewSet):
@@ -3253,7 +4164,7 @@ def stream_page(request):
 
 
 
-progress_queue = deque(maxlen=1000)
+from .progress import progress_queue
 active_streams = {}
 
 class TestingProgressViewset(viewsets.ViewSet):
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users.models import CustomUser, normalize_email_search, normalize_phone_search
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Fill the normalized email/phone search columns of users saved before they existed, or that drifted."
+
+    def handle(self, *args, **options):
+        ids = list(CustomUser.objects.order_by('id').values_list('id', flat=True))
+        updated = 0
+        for start in range(0, len(ids), BATCH_SIZE):
+            changed = []
+            batch = CustomUser.objects.filter(id__in=ids[start:start + BATCH_SIZE]).only(
+                'id', 'email', 'phone_number', 'email_search', 'phone_search'
+            )
+            for user in batch:
+                email_search = normalize_email_search(user.email)
+                phone_search = normalize_phone_search(user.phone_number)
+                if (user.email_search, user.phone_search) != (email_search, phone_search):
+                    user.email_search, user.phone_search = email_search, phone_search
+                    changed.append(user)
+            updated += CustomUser.objects.bulk_update(changed, ['email_search', 'phone_search'])
+        self.stdout.write(self.style.SUCCESS(f"{updated} of {len(ids)} user(s) updated."))
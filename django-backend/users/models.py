@@ -9,9 +9,24 @@ class Role(models.Model):
     name = models.CharField(max_length=100,blank=True,null=True)
     is_active = models.BooleanField(null=True,default=True)
 
+def normalize_email_search(value):
+    """Lowercased email, the form the user directory searches on."""
+    return str(value).strip().lower() if value else None
+
+
+def normalize_phone_search(value):
+    """Digits of a phone number, so "+91 98765-43210" and "9198765 43210" match alike."""
+    digits = ''.join(ch for ch in str(value) if ch.isdigit()) if value is not None else ''
+    return digits or None
+
+
 class CustomUser(AbstractUser):
     class Meta:
         db_table = "CustomUser"
+        indexes = [
+            models.Index(fields=['email_search'], name='customuser_email_search_idx'),
+            models.Index(fields=['phone_search'], name='customuser_phone_search_idx'),
+        ]
     first_name = models.CharField(max_length=100,blank=True,null=True)
     last_name = models.CharField(max_length=100,blank=True,null=True)
     email = models.EmailField(null=True,blank=True)
@@ -28,6 +43,17 @@ class CustomUser(AbstractUser):
     failed_login_attempts = models.PositiveIntegerField(default=0,null=True,blank=True)
     last_failed_login = models.DateTimeField(null=True, blank=True)
     link_expire_token = models.CharField(max_length=250,null=True,blank=True)
+    # Normalized copies of email/phone_number for indexed lookups, kept in sync by save()
+    email_search = models.CharField(max_length=254,null=True,blank=True,editable=False)
+    phone_search = models.CharField(max_length=100,null=True,blank=True,editable=False)
+
+    def save(self, *args, **kwargs):
+        self.email_search = normalize_email_search(self.email)
+        self.phone_search = normalize_phone_search(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'email', 'phone_number'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'email_search', 'phone_search'}
+        super().save(*args, **kwargs)
     
 
 class DisposableDomains(models.Model):
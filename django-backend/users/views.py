@@ -11,7 +11,9 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import CustomUser,Role,DisposableDomains
+from .models import CustomUser,Role,DisposableDomains,normalize_email_search,normalize_phone_search
+from django.db.models import F, Q
+from utils.custom_pagination import CustomPagination
 from django.contrib.auth.hashers import check_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import timedelta
@@ -26,6 +28,29 @@ from django.template.loader import render_to_string
 from datetime import datetime, timedelta
 from django.forms.models import model_to_dict
 
+# model_to_dict() fields of a user minus the password; many-to-many groups/permissions are not listed
+USER_DIRECTORY_FIELDS = [
+    field.name for field in CustomUser._meta.concrete_fields if field.editable and field.name != 'password'
+]
+
+
+SEARCH_MATCHES = ('contains', 'prefix')
+
+
+def search_filter(field, value, match='contains'):
+    """
+    `field` (a normalized search column) contains `value`, or starts with it
+    for match="prefix". Only the prefix form can use the field's index, it is
+    written as a range for that (LIKE 'x%' is not index-assisted on every
+    backend); contains is a LIKE '%x%' scan. An empty value matches nothing.
+    """
+    if not value:
+        return Q(pk__in=[])
+    if match == 'prefix':
+        return Q(**{f'{field}__gte': value, f'{field}__lt': value + '\U0010ffff'})
+    return Q(**{f'{field}__contains': value})
+
+
 class UserAPIView(viewsets.ViewSet):
     """
     API endpoints for managing CustomUser.
@@ -35,12 +60,15 @@ class UserAPIView(viewsets.ViewSet):
         operation_summary="Get all users (with filters)",
         operation_description="Retrieve a list of users with optional filters: email, phone_number, role, is_authorized, is_verified.",
         manual_parameters=[
-            openapi.Parameter('email', openapi.IN_QUERY, description="Filter by email", type=openapi.TYPE_STRING),
-            openapi.Parameter('phone_number', openapi.IN_QUERY, description="Filter by phone number", type=openapi.TYPE_STRING),
+            openapi.Parameter('email', openapi.IN_QUERY, description="Filter by email substring (case-insensitive)", type=openapi.TYPE_STRING),
+            openapi.Parameter('phone_number', openapi.IN_QUERY, description="Filter by phone number substring (digits only are compared; a query without digits matches the raw number)", type=openapi.TYPE_STRING),
+            openapi.Parameter('match', openapi.IN_QUERY, description="How email and phone_number match: contains (default, scans the table) or prefix (served by the email_search/phone_search indexes)", type=openapi.TYPE_STRING),
             openapi.Parameter('role', openapi.IN_QUERY, description="Filter by role id", type=openapi.TYPE_INTEGER),
             openapi.Parameter('is_authorized', openapi.IN_QUERY, description="Filter by active status (true/false)", type=openapi.TYPE_BOOLEAN),
             openapi.Parameter('is_verified', openapi.IN_QUERY, description="Filter by verified status (true/false)", type=openapi.TYPE_BOOLEAN),
             openapi.Parameter('country_code', openapi.IN_QUERY, description="Filter by country code", type=openapi.TYPE_STRING),
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number; paginates the directory when page or page_size is given", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Users per page (max 500)", type=openapi.TYPE_INTEGER),
         ],
         responses={
             200: openapi.Response("List of filtered users", openapi.Schema(
@@ -61,10 +89,20 @@ class UserAPIView(viewsets.ViewSet):
         is_authorized = request.query_params.get('is_authorized')
         is_verified = request.query_params.get('is_verified')
         country_code = request.query_params.get('country_code')
+        match = (request.query_params.get('match') or 'contains').lower()
+        if match not in SEARCH_MATCHES:
+            return Response({"message": f"Invalid match value. Allowed: {', '.join(SEARCH_MATCHES)}", "status": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
         if email:
-            users = users.filter(email__icontains=email)
+            users = users.filter(search_filter('email_search', normalize_email_search(email), match))
         if phone_number:
-            users = users.filter(phone_number__icontains=phone_number)
+            phone_digits = normalize_phone_search(phone_number)
+            if phone_digits:
+                users = users.filter(search_filter('phone_search', phone_digits, match))
+            elif match == 'prefix':
+                users = users.filter(phone_number__istartswith=phone_number.strip())
+            else:
+                # Nothing to compare on the digits column ("+", "-"), search the number as stored
+                users = users.filter(phone_number__icontains=phone_number)
         if role:
             users = users.filter(role_id=role)
         if country_code:
@@ -75,18 +113,14 @@ class UserAPIView(viewsets.ViewSet):
             users = users.filter(is_verified=is_verified.lower() == 'true')
 
         # Order by latest ID
-        users = users.order_by('-id')
-
-        # Convert to list and exclude 'password'
-        user_data = []
-        for user in users:
-            user_dict = model_to_dict(user)
-            user_dict.pop('password', None)
-            user_dict['role_name'] = user.role.name if user.role else None
-            user_data.append(user_dict)
+        users = users.order_by('-id').values(*USER_DIRECTORY_FIELDS, role_name=F('role__name'))
 
+        if 'page' in request.query_params or 'page_size' in request.query_params:
+            paginator = CustomPagination()
+            page = paginator.paginate_queryset(users, request, view=self)
+            return paginator.get_paginated_response(page)
 
-        return Response({"results": user_data, "status": status.HTTP_200_OK})
+        return Response({"results": list(users), "status": status.HTTP_200_OK})
 
 
     @swagger_auto_schema(
@@ -101,7 +135,7 @@ class UserAPIView(viewsets.ViewSet):
         ],
     )
     def retrieve(self, request, pk=None):
-        user = CustomUser.objects.filter(pk=pk).first()
+        user = CustomUser.objects.select_related('role').filter(pk=pk).first()
 
         if not user:
             return Response({"message": "User not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -1,5 +1,5 @@
 from math import ceil
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 class CustomPagination(PageNumberPagination):
@@ -20,3 +20,38 @@ class CustomPagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'results': data
         })
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: each page is `WHERE id > <last id> ORDER BY id LIMIT n`,
+    so a deep page costs the same as the first one. Cursors in `next`/`previous` are opaque.
+    The total row count is only computed when asked for with `?include_count=true`.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_query_param = 'include_count'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Views keep their unpaginated response unless the client opts in with a cursor or page size."""
+        return any(param in request.query_params for param in (cls.cursor_query_param, cls.page_size_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total_count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('true', '1'):
+            self.total_count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = {
+            'page_size': self.page_size,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        }
+        if self.total_count is not None:
+            response['total_count'] = self.total_count
+        return Response(response)
@@ -14,51 +14,102 @@ from django.utils.timezone import now, localtime
 from PIL import Image, UnidentifiedImageError
 from .models import TrainingImage
 from users.models import CustomUser
-from sku.models import SKU
+from django.db.models import Count, Q
+from utils.custom_pagination import CustomPagination
 User = get_user_model()
 
+def workspace_queryset():
+    """Workspaces with their creator and field assistant joined in and their SKU count annotated."""
+    return Workspace.objects.select_related('created_by', 'field_assistant').annotate(
+        skus_in_workspace=Count('sku', filter=Q(sku__is_deleted=False))
+    )
+
+
+def serialize_workspace(ws):
+    return {
+        "id": ws.id,
+        "name": ws.name,
+        "created_at": localtime(ws.created_at).strftime('%Y-%m-%dT%H:%M:%S'),
+        "created_by_id": ws.created_by.id if ws.created_by else None,
+        "created_by_name": f"{ws.created_by.first_name} {ws.created_by.last_name}".strip() if ws.created_by else None,
+        "is_activated": ws.is_activated,
+        "activation_key": ws.activation_key,
+        "activation_key_expiry": ws.activation_key_expiry,
+        "failed_activation_attempts": ws.failed_activation_attempts,
+        "field_assistant_id": ws.field_assistant.id if ws.field_assistant else None,
+        "field_assistant_name": f"{ws.field_assistant.first_name} {ws.field_assistant.last_name}".strip() if ws.field_assistant else None,
+        "field_assistant_phone_number": ws.field_assistant.phone_number if ws.field_assistant else None,
+        "sku_count": ws.skus_in_workspace,
+        "sku_total_count": ws.sku_count,
+    }
+
+
 class WorkspaceViewSet(viewsets.ViewSet):
     # authentication_classes = [JWTAuthentication]
     # permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_summary="List all workspaces (with optional created_by filter)",
+        operation_summary="List all workspaces (with optional filters and pagination)",
         manual_parameters=[
             openapi.Parameter(
                 'created_by', openapi.IN_QUERY,
                 description="Filter workspaces by creator's user ID",
                 type=openapi.TYPE_INTEGER
-            )
+            ),
+            openapi.Parameter(
+                'field_assistant', openapi.IN_QUERY,
+                description="Filter workspaces by field assistant's user ID",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'is_activated', openapi.IN_QUERY,
+                description="Filter by activation state (true or false)",
+                type=openapi.TYPE_BOOLEAN
+            ),
+            openapi.Parameter(
+                'search', openapi.IN_QUERY,
+                description="Case-insensitive match on the workspace name",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page', openapi.IN_QUERY,
+                description="Page number. Passing page or page_size returns a paginated response",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Workspaces per page (max 500)",
+                type=openapi.TYPE_INTEGER
+            ),
         ],
         responses={200: openapi.Response(description="List of workspaces")}
     )
     def list(self, request):
         created_by_id = request.query_params.get("created_by")
-        
-        raw_workspaces = Workspace.objects.all().order_by('-id')
+        field_assistant_id = request.query_params.get("field_assistant")
+        is_activated = request.query_params.get("is_activated")
+        search = request.query_params.get("search")
+
+        raw_workspaces = workspace_queryset().order_by('-id')
 
         if created_by_id:
             raw_workspaces = raw_workspaces.filter(created_by__id=created_by_id)
-
-        workspaces = []
-        for ws in raw_workspaces:
-            workspaces.append({
-                "id": ws.id,
-                "name": ws.name,
-                "created_at": localtime(ws.created_at).strftime('%Y-%m-%dT%H:%M:%S'),
-                "created_by_id": ws.created_by.id if ws.created_by else None,
-                "created_by_name": f"{ws.created_by.first_name} {ws.created_by.last_name}".strip() if ws.created_by else None,
-                "is_activated": ws.is_activated,
-                "activation_key": ws.activation_key,
-                "activation_key_expiry": ws.activation_key_expiry,
-                "failed_activation_attempts": ws.failed_activation_attempts,
-                "field_assistant_id": ws.field_assistant.id if ws.field_assistant else None,
-                "field_assistant_name": f"{ws.field_assistant.first_name} {ws.field_assistant.last_name}".strip() if ws.field_assistant else None,
-                "field_assistant_phone_number": ws.field_assistant.phone_number if ws.field_assistant else None,
-                "sku_count": SKU.objects.filter(workspace=ws).count() ,
-                "sku_total_count":ws.sku_count,
-            })
-
+        if field_assistant_id:
+            raw_workspaces = raw_workspaces.filter(field_assistant__id=field_assistant_id)
+        if is_activated is not None:
+            if is_activated.lower() in ['true', '1']:
+                raw_workspaces = raw_workspaces.filter(is_activated=True)
+            elif is_activated.lower() in ['false', '0']:
+                raw_workspaces = raw_workspaces.exclude(is_activated=True)
+        if search:
+            raw_workspaces = raw_workspaces.filter(name__icontains=search)
+
+        if 'page' in request.query_params or 'page_size' in request.query_params:
+            paginator = CustomPagination()
+            page = paginator.paginate_queryset(raw_workspaces, request, view=self)
+            return paginator.get_paginated_response([serialize_workspace(ws) for ws in page])
+
+        workspaces = [serialize_workspace(ws) for ws in raw_workspaces]
         return Response({"results": workspaces, "status": status.HTTP_200_OK}, status=status.HTTP_200_OK)
 
 
@@ -68,24 +119,7 @@ class WorkspaceViewSet(viewsets.ViewSet):
     )
     def retrieve(self, request, pk=None):
         try:
-            ws = Workspace.objects.get(id=pk)
-            workspace = {
-                "id": ws.id,
-                "name": ws.name,
-                "created_at": localtime(ws.created_at).strftime('%Y-%m-%dT%H:%M:%S'),
-                "created_by_id": ws.created_by.id if ws.created_by else None,
-                "created_by_name": f"{ws.created_by.first_name} {ws.created_by.last_name}".strip() if ws.created_by else None,
-                "is_activated": ws.is_activated,
-                "activation_key": ws.activation_key,
-                "activation_key_expiry": ws.activation_key_expiry,
-                "failed_activation_attempts": ws.failed_activation_attempts,
-                "field_assistant_id": ws.field_assistant.id if ws.field_assistant else None,
-                "field_assistant_name": f"{ws.field_assistant.first_name} {ws.field_assistant.last_name}".strip() if ws.field_assistant else None,
-                "field_assistant_phone_number": ws.field_assistant.phone_number if ws.field_assistant else None,
-                "sku_count": SKU.objects.filter(workspace=ws).count() ,
-                "sku_total_count":ws.sku_count,
-                
-            }
+            workspace = serialize_workspace(workspace_queryset().get(id=pk))
             return Response({"results": workspace, "status": status.HTTP_200_OK}, status=status.HTTP_200_OK)
         except Workspace.DoesNotExist:
             return Response({"message": "Workspace not found", "status": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)